@@ -363,7 +363,8 @@ class SimpleCodegenTask(Task):
 
     def execute_codegen(self, targets):
       with self._task.context.new_workunit(name='execute', labels=[WorkUnit.MULTITOOL]):
-        ordered = [target for target in reversed(sort_targets(targets)) if target in targets]
+        target_set = set(targets)
+        ordered = [target for target in reversed(sort_targets(targets)) if target in target_set]
         for target in ordered:
           with self._task.context.new_workunit(name=target.address.spec):
             # TODO(gm): add a test-case to ensure this is correctly eliminating stale generated code.
@@ -0,0 +1,137 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from pants.base.exceptions import TestFailedTaskError
+from pants.base.fingerprint_strategy import FingerprintStrategy
+from pants.util.dirutil import safe_mkdir, safe_rmtree
+
+
+class _TestResultsFingerprintStrategy(FingerprintStrategy):
+  """Fingerprints targets together with the options and environment their tests run under."""
+
+  def __init__(self, task_fingerprint, environments):
+    """
+    :param string task_fingerprint: The fingerprint of the options of the task running the tests.
+    :param dict environments: A map from each test target to a fingerprint of the environment its
+      tests run in, or None.
+    """
+    self._task_fingerprint = task_fingerprint
+    self._environments = environments
+
+  def compute_fingerprint(self, target):
+    hasher = hashlib.sha1()
+    hasher.update(target.payload.fingerprint() or '')
+    hasher.update(self._task_fingerprint or '')
+    hasher.update(self._environments.get(target) or '')
+    return hasher.hexdigest()
+
+  def _identity(self):
+    return self._task_fingerprint, frozenset((target.address.spec, environment) for
+                                             target, environment in self._environments.items())
+
+  def __hash__(self):
+    return hash(self._identity())
+
+  def __eq__(self, other):
+    return type(self) == type(other) and self._identity() == other._identity()
+
+
+class CachedTestResultsMixin(object):
+  """A mixin for tasks that run tests, which skips the test targets that already passed.
+
+  Each test target is fingerprinted together with its transitive dependencies, the task's
+  fingerprinted options and the environment its tests run in, e.g., the JDK or interpreter, so its
+  tests are rerun whenever any of them change.  The results of a passing target, e.g., its xml
+  reports, are stored in a results dir of its own, which is also written to the artifact cache.
+  When a target is unchanged since it passed, here or in any workspace sharing the cache, its
+  stored results are replayed instead of running its tests again.
+  """
+
+  @classmethod
+  def register_options(cls, register):
+    super(CachedTestResultsMixin, cls).register_options(register)
+    register('--force', action='store_true', default=False,
+             help='Run the tests of all targets, even those that passed in a previous run and are '
+                  'unchanged since.')
+
+  @property
+  def cache_target_dirs(self):
+    return True
+
+  def run_uncached_tests(self, targets, run_tests):
+    """Runs the tests of targets without passing results, and replays the results of the rest.
+
+    :param list targets: The test targets.
+    :param run_tests: A function that takes an ordered dict from each target whose tests must run
+      to an empty dir to store its results in, and runs their tests, raising a TestFailedTaskError
+      if any fail.  It must store results only for the targets whose tests all ran and passed, as
+      those are the targets whose results are kept when others fail.
+    :raises: :class:`pants.base.exceptions.TestFailedTaskError` if any tests failed.
+    """
+    force = self.get_options().force
+    environments = dict((target, self.test_environment_fingerprint(target)) for target in targets)
+    fingerprint_strategy = _TestResultsFingerprintStrategy(self.fingerprint, environments)
+    with self.invalidated(targets, invalidate_dependents=True, partition_size_hint=0,
+                          fingerprint_strategy=fingerprint_strategy) as invalidation_check:
+      vts_to_run = [vt for vt in invalidation_check.all_vts if force or not vt.valid]
+      if not force:
+        passed_vts = [vt for vt in invalidation_check.all_vts if vt.valid]
+        if passed_vts:
+          self._report_targets('Skipping the tests of ', [vt.target for vt in passed_vts],
+                               ', which passed in a previous run.')
+        for vt in passed_vts:
+          self.replay_test_results(vt.target, vt.results_dir)
+      if not vts_to_run:
+        return
+
+      results_dirs = OrderedDict()
+      for vt in vts_to_run:
+        # Don't let the results of a previous failed run of this version linger.
+        safe_rmtree(vt.results_dir)
+        safe_mkdir(vt.results_dir)
+        results_dirs[vt.target] = vt.results_dir
+
+      try:
+        run_tests(results_dirs)
+      except TestFailedTaskError as e:
+        self._record_passing_results(vts_to_run, e.failed_targets)
+        raise
+
+  def test_environment_fingerprint(self, target):
+    """Returns a fingerprint of the environment the tests of target run in, or None.
+
+    Subclasses should override this to invalidate passing results when, e.g., the JDK or the
+    interpreter that runs the tests changes.  Task options registered with `fingerprint=True` are
+    already accounted for.
+    """
+    return None
+
+  def replay_test_results(self, target, results_dir):
+    """Called with the stored results of each target whose tests are not run because they passed.
+
+    Subclasses should override this to restore the results to wherever a run would have put them.
+    """
+    pass
+
+  def _record_passing_results(self, vts, failed_targets):
+    failed_targets = set(failed_targets)
+    passed_vts = []
+    for vt in vts:
+      if vt.target not in failed_targets and os.listdir(vt.results_dir):
+        vt.update()
+        passed_vts.append(vt)
+      else:
+        # The target may have been valid if its tests were forced to run.
+        vt.force_invalidate()
+    if passed_vts and self.artifact_cache_writes_enabled():
+      self.update_artifact_cache([(vt, [os.path.join(vt.results_dir, f)
+                                        for f in os.listdir(vt.results_dir)])
+                                  for vt in passed_vts])
@@ -13,12 +13,13 @@ from contextlib import contextmanager
 
 from twitter.common.collections.orderedset import OrderedSet
 
-from pants.base.build_invalidator import BuildInvalidator, CacheKeyGenerator
+from pants.base.build_invalidator import CacheKeyGenerator, create_build_invalidator
 from pants.base.cache_manager import InvalidationCacheManager, InvalidationCheck
 from pants.base.exceptions import TaskError
 from pants.base.fingerprint_strategy import TaskIdentityFingerprintStrategy
 from pants.base.worker_pool import Work
-from pants.cache.artifact_cache import UnreadableArtifact, call_insert, call_use_cached_files
+from pants.cache.artifact import TarballArtifact
+from pants.cache.artifact_cache import UnreadableArtifact, call_insert
 from pants.cache.cache_setup import CacheSetup
 from pants.option.optionable import Optionable
 from pants.option.options import Options
@@ -85,6 +86,17 @@ class TaskBase(Optionable, AbstractClass):
     """
     return (CacheSetup,)
 
+  @classmethod
+  def artifact_compression_codec(cls):
+    """The codec to compress this task's artifact cache entries with, unless configured otherwise.
+
+    Subclasses whose artifacts are already compressed, e.g., jars, may override this to avoid
+    compressing them again.
+
+    :returns: The name of one of the `TarballArtifact.CODECS`.
+    """
+    return TarballArtifact.DEFAULT_CODEC
+
   @classmethod
   def product_types(cls):
     """The list of products this Task produces. Set the product type(s) for this
@@ -173,6 +185,7 @@ class TaskBase(Optionable, AbstractClass):
       self.context.options.for_global_scope().pants_workdir,
       'build_invalidator',
       self.stable_name())
+    self._build_invalidator = None
 
     self._cache_factory = CacheSetup.create_cache_factory_for_task(self)
 
@@ -227,9 +240,16 @@ class TaskBase(Optionable, AbstractClass):
     """
     return []
 
+  def _get_build_invalidator(self):
+    # Shared by all of this task's cache managers, so an indexed invalidator is only loaded once.
+    if self._build_invalidator is None:
+      indexed = self.context.options.for_global_scope().build_invalidator == 'indexed'
+      self._build_invalidator = create_build_invalidator(self._build_invalidator_dir, indexed)
+    return self._build_invalidator
+
   def invalidate(self):
     """Invalidates all targets for this task."""
-    BuildInvalidator(self._build_invalidator_dir).force_invalidate_all()
+    self._get_build_invalidator().force_invalidate_all()
 
   def create_cache_manager(self, invalidate_dependents, fingerprint_strategy=None):
     """Creates a cache manager that can be used to invalidate targets on behalf of this task.
@@ -241,13 +261,15 @@ class TaskBase(Optionable, AbstractClass):
     fingerprint_strategy:    A FingerprintStrategy instance, which can do per task, finer grained
                              fingerprinting of a given Target.
     """
-
+    global_options = self.context.options.for_global_scope()
     return InvalidationCacheManager(self._cache_key_generator,
                                     self._build_invalidator_dir,
                                     invalidate_dependents,
                                     fingerprint_strategy=fingerprint_strategy,
                                     invalidation_report=self.context.invalidation_report,
-                                    task_name=type(self).__name__)
+                                    task_name=type(self).__name__,
+                                    build_invalidator=self._get_build_invalidator(),
+                                    fingerprint_workers=global_options.fingerprint_workers)
 
   @property
   def cache_target_dirs(self):
@@ -409,9 +431,8 @@ class TaskBase(Optionable, AbstractClass):
     uncached_vts = OrderedSet(vts)
 
     read_cache = self._cache_factory.get_read_cache()
-    items = [(read_cache, vt.cache_key) for vt in vts]
-
-    res = self.context.subproc_map(call_use_cached_files, items)
+    res = read_cache.use_cached_files_many([vt.cache_key for vt in vts],
+                                           concurrency=self._cache_factory.read_concurrency())
 
     for vt, was_in_cache in zip(vts, res):
       if was_in_cache:
@@ -468,7 +489,22 @@ class TaskBase(Optionable, AbstractClass):
         overwrite = always_overwrite or vts.cache_key in self._cache_key_errors
         args_tuples.append((cache, vts.cache_key, artifactfiles, overwrite))
 
-      return Work(lambda x: self.context.subproc_map(call_insert, x), [(args_tuples,)], 'insert')
+      concurrency = self._cache_factory.read_concurrency()
+
+      def insert_missing(args_tuples):
+        # Check which artifacts already exist in one batch, rather than once per insert.
+        keys_to_check = [key for _, key, _, overwrite in args_tuples if not overwrite]
+        existing = set(key for key, exists in zip(keys_to_check,
+                                                  cache.has_many(keys_to_check, concurrency))
+                       if exists)
+        if existing:
+          self.context.log.debug('Skipping insert of {} existing artifacts.'.format(len(existing)))
+        # The remaining inserts are known to be needed, so they can skip their own checks.
+        inserts = [(cache, key, artifactfiles, True)
+                   for _, key, artifactfiles, _ in args_tuples if key not in existing]
+        return self.context.subproc_map(call_insert, inserts) if inserts else []
+
+      return Work(insert_missing, [(args_tuples,)], 'insert')
     else:
       return None
 
@@ -5,10 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
 import re
 
 from pants.backend.core.tasks.console_task import ConsoleTask
 from pants.base.build_environment import get_scm
+from pants.base.dependee_index import DependeeIndex
 from pants.base.exceptions import TaskError
 from pants.base.lazy_source_mapper import LazySourceMapper
 from pants.goal.workspace import ScmWorkspace
@@ -27,7 +29,8 @@ class ChangeCalculator(object):
                diffspec=None,
                include_dependees=None,
                exclude_target_regexp=None,
-               spec_excludes=None):
+               spec_excludes=None,
+               dependee_index=None):
 
     self._scm = scm
     self._workspace = workspace
@@ -40,6 +43,7 @@ class ChangeCalculator(object):
     self._include_dependees = include_dependees
     self._exclude_target_regexp = exclude_target_regexp
     self._spec_excludes = spec_excludes
+    self._dependee_index = dependee_index
 
     self._mapper_cache = None
 
@@ -59,8 +63,8 @@ class ChangeCalculator(object):
 
   def _directly_changed_targets(self):
     # Internal helper to find target addresses containing SCM changes.
-    targets_for_source = self._mapper.target_addresses_for_source
-    return set(addr for src in self.changed_files() for addr in targets_for_source(src))
+    targets_by_source = self._mapper.target_addresses_for_sources(self.changed_files())
+    return set(addr for addrs in targets_by_source.values() for addr in addrs)
 
   def _find_changed_targets(self):
     # Internal helper to find changed targets, optionally including their dependees.
@@ -73,6 +77,15 @@ class ChangeCalculator(object):
     if self._include_dependees == 'none':
       return changed
 
+    if self._dependee_index is not None:
+      # Only the BUILD files changed since the index was last updated need to be loaded.
+      self._dependee_index.update(spec_excludes=self._spec_excludes)
+      if self._include_dependees == 'direct':
+        return changed.union(*[self._dependee_index.dependees_of(addr) for addr in changed])
+      if self._include_dependees == 'transitive':
+        return self._dependee_index.transitive_dependees_of(changed)
+      raise ValueError('Unknown dependee inclusion: "{}"'.format(self._include_dependees))
+
     # Load the whole build graph since we need it for dependee finding in either remaining case.
     for address in self._address_mapper.scan_addresses(spec_excludes=self._spec_excludes):
       self._build_graph.inject_address_closure(address)
@@ -112,7 +125,8 @@ class ChangedFileTaskMixin(object):
 
   Changes are calculated relative to a ref/tree-ish (defaults to HEAD), and changed files are then
   mapped to targets using LazySourceMapper. LazySourceMapper can optionally be used in "fast" mode,
-  which stops searching for additional owners for a given source once a one is found.
+  which stops searching for additional owners for a given source once a one is found.  Dependees of
+  changed targets are found using a DependeeIndex, unless it is disabled.
   """
   @classmethod
   def register_change_file_options(cls, register):
@@ -124,6 +138,9 @@ class ChangedFileTaskMixin(object):
              help='Calculate changes contained within given scm spec (commit range/sha/ref/etc).')
     register('--include-dependees', choices=['none', 'direct', 'transitive'], default='none',
              help='Include direct or transitive dependees of changed targets.')
+    register('--dependee-index', action='store_true', default=True, advanced=True,
+             help='Find dependees using an index persisted across runs, so that only BUILD files '
+                  'changed since the last run need to be loaded.')
 
   @classmethod
   def change_calculator(cls, options, address_mapper, build_graph, scm=None, workspace=None, spec_excludes=None):
@@ -132,6 +149,11 @@ class ChangedFileTaskMixin(object):
       raise TaskError('No SCM available.')
     workspace = workspace or ScmWorkspace(scm)
 
+    dependee_index = None
+    if options.include_dependees != 'none' and options.dependee_index:
+      index_path = os.path.join(options.pants_workdir, 'changed', 'dependee_index.json')
+      dependee_index = DependeeIndex(address_mapper, build_graph, index_path)
+
     return ChangeCalculator(scm,
                             workspace,
                             address_mapper,
@@ -143,7 +165,8 @@ class ChangedFileTaskMixin(object):
                             # NB: exclude_target_regexp is a global scope option registered
                             # elsewhere
                             exclude_target_regexp=options.exclude_target_regexp,
-                            spec_excludes=spec_excludes)
+                            spec_excludes=spec_excludes,
+                            dependee_index=dependee_index)
 
 
 class WhatChanged(ChangedFileTaskMixin, ConsoleTask):
@@ -29,10 +29,20 @@ class FilesetWithSpec(object):
   def __getitem__(self, index):
     return self._result[index]
 
+  def __getstate__(self):
+    # The underlying Fileset is lazy and unpicklable, so pickle the files it matched.
+    state = self.__dict__.copy()
+    state['_result'] = list(self._result)
+    return state
+
 
 class FilesetRelPathWrapper(object):
+  # Whether this kind of glob matches files in subdirectories of the glob's directory.
+  recursive = False
+
   def __init__(self, parse_context):
     self.rel_path = parse_context.rel_path
+    self._parse_context = parse_context
 
   def __call__(self, *args, **kwargs):
     root = os.path.join(get_buildroot(), self.rel_path)
@@ -51,6 +61,7 @@ class FilesetRelPathWrapper(object):
         raise ValueError('Invalid glob {}, points outside BUILD file root dir {}'.format(glob, root))
 
     result = self.wrapped_fn(root=root, *args, **kwargs)
+    self._record_globs(args)
 
     for exclude in excludes:
       result -= exclude
@@ -60,6 +71,14 @@ class FilesetRelPathWrapper(object):
     filespec = self.to_filespec(args, root=rel_root, excludes=excludes)
     return FilesetWithSpec(rel_root, result, filespec)
 
+  def _record_globs(self, globs):
+    for glob in globs:
+      glob_dir = os.path.dirname(glob)
+      if self.recursive or any(c in glob_dir for c in '*?['):
+        self._parse_context.record_glob(self.rel_path, recursive=True)
+      else:
+        self._parse_context.record_glob(os.path.normpath(os.path.join(self.rel_path, glob_dir)))
+
   def _is_glob_dir_outside_root(self, glob, root):
     # The assumption is that a correct glob starts with the root,
     # even after normalizing.
@@ -121,6 +140,8 @@ class RGlobs(FilesetRelPathWrapper):
   those in ``config/foo``.  Please use exclude instead, since pants is moving to
   make BUILD files easier to parse, and the new grammar will not support arithmetic.
   """
+  recursive = True
+
   @staticmethod
   def rglobs_following_symlinked_dirs_by_default(*globspecs, **kw):
     if 'follow_links' not in kw:
@@ -185,6 +206,8 @@ class ZGlobs(FilesetRelPathWrapper):
 
   Uses ``BUILD`` file's directory as the "working directory".
   """
+  recursive = True
+
   @staticmethod
   def zglobs_following_symlinked_dirs_by_default(*globspecs, **kw):
     if 'follow_links' not in kw:
@@ -0,0 +1,44 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+
+from pants.java.classpath_index import ClasspathIndex
+from pants.subsystem.subsystem import Subsystem
+
+
+class ClasspathIndexSubsystem(Subsystem):
+  """Shares one index of the contents of classpath entries among all the tasks in a run."""
+  options_scope = 'classpath-index'
+
+  @classmethod
+  def register_options(cls, register):
+    super(ClasspathIndexSubsystem, cls).register_options(register)
+    register('--persist', advanced=True, action='store_true', default=True,
+             help='Persist the listings of jars across runs, so that unchanged jars are never '
+                  'reopened to find the classes they contain.')
+    register('--cache-dir', advanced=True, default=None, metavar='<dir>',
+             help='The directory to persist jar listings in. '
+                  'If unspecified, a standard path under the workdir is used.')
+    register('--max-listings', advanced=True, type=int, default=10000,
+             help='The maximum number of jar listings to persist. The least recently used are '
+                  'deleted first.')
+
+  def __init__(self, *args, **kwargs):
+    super(ClasspathIndexSubsystem, self).__init__(*args, **kwargs)
+    self._index = None
+
+  @property
+  def index(self):
+    """The ClasspathIndex shared by all users of this subsystem instance."""
+    if self._index is None:
+      options = self.get_options()
+      cache_dir = None
+      if options.persist:
+        cache_dir = options.cache_dir or os.path.join(options.pants_workdir, 'classpath_index')
+      self._index = ClasspathIndex(cache_dir=cache_dir, max_listings=options.max_listings)
+    return self._index
@@ -136,6 +136,18 @@ class JarDependency(object):
       raise ValueError('Cannot determine classifier. No explicit classifier is set and this jar '
                        'has more than 1 artifact: {}\n\t{}'.format(self, '\n\t'.join(map(str, self.artifacts))))
 
+  def __getstate__(self):
+    # The legacy method name aliases are bound methods, which can't be pickled.
+    state = self.__dict__.copy()
+    del state['withSources']
+    del state['withDocs']
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self.withSources = self.with_sources
+    self.withDocs = self.with_docs
+
   def append_artifact(self, name, type_=None, ext=None, conf=None, url=None, classifier=None):
     """Append a new IvyArtifact to the list of artifacts for this jar."""
     self.artifacts += (IvyArtifact(name, type_=type_, ext=ext, conf=conf, url=url, classifier=classifier), )
@@ -80,6 +80,11 @@ class BootstrapJvmTools(IvyTaskMixin, JarTask):
   def global_subsystems(cls):
     return super(BootstrapJvmTools, cls).global_subsystems() + (IvySubsystem, )
 
+  @classmethod
+  def artifact_compression_codec(cls):
+    # Shaded tool jars are already compressed.
+    return 'none'
+
   def __init__(self, *args, **kwargs):
     super(BootstrapJvmTools, self).__init__(*args, **kwargs)
     self._shader = None
@@ -14,6 +14,77 @@ from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
 
 
+class ExcludeSet(object):
+  """An immutable set of excludes, indexed by org and then by name for fast matching."""
+
+  @classmethod
+  def from_excludes(cls, excludes):
+    """Returns the set of the given `Exclude`s."""
+    names_by_org = {}
+    for exclude in excludes:
+      if not exclude.name:
+        names_by_org[exclude.org] = None
+      elif names_by_org.get(exclude.org, ()) is not None:
+        names_by_org[exclude.org] = names_by_org.get(exclude.org, frozenset()) | {exclude.name}
+    return cls(names_by_org) if names_by_org else cls.EMPTY
+
+  def __init__(self, names_by_org):
+    """
+    :param dict names_by_org: A map from org to a frozenset of excluded names, or to None if all
+      names in the org are excluded.
+    """
+    self._names_by_org = names_by_org
+
+  def union(self, others):
+    """Returns the union of this set and the given sets, sharing an existing set where possible."""
+    result = self
+    for other in others:
+      if other is result or not other:
+        continue
+      if not result:
+        result = other
+        continue
+      names_by_org = dict(result._names_by_org)
+      for org, names in other._names_by_org.items():
+        if org not in names_by_org:
+          names_by_org[org] = names
+        elif names is None or names_by_org[org] is None:
+          names_by_org[org] = None
+        else:
+          names_by_org[org] = names_by_org[org] | names
+      result = ExcludeSet(names_by_org)
+    return result
+
+  def matches(self, org, name):
+    """Returns True if the jar with the given org and name is excluded."""
+    if org not in self._names_by_org:
+      return False
+    names = self._names_by_org[org]
+    return names is None or name in names
+
+  def excludes_path(self, path):
+    """Returns True if the path is of an excluded jar.
+
+    Jars are identified by the org and name that follow a `jars` directory in their path, as in
+    paths generated by ivy, e.g., `.../jars/org.example/lib/lib-1.0.jar`.
+    """
+    if not self._names_by_org:
+      return False
+    components = path.split(os.path.sep)
+    for i in range(len(components) - 2):
+      if components[i] == 'jars' and self.matches(components[i + 1], components[i + 2]):
+        return True
+    return False
+
+  def __bool__(self):
+    return bool(self._names_by_org)
+
+  __nonzero__ = __bool__
+
+
+ExcludeSet.EMPTY = ExcludeSet({})
+
+
 class ClasspathUtil(object):
 
   @classmethod
@@ -34,8 +105,7 @@ class ClasspathUtil(object):
     return list(classpath_paths)
 
   @classmethod
-  def compute_classpath_for_target(cls, target, classpath_products, extra_classpath_tuples, confs,
-                                   target_closure=None):
+  def compute_classpath_for_target(cls, target, classpath_products, extra_classpath_tuples, confs):
     """Returns the list of jar entries for a classpath covering the passed target. Filters and adds
     paths from extra_classpath_tuples to the end of the resulting list.
 
@@ -43,25 +113,24 @@ class ClasspathUtil(object):
     :param UnionProducts classpath_products: Product containing classpath elements.
     :param extra_classpath_tuples: Additional classpath entries
     :param confs: The list of confs for use by this classpath
-    :param target_closure: The transitive closure of the target
     """
 
-    classpath_tuples = classpath_products.get_for_target(target)
+    def filtered_classpath_tuples():
+      classpath_tuples = classpath_products.get_for_target(target)
+      exclude_set = cls._exclude_set(target, classpath_products)
+      tuples = cls._filter_classpath_by_excludes_and_confs(classpath_tuples, exclude_set, confs)
+      cls._validate_classpath_paths(tuples, classpath_products)
+      return tuples
 
-    target_closure = target_closure or target.closure()
-    exclude_patterns = cls._exclude_patterns_for_closure(target_closure)
-
-    filtered_classpath_tuples = cls._filter_classpath_by_excludes_and_confs(classpath_tuples,
-                                                                            exclude_patterns, confs)
+    # Each target's filtered classpath is computed once, and reused until classpaths change.
+    key = ('filtered_classpath', target, tuple(confs) if confs is not None else None)
+    filtered_classpath_tuples = classpath_products.derived(key, filtered_classpath_tuples)
 
     filtered_extra_classpath_tuples = \
-      cls._filter_classpath_by_excludes_and_confs(extra_classpath_tuples, [], confs)
-
-    full_classpath_tuples = filtered_classpath_tuples + filtered_extra_classpath_tuples
+      cls._filter_classpath_by_excludes_and_confs(extra_classpath_tuples, ExcludeSet.EMPTY, confs)
+    cls._validate_classpath_paths(filtered_extra_classpath_tuples, classpath_products)
 
-    cls._validate_classpath_paths(full_classpath_tuples, classpath_products)
-
-    return cls._pluck_paths(full_classpath_tuples)
+    return cls._pluck_paths(filtered_classpath_tuples + filtered_extra_classpath_tuples)
 
   @classmethod
   def classpath_entries(cls, targets, classpath_products, confs):
@@ -72,45 +141,46 @@ class ClasspathUtil(object):
     :param confs: The list of confs for use by this classpath
     """
     classpath_tuples = classpath_products.get_for_targets(targets)
-    exclude_patterns = cls._exclude_patterns(targets)
-    tuples = cls._filter_classpath_by_excludes_and_confs(classpath_tuples, exclude_patterns, confs)
+    exclude_set = ExcludeSet.EMPTY.union(cls._exclude_set(target, classpath_products)
+                                         for target in targets)
+    tuples = cls._filter_classpath_by_excludes_and_confs(classpath_tuples, exclude_set, confs)
     cls._validate_classpath_paths(tuples, classpath_products)
 
     return cls._pluck_paths(tuples)
 
   @classmethod
-  def _filter_classpath_by_excludes_and_confs(cls, classpath_tuples, exclude_patterns, confs):
+  def _filter_classpath_by_excludes_and_confs(cls, classpath_tuples, exclude_set, confs):
     def conf_needed(conf):
       return conf in confs if confs is None else True
 
-    def excluded(path):
-      return any(excluded in path for excluded in exclude_patterns)
-
     return [(conf, path) for conf, path in classpath_tuples
-            if conf_needed(conf) and not excluded(path)]
+            if conf_needed(conf) and not exclude_set.excludes_path(path)]
 
   @classmethod
   def _pluck_paths(cls, classpath):
     return [path for conf, path in classpath]
 
   @classmethod
-  def _exclude_patterns(cls, targets):
-    patterns = set()
-    for target in targets:
-      patterns.update(cls._exclude_patterns_for_closure(target.closure()))
-    return patterns
+  def _exclude_set(cls, target, classpath_products):
+    """Returns the union of the excludes of the target and of its transitive dependencies.
 
-  @classmethod
-  def _exclude_patterns_for_closure(cls, target_closure):
-    # creates strings from excludes that will match classpath entries generated by ivy
-    # eg exclude(org='org.example', name='lib') => 'jars/org.example/lib'
-    #    exclude(org='org.example')             => 'jars/org.example/'
-    excludes_patterns = set()
-    for target in target_closure:
-      if isinstance(target, JvmTarget) and target.excludes:
-        excludes_patterns.update([os.path.sep.join(['jars', e.org, e.name or ''])
-                                  for e in target.excludes])
-    return excludes_patterns
+    Exclude sets are computed bottom-up, once per target, and dependees share their dependencies'
+    sets where possible, so this is linear in the size of the graph over all targets.
+    """
+    exclude_sets = classpath_products.derived('exclude_sets', dict)
+    stack = [(target, False)]
+    while stack:
+      current, deps_visited = stack.pop()
+      if current in exclude_sets:
+        continue
+      if deps_visited:
+        own = (ExcludeSet.from_excludes(current.excludes)
+               if isinstance(current, JvmTarget) and current.excludes else ExcludeSet.EMPTY)
+        exclude_sets[current] = own.union(exclude_sets[dep] for dep in current.dependencies)
+      else:
+        stack.append((current, True))
+        stack.extend((dep, False) for dep in current.dependencies if dep not in exclude_sets)
+    return exclude_sets[target]
 
   @classmethod
   def _validate_classpath_paths(cls, classpath, classpath_products):
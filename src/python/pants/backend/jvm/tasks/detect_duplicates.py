@@ -8,12 +8,10 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 from collections import defaultdict
 
-from pex.compatibility import to_bytes
-
+from pants.backend.jvm.subsystems.classpath_index_subsystem import ClasspathIndexSubsystem
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.exceptions import TaskError
 from pants.java.jar.manifest import Manifest
-from pants.util.contextutil import open_zip
 
 
 EXCLUDED_FILES = ['dependencies,license,notice,.DS_Store,notice.txt,cmdline.arg.info.txt.1,'
@@ -23,10 +21,6 @@ EXCLUDED_FILES = ['dependencies,license,notice,.DS_Store,notice.txt,cmdline.arg.
 class DuplicateDetector(JvmBinaryTask):
   """ Detect classes and resources with the same qualified name on the classpath. """
 
-  @staticmethod
-  def _isdir(name):
-    return name[-1] == '/'
-
   @classmethod
   def register_options(cls, register):
     super(DuplicateDetector, cls).register_options(register)
@@ -39,6 +33,10 @@ class DuplicateDetector(JvmBinaryTask):
     register('--max-dups', type=int, default=10,
              help='Maximum number of duplicate classes to display per artifact.')
 
+  @classmethod
+  def global_subsystems(cls):
+    return super(DuplicateDetector, cls).global_subsystems() + (ClasspathIndexSubsystem, )
+
   @classmethod
   def prepare(cls, options, round_manager):
     super(DuplicateDetector, cls).prepare(options, round_manager)
@@ -102,21 +100,18 @@ class DuplicateDetector(JvmBinaryTask):
 
   def _get_external_dependencies(self, binary_target):
     artifacts_by_file_name = defaultdict(set)
+    classpath_index = ClasspathIndexSubsystem.global_instance().index
     for basedir, externaljar in  self.list_external_jar_dependencies(binary_target):
       external_dep = os.path.join(basedir, externaljar)
       self.context.log.debug('  scanning {}'.format(external_dep))
-      with open_zip(external_dep) as dep_zip:
-        for qualified_file_name in dep_zip.namelist():
-          # Zip entry names can come in any encoding and in practice we find some jars that have
-          # utf-8 encoded entry names, some not.  As a result we cannot simply decode in all cases
-          # and need to do this to_bytes(...).decode('utf-8') dance to stay safe across all entry
-          # name flavors and under all supported pythons.
-          decoded_file_name = to_bytes(qualified_file_name).decode('utf-8')
-          if os.path.basename(decoded_file_name).lower() in self._excludes:
-            continue
-          jar_name = os.path.basename(external_dep)
-          if (not self._isdir(decoded_file_name)) and Manifest.PATH != decoded_file_name:
-            artifacts_by_file_name[decoded_file_name].add(jar_name)
+      jar_name = os.path.basename(external_dep)
+      # The index lists the files in the jar with their names decoded to text, whatever encoding
+      # the jar used for them.
+      for file_name in classpath_index.names(external_dep):
+        if os.path.basename(file_name).lower() in self._excludes:
+          continue
+        if Manifest.PATH != file_name:
+          artifacts_by_file_name[file_name].add(jar_name)
     return artifacts_by_file_name
 
   def _get_conflicts_by_artifacts(self, artifacts_by_file_name):
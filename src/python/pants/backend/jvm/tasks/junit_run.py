@@ -7,21 +7,28 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import copy
 import fnmatch
+import heapq
 import os
+import shutil
 import sys
+import time
 from abc import abstractmethod
 from collections import defaultdict, namedtuple
+from xml.dom.minidom import getDOMImplementation
 
 from six.moves import range
 from twitter.common.collections import OrderedSet
 
 from pants import binary_util
+from pants.backend.core.tasks.cached_test_results_mixin import CachedTestResultsMixin
 from pants.backend.jvm.targets.java_tests import JavaTests as junit_tests
 from pants.backend.jvm.tasks.jvm_task import JvmTask
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TargetDefinitionException, TaskError, TestFailedTaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnit
+from pants.java.distribution.distribution import Distribution
 from pants.java.jar.shader import Shader
 from pants.java.util import execute_java
 from pants.util.contextutil import temporary_file_path
@@ -62,6 +69,32 @@ def _classfile_to_classname(cls):
   return clsname
 
 
+def _shard_tests(tests, durations, num_shards):
+  """Splits tests into at most num_shards shards of roughly equal total duration.
+
+  Tests with a known duration are assigned longest first, each to the shard with the least total
+  duration so far.  Tests with no known duration are then dealt out round-robin.  Each shard keeps
+  the tests in their original order.
+
+  :param list tests: The tests to shard.
+  :param dict durations: A map from test to its expected duration in seconds, if known.
+  :param int num_shards: The maximum number of shards.
+  :returns: A list of non-empty lists of tests.
+  """
+  shards = [[] for _ in range(num_shards)]
+  loads = [(0.0, i) for i in range(num_shards)]
+  known = [test for test in tests if durations.get(test) is not None]
+  for test in sorted(known, key=lambda test: -durations[test]):
+    load, i = heapq.heappop(loads)
+    shards[i].append(test)
+    heapq.heappush(loads, (load + durations[test], i))
+  unknown = [test for test in tests if durations.get(test) is None]
+  for i, test in enumerate(unknown):
+    shards[i % num_shards].append(test)
+  order = dict((test, i) for i, test in enumerate(tests))
+  return [sorted(shard, key=order.get) for shard in shards if shard]
+
+
 class _JUnitRunner(object):
   """Helper class to run JUnit tests with or without coverage.
 
@@ -78,17 +111,22 @@ class _JUnitRunner(object):
              help='Force running of just these tests.  Tests can be specified using any of: '
                   '[classname], [classname]#[methodname], [filename] or [filename]#[methodname]')
     register('--per-test-timer', action='store_true', help='Show progress and timer for each test.')
-    register('--default-parallel', action='store_true',
+    register('--default-parallel', action='store_true', fingerprint=True,
              help='Run classes without @TestParallel or @TestSerial annotations in parallel.')
     register('--parallel-threads', type=int, default=0,
              help='Number of threads to run tests in parallel. 0 for autoset.')
+    register('--parallel-workers', type=int, default=1,
+             help='Run tests in this many concurrent JVMs. Test classes are assigned to workers '
+                  'by how long they took in previous runs, and the xml reports of all workers are '
+                  'merged into TESTS-TestSuites.xml. Not supported with coverage.')
     register('--test-shard',
              help='Subset of tests to run, in the form M/N, 0 <= M < N. '
                   'For example, 1/3 means run tests number 2, 5, 8, 11, ...')
-    register('--suppress-output', action='store_true', default=True,
+    register('--suppress-output', action='store_true', default=True, fingerprint=True,
              help='Redirect test output to files in .pants.d/test/junit.')
-    register('--cwd', help='Set the working directory. If no argument is passed, use the build '
-                           'root. If cwd is set on a target, it will supersede this argument.')
+    register('--cwd', fingerprint=True,
+             help='Set the working directory. If no argument is passed, use the build '
+                  'root. If cwd is set on a target, it will supersede this argument.')
     register_jvm_tool(register,
                       'junit',
                       main=JUnitRun._MAIN,
@@ -109,6 +147,7 @@ class _JUnitRunner(object):
     self._batch_size = options.batch_size
     self._fail_fast = options.fail_fast
     self._working_dir = options.cwd or get_buildroot()
+    self._parallel_workers = max(1, options.parallel_workers)
     self._args = copy.copy(task_exports.args)
     if options.suppress_output:
       self._args.append('-suppress-output')
@@ -125,6 +164,9 @@ class _JUnitRunner(object):
     self._args.append(str(options.parallel_threads))
 
     if options.test_shard:
+      if self._parallel_workers > 1:
+        raise TaskError('--test-shard is not supported with --parallel-workers, as each worker '
+                        'would only run a shard of its own tests.')
       self._args.append('-test-shard')
       self._args.append(options.test_shard)
 
@@ -156,6 +198,45 @@ class _JUnitRunner(object):
       _do_report(exception=e)
       raise
 
+  def execute_and_store_results(self, results_dirs):
+    """Runs the tests of the given targets, storing the results of each target whose tests passed.
+
+    :param results_dirs: A map from each test target to the dir to store its results in.
+    """
+    tests_by_target = defaultdict(list)
+    for test, target in self._collect_test_targets(results_dirs.keys()).items():
+      tests_by_target[target].append(test)
+
+    # Truncated to whole seconds, as filesystem timestamps may be.
+    start_time = int(time.time())
+
+    def passed(test):
+      # Tests skipped by --fail-fast leave no report, or a stale one from a previous run.
+      filename = self._test_report_file(test)
+      if not os.path.exists(filename) or os.path.getmtime(filename) < start_time:
+        return False
+      try:
+        xml = XmlParser.from_file(filename)
+        return (int(xml.get_attribute('testsuite', 'failures')) == 0 and
+                int(xml.get_attribute('testsuite', 'errors')) == 0)
+      except (XmlParser.XmlError, ValueError):
+        return False
+
+    try:
+      self.execute(results_dirs.keys())
+    finally:
+      for target, tests in tests_by_target.items():
+        if all(passed(test) for test in tests):
+          for test in tests:
+            for path in self._result_files(test):
+              if os.path.exists(path):
+                shutil.copy(path, results_dirs[target])
+
+  def replay_results(self, results_dir):
+    """Restores the reports and outputs stored by a previous run to where a run would write them."""
+    for name in os.listdir(results_dir):
+      shutil.copy(os.path.join(results_dir, name), self._task_exports.workdir)
+
   def instrument(self, targets, tests, junit_classpath):
     """Called from coverage classes. Run any code instrumentation needed.
 
@@ -223,16 +304,13 @@ class _JUnitRunner(object):
     :tests_and_targets: {test: target} mapping.
     """
 
-    def get_test_filename(test):
-      return os.path.join(self._task_exports.workdir, 'TEST-{0}.xml'.format(test))
-
     failed_targets = []
 
     for test, target in tests_and_targets.items():
       if target is None:
         self._context.log.warn('Unknown target for test %{0}'.format(test))
 
-      filename = get_test_filename(test)
+      filename = self._test_report_file(test)
 
       if os.path.exists(filename):
         try:
@@ -247,12 +325,52 @@ class _JUnitRunner(object):
 
     return failed_targets
 
+  def _test_report_file(self, test):
+    return os.path.join(self._task_exports.workdir, 'TEST-{0}.xml'.format(test))
+
+  def _result_files(self, test):
+    """Returns the paths of the report and the captured output that a run of a test class writes."""
+    workdir = self._task_exports.workdir
+    return [self._test_report_file(test),
+            os.path.join(workdir, '{0}.out.txt'.format(test)),
+            os.path.join(workdir, '{0}.err.txt'.format(test))]
+
+  def _historical_durations(self, tests):
+    """Returns a map from test to its duration in seconds in the previous run, where known."""
+    durations = {}
+    for test in tests:
+      filename = self._test_report_file(test)
+      if os.path.exists(filename):
+        try:
+          durations[test] = float(XmlParser.from_file(filename).get_attribute('testsuite', 'time'))
+        except (XmlParser.XmlError, ValueError):
+          # An interrupted previous run may have left a partial report.
+          pass
+    return durations
+
+  def _merge_xml_reports(self, tests):
+    """Merges the xml reports of the given tests into a single report of all their testsuites."""
+    document = getDOMImplementation().createDocument(None, 'testsuites', None)
+    for test in tests:
+      filename = self._test_report_file(test)
+      if os.path.exists(filename):
+        try:
+          xml = XmlParser.from_file(filename)
+        except XmlParser.XmlError as e:
+          self._context.log.error('Error parsing test result file {0}: {1}'.format(filename, e))
+          continue
+        for testsuite in xml.parsed.getElementsByTagName('testsuite'):
+          document.documentElement.appendChild(document.importNode(testsuite, True))
+    merged_report = os.path.join(self._task_exports.workdir, 'TESTS-TestSuites.xml')
+    with safe_open(merged_report, 'wb') as fp:
+      fp.write(document.toxml(encoding='utf-8'))
+
   def _run_tests(self, tests_to_targets, main, extra_jvm_options=None, classpath_prepend=(),
                  classpath_append=()):
     extra_jvm_options = extra_jvm_options or []
 
-    result = 0
-    for workdir, tests in self._tests_by_workdir(tests_to_targets).items():
+    def run_batches(workdir, tests):
+      result = 0
       for batch in self._partition(tests):
         classpath = self._task_exports.classpath(map(tests_to_targets.get, batch),
                                                  cp=self._task_exports.tool_classpath('junit'))
@@ -275,6 +393,19 @@ class _JUnitRunner(object):
 
           if result != 0 and self._fail_fast:
             break
+      return result
+
+    tests_by_workdir = self._tests_by_workdir(tests_to_targets)
+    if self._parallel_workers > 1:
+      durations = self._historical_durations(tests_to_targets)
+      shards = [(workdir, shard) for workdir, tests in tests_by_workdir.items()
+                for shard in _shard_tests(tests, durations, self._parallel_workers)]
+      try:
+        result = sum(self._run_in_parallel(run_batches, shards))
+      finally:
+        self._merge_xml_reports(tests_to_targets)
+    else:
+      result = sum(run_batches(workdir, tests) for workdir, tests in tests_by_workdir.items())
 
     if result != 0:
       failed_targets = self._get_failed_targets(tests_to_targets)
@@ -284,6 +415,22 @@ class _JUnitRunner(object):
         failed_targets=failed_targets
       )
 
+  def _run_in_parallel(self, run_batches, shards):
+    """Runs the batches of each (workdir, tests) shard in its own worker, returning their results.
+
+    With --fail-fast, a worker stops at its own first failure, but other workers run to completion.
+    """
+    self._context.log.info('Running {0} shards of tests in up to {1} concurrent JVMs.'
+                           .format(len(shards), self._parallel_workers))
+    with self._context.new_workunit(name='parallel-run',
+                                    labels=[WorkUnit.MULTITOOL]) as workunit:
+      worker_pool = WorkerPool(workunit, self._context.run_tracker, self._parallel_workers)
+      try:
+        return worker_pool.submit_work_and_wait(Work(run_batches, shards),
+                                                workunit_parent=workunit)
+      finally:
+        worker_pool.shutdown()
+
   def _infer_workdir(self, target):
     if target.cwd is not None:
       return target.cwd
@@ -719,7 +866,7 @@ class Cobertura(_Coverage):
                         " 'failed to report'".format(main, result))
 
 
-class JUnitRun(JvmToolTaskMixin, JvmTask):
+class JUnitRun(CachedTestResultsMixin, JvmToolTaskMixin, JvmTask):
   _MAIN = 'org.pantsbuild.tools.junit.ConsoleRunner'
 
   @classmethod
@@ -753,7 +900,15 @@ class JUnitRun(JvmToolTaskMixin, JvmTask):
                                 workdir=self.workdir)
 
     options = self.get_options()
-    if options.coverage or options.coverage_html_open:
+    coverage = options.coverage or options.coverage_html_open
+    # Only a run of all the tests of a target determines that it passed, and coverage must see
+    # every test run.
+    self._cache_results = not (coverage or options.test or options.test_shard)
+    if coverage:
+      if options.parallel_workers > 1:
+        # Concurrent JVMs would all write to the same coverage data file.
+        raise TaskError('--parallel-workers is not supported with coverage. Run with '
+                        '--parallel-workers=1 to collect coverage.')
       coverage_processor = options.coverage_processor
       if coverage_processor == 'emma':
         self._runner = Emma(task_exports, self.context)
@@ -774,4 +929,17 @@ class JUnitRun(JvmToolTaskMixin, JvmTask):
           msg = 'JavaTests target must include a non-empty set of sources.'
           raise TargetDefinitionException(target, msg)
 
-      self._runner.execute(targets)
+      if self._cache_results:
+        test_targets = [target for target in targets if isinstance(target, junit_tests)]
+        self.run_uncached_tests(test_targets, self._runner.execute_and_store_results)
+      else:
+        self._runner.execute(targets)
+
+  def test_environment_fingerprint(self, target):
+    # Tests run in the default distribution, with the options of the jvm subsystem.
+    version = Distribution.cached().version
+    return '\n'.join(['.'.join(str(component) for component in version.components)] +
+                     self.jvm_options + self.args)
+
+  def replay_test_results(self, target, results_dir):
+    self._runner.replay_results(results_dir)
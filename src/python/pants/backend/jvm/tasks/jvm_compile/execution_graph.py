@@ -5,9 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import heapq
 import Queue as queue
+import threading
+import time
 import traceback
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 
 from pants.base.worker_pool import Work
 
@@ -19,7 +22,7 @@ class Job(object):
   keys of its dependent jobs.
   """
 
-  def __init__(self, key, fn, dependencies, on_success=None, on_failure=None):
+  def __init__(self, key, fn, dependencies, on_success=None, on_failure=None, size=1):
     """
 
     :param key: Key used to reference and look up jobs
@@ -28,12 +31,14 @@ class Job(object):
     :param on_success: Zero parameter callback to run if job completes successfully. Run on main
                        thread.
     :param on_failure: Zero parameter callback to run if job completes successfully. Run on main
-                       thread."""
+                       thread.
+    :param size: The estimated cost of the work, e.g., in seconds. Only relative sizes matter."""
     self.key = key
     self.fn = fn
     self.dependencies = dependencies
     self.on_success = on_success
     self.on_failure = on_failure
+    self.size = size
 
   def __call__(self):
     self.fn()
@@ -54,6 +59,13 @@ FAILED = 'Failed'
 CANCELED = 'Canceled'
 
 
+# A record of when a job was run.
+#  - priority is the estimated size of the longest chain of work starting with the job.
+#  - submitted, started and finished are times in seconds since the start of execution.  A job
+#    that was canceled never starts, and so has None for submitted and started.
+JobTrace = namedtuple('JobTrace', ['key', 'priority', 'submitted', 'started', 'finished', 'status'])
+
+
 class StatusTable(object):
   DONE_STATES = {SUCCESSFUL, FAILED, CANCELED}
 
@@ -106,6 +118,13 @@ class NoRootJobError(UnexecutableGraphError):
       "All scheduled jobs have dependencies. There must be a circular dependency.")
 
 
+class CircularDependencyError(UnexecutableGraphError):
+  def __init__(self, keys):
+    super(CircularDependencyError, self).__init__(
+      "Jobs in or depending on a circular dependency: {}".format(
+        ", ".join(sorted(map(repr, keys)))))
+
+
 class UnknownJobError(UnexecutableGraphError):
   def __init__(self, undefined_dependencies):
     super(UnknownJobError, self).__init__("Undefined dependencies {}"
@@ -134,6 +153,7 @@ class ExecutionGraph(object):
     self._jobs = {}
     self._job_keys_as_scheduled = []
     self._job_keys_with_no_dependencies = []
+    self._trace = []
 
     for job in job_list:
       self._schedule(job)
@@ -145,6 +165,44 @@ class ExecutionGraph(object):
     if len(self._job_keys_with_no_dependencies) == 0:
       raise NoRootJobError()
 
+    self._priorities = self._compute_priorities()
+
+  @property
+  def trace(self):
+    """A JobTrace for each job run or canceled by the last `execute`, in order of completion."""
+    return list(self._trace)
+
+  @property
+  def makespan(self):
+    """The time in seconds the last `execute` took from submitting the first job to finishing the
+    last, or None if nothing was executed."""
+    return max(job_trace.finished for job_trace in self._trace) if self._trace else None
+
+  def _compute_priorities(self):
+    """Computes the size of the longest chain of work from each job through its dependees.
+
+    Running the jobs with the longest chains first keeps the critical path moving, rather than
+    letting jobs with little downstream work occupy the workers.
+    """
+    # Visit the jobs in topological order, then accumulate in reverse so that each job's dependees
+    # are done first.  This is iterative, as dependency chains may be very long.
+    num_unvisited_dependencies = dict((key, len(self._jobs[key].dependencies))
+                                      for key in self._job_keys_as_scheduled)
+    ordered = list(self._job_keys_with_no_dependencies)
+    for key in ordered:
+      for dependee in self._dependees[key]:
+        num_unvisited_dependencies[dependee] -= 1
+        if num_unvisited_dependencies[dependee] == 0:
+          ordered.append(dependee)
+    if len(ordered) != len(self._job_keys_as_scheduled):
+      raise CircularDependencyError(set(self._job_keys_as_scheduled) - set(ordered))
+
+    priorities = {}
+    for key in reversed(ordered):
+      downstream = max([priorities[dependee] for dependee in self._dependees[key]] or [0])
+      priorities[key] = self._jobs[key].size + downstream
+    return priorities
+
   def format_dependee_graph(self):
     return "\n".join([
       "{} -> {{\n  {}\n}}".format(key, ',\n  '.join(self._dependees[key]))
@@ -165,17 +223,22 @@ class ExecutionGraph(object):
     for dep_name in dependency_keys:
       self._dependees[dep_name].append(key)
 
-  def execute(self, pool, log):
+  def execute(self, pool, log, max_outstanding=None):
     """Runs scheduled work, ensuring all dependencies for each element are done before execution.
 
     :param pool: A WorkerPool to run jobs on
     :param log: logger for logging debug information and progress
+    :param int max_outstanding: The maximum number of jobs to submit to the pool at once, typically
+      its number of workers.  Ready jobs are held back and submitted in priority order as
+      submitted jobs finish, so that jobs on the critical path never wait behind others in the
+      pool's queue.  If None, all ready jobs are submitted immediately, in priority order.
 
-    submits all the work without any dependencies to the worker pool
+    submits the work without any dependencies to the worker pool, in priority order
     when a unit of work finishes,
       if it is successful
         calls success callback
-        checks for dependees whose dependencies are all successful, and submits them
+        checks for dependees whose dependencies are all successful, and readies them
+      submits ready work in priority order, up to max_outstanding
       if it fails
         calls failure callback
         marks dependees as failed and queues them directly into the finished work queue
@@ -190,9 +253,23 @@ class ExecutionGraph(object):
 
     status_table = StatusTable(self._job_keys_as_scheduled)
     finished_queue = queue.Queue()
+    order = dict((key, index) for index, key in enumerate(self._job_keys_as_scheduled))
+    ready_heap = []
+    outstanding = [0]
+    start = time.time()
+    submitted = {}
+    started = {}
+    trace_lock = threading.Lock()
+    del self._trace[:]
+
+    def ready_jobs(job_keys):
+      for job_key in job_keys:
+        heapq.heappush(ready_heap, (-self._priorities[job_key], order[job_key], job_key))
 
-    def submit_jobs(job_keys):
+    def submit_jobs():
       def worker(worker_key, work):
+        with trace_lock:
+          started[worker_key] = time.time() - start
         try:
           work()
           result = (worker_key, SUCCESSFUL, None)
@@ -200,12 +277,16 @@ class ExecutionGraph(object):
           result = (worker_key, FAILED, e)
         finished_queue.put(result)
 
-      for job_key in job_keys:
+      while ready_heap and (max_outstanding is None or outstanding[0] < max_outstanding):
+        _, _, job_key = heapq.heappop(ready_heap)
         status_table.mark_as(QUEUED, job_key)
+        outstanding[0] += 1
+        submitted[job_key] = time.time() - start
         pool.submit_async_work(Work(worker, [(job_key, (self._jobs[job_key]))]))
 
     try:
-      submit_jobs(self._job_keys_with_no_dependencies)
+      ready_jobs(self._job_keys_with_no_dependencies)
+      submit_jobs()
 
       while not status_table.are_all_done():
         try:
@@ -218,6 +299,12 @@ class ExecutionGraph(object):
         finished_job = self._jobs[finished_key]
         direct_dependees = self._dependees[finished_key]
         status_table.mark_as(result_status, finished_key)
+        if finished_key in submitted:
+          outstanding[0] -= 1
+        with trace_lock:
+          self._trace.append(JobTrace(finished_key, self._priorities[finished_key],
+                                      submitted.get(finished_key), started.get(finished_key),
+                                      time.time() - start, result_status))
 
         # Queue downstream tasks.
         if result_status is SUCCESSFUL:
@@ -230,7 +317,7 @@ class ExecutionGraph(object):
           ready_dependees = [dependee for dependee in direct_dependees
                              if status_table.are_all_successful(self._jobs[dependee].dependencies)]
 
-          submit_jobs(ready_dependees)
+          ready_jobs(ready_dependees)
         else:  # Failed or canceled.
           try:
             finished_job.run_failure_callback()
@@ -242,6 +329,9 @@ class ExecutionGraph(object):
           for dependee in direct_dependees:
             finished_queue.put((dependee, CANCELED, None))
 
+        # Fill any capacity freed by the finished job.
+        submit_jobs()
+
         # Log success or failure for this job.
         if result_status is FAILED:
           log.error("{} failed: {}".format(finished_key, value))
@@ -11,6 +11,7 @@ from abc import abstractmethod
 from collections import defaultdict
 
 from pants.backend.core.tasks.group_task import GroupMember
+from pants.backend.jvm.subsystems.classpath_index_subsystem import ClasspathIndexSubsystem
 from pants.backend.jvm.tasks.jvm_compile.jvm_compile_global_strategy import JvmCompileGlobalStrategy
 from pants.backend.jvm.tasks.jvm_compile.jvm_compile_isolated_strategy import \
   JvmCompileIsolatedStrategy
@@ -75,6 +76,10 @@ class JvmCompile(NailgunTaskBase, GroupMember):
     JvmCompileGlobalStrategy.register_options(register, cls._language, cls._supports_concurrent_execution)
     JvmCompileIsolatedStrategy.register_options(register, cls._language, cls._supports_concurrent_execution)
 
+  @classmethod
+  def global_subsystems(cls):
+    return super(JvmCompile, cls).global_subsystems() + (ClasspathIndexSubsystem, )
+
   @classmethod
   def product_types(cls):
     return ['classes_by_target', 'classes_by_source', 'resources_by_target']
@@ -204,6 +209,11 @@ class JvmCompile(NailgunTaskBase, GroupMember):
                                           self._language,
                                           lambda s: s.endswith(self._file_suffix))
 
+  @property
+  def nailgun_pool_size(self):
+    # Give each concurrent compile a warm compiler of its own.
+    return max(super(JvmCompile, self).nailgun_pool_size, self._strategy.worker_count)
+
   def _fingerprint_strategy(self):
     return TaskIdentityFingerprintStrategy(self)
 
@@ -291,7 +301,7 @@ class JvmCompile(NailgunTaskBase, GroupMember):
         ' (',
         progress_message,
         ').')
-      with self.context.new_workunit('compile'):
+      with self.context.new_workunit('compile', targets=vts.targets):
         # The compiler may delete classfiles, then later exit on a compilation error. Then if the
         # change triggering the error is reverted, we won't rebuild to restore the missing
         # classfiles. So we force-invalidate here, to be on the safe side.
@@ -13,6 +13,7 @@ from collections import defaultdict
 
 from twitter.common.collections import OrderedSet
 
+from pants.backend.jvm.subsystems.classpath_index_subsystem import ClasspathIndexSubsystem
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.jvm_compile.jvm_compile_strategy import JvmCompileStrategy
 from pants.backend.jvm.tasks.jvm_compile.jvm_dependency_analyzer import JvmDependencyAnalyzer
@@ -22,8 +23,8 @@ from pants.base.exceptions import TaskError
 from pants.base.target import Target
 from pants.base.worker_pool import Work
 from pants.option.options import Options
-from pants.util.contextutil import open_zip, temporary_dir
-from pants.util.dirutil import safe_mkdir, safe_walk
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir
 
 
 class JvmCompileGlobalStrategy(JvmCompileStrategy):
@@ -530,22 +531,16 @@ class JvmCompileGlobalStrategy(JvmCompileStrategy):
       return path != self._classes_dir
 
     if self._upstream_class_to_path is None:
-      self._upstream_class_to_path = {}
+      classpath_index = ClasspathIndexSubsystem.global_instance().index
       classpath_entries = filter(non_product, classpath)
+      self._upstream_class_to_path = {}
       for cp_entry in self._find_all_bootstrap_jars() + classpath_entries:
-        # Per the classloading spec, a 'jar' in this context can also be a .zip file.
-        if os.path.isfile(cp_entry) and (cp_entry.endswith('.jar') or cp_entry.endswith('.zip')):
-          with open_zip(cp_entry, 'r') as jar:
-            for cls in jar.namelist():
-              # First jar with a given class wins, just like when classloading.
-              if cls.endswith(b'.class') and not cls in self._upstream_class_to_path:
-                self._upstream_class_to_path[cls] = cp_entry
-        elif os.path.isdir(cp_entry):
-          for dirpath, _, filenames in safe_walk(cp_entry, followlinks=True):
-            for f in filter(lambda x: x.endswith('.class'), filenames):
-              cls = os.path.relpath(os.path.join(dirpath, f), cp_entry)
-              if not cls in self._upstream_class_to_path:
-                self._upstream_class_to_path[cls] = os.path.join(dirpath, f)
+        for cls in classpath_index.names(cp_entry):
+          # First entry with a given class wins, just like when classloading.
+          if cls.endswith('.class') and cls not in self._upstream_class_to_path:
+            # Classes in jars map to the jar, and loose classes to their own file.
+            self._upstream_class_to_path[cls] = (cp_entry if os.path.isfile(cp_entry)
+                                                 else os.path.join(cp_entry, cls))
     return self._upstream_class_to_path
 
   def _find_all_bootstrap_jars(self):
@@ -5,10 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
 import os
 import shutil
 from collections import OrderedDict, defaultdict
 
+from pants.backend.jvm.subsystems.classpath_index_subsystem import ClasspathIndexSubsystem
 from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
                                                                  Job)
@@ -17,7 +19,7 @@ from pants.backend.jvm.tasks.jvm_compile.resource_mapping import ResourceMapping
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
 from pants.base.worker_pool import Work, WorkerPool
-from pants.util.dirutil import safe_mkdir, safe_walk
+from pants.util.dirutil import safe_atomic_open, safe_mkdir
 from pants.util.fileutil import atomic_copy
 
 
@@ -42,6 +44,8 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
     self._classes_dir = os.path.join(workdir, 'isolated-classes')
     self._logs_dir = os.path.join(workdir, 'isolated-logs')
 
+    self._scheduling_trace_file = os.path.join(workdir, 'isolated-scheduling-trace.json')
+
     self._capture_log = options.capture_log
 
     try:
@@ -56,6 +60,10 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
   def name(self):
     return 'isolated'
 
+  @property
+  def worker_count(self):
+    return self._worker_count
+
   def compile_context(self, target):
     analysis_file = JvmCompileStrategy._analysis_for_target(self._analysis_dir, target)
     classes_dir = os.path.join(self._classes_dir, target.id)
@@ -109,11 +117,11 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
     buildroot = get_buildroot()
     # Build a mapping of srcs to classes for each context.
     classes_by_src_by_context = defaultdict(dict)
+    classpath_index = ClasspathIndexSubsystem.global_instance().index
     for compile_context in compile_contexts:
-      # Walk the class directory to build a set of unclaimed classfiles.
-      unclaimed_classes = set()
-      for dirpath, _, filenames in safe_walk(compile_context.classes_dir):
-        unclaimed_classes.update(os.path.join(dirpath, f) for f in filenames)
+      # List the class directory to build a set of unclaimed classfiles.
+      unclaimed_classes = set(os.path.join(compile_context.classes_dir, cls)
+                              for cls in classpath_index.names(compile_context.classes_dir))
 
       # Grab the analysis' view of which classfiles were generated.
       classes_by_src = classes_by_src_by_context[compile_context]
@@ -130,13 +138,11 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
     return classes_by_src_by_context
 
   def _compute_classpath_entries(self, compile_classpaths,
-                                 target_closure,
                                  compile_context,
                                  extra_compile_time_classpath):
     # Generate a classpath specific to this compile and target.
     return ClasspathUtil.compute_classpath_for_target(compile_context.target, compile_classpaths,
-                                                      extra_compile_time_classpath, self._confs,
-                                                      target_closure)
+                                                      extra_compile_time_classpath, self._confs)
 
   def _upstream_analysis(self, compile_contexts, classpath_entries):
     """Returns tuples of classes_dir->analysis_file for the closure of the target."""
@@ -164,11 +170,10 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
   def _create_compile_jobs(self, compile_classpaths, compile_contexts, extra_compile_time_classpath,
                            invalid_targets, invalid_vts_partitioned, compile_vts, register_vts,
                            update_artifact_cache_vts_work):
-    def create_work_for_vts(vts, compile_context, target_closure):
+    def create_work_for_vts(vts, compile_context):
       def work():
         progress_message = compile_context.target.address.spec
         cp_entries = self._compute_classpath_entries(compile_classpaths,
-                                                     target_closure,
                                                      compile_context,
                                                      extra_compile_time_classpath)
 
@@ -204,6 +209,8 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
 
       return work
 
+    estimate_compile_duration = self._compile_duration_estimator(
+      [compile_contexts[vts.targets[0]] for vts in invalid_vts_partitioned])
     jobs = []
     invalid_target_set = set(invalid_targets)
     for vts in invalid_vts_partitioned:
@@ -218,14 +225,39 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
       invalid_dependencies = (compile_target_closure & invalid_target_set) - [compile_target]
 
       jobs.append(Job(self.exec_graph_key_for_target(compile_target),
-                      create_work_for_vts(vts, compile_context, compile_target_closure),
+                      create_work_for_vts(vts, compile_context),
                       [self.exec_graph_key_for_target(target) for target in invalid_dependencies],
                       # If compilation and analysis work succeeds, validate the vts.
                       # Otherwise, fail it.
                       on_success=vts.update,
-                      on_failure=vts.force_invalidate))
+                      on_failure=vts.force_invalidate,
+                      size=estimate_compile_duration(compile_context)))
     return jobs
 
+  def _compile_duration_estimator(self, compile_contexts):
+    """Returns a function estimating how long the given compile context will take to compile.
+
+    Targets compiled in previous runs are estimated from the run tracker's duration history.
+    Others are assumed to compile at the average rate per source of those targets, or if none have
+    history, are estimated by their number of sources: only the relative sizes of the estimates
+    matter.
+    """
+    run_tracker = self.context.run_tracker
+    known_secs = 0
+    known_sources = 0
+    for compile_context in compile_contexts:
+      estimate = run_tracker.estimate_target_duration(compile_context.target)
+      if estimate is not None:
+        known_secs += estimate
+        known_sources += max(1, len(compile_context.sources))
+    secs_per_source = known_secs / known_sources if known_sources else 1
+
+    def estimate_compile_duration(compile_context):
+      return run_tracker.estimate_target_duration(
+        compile_context.target,
+        default=secs_per_source * max(1, len(compile_context.sources)))
+    return estimate_compile_duration
+
   def compile_chunk(self,
                     invalidation_check,
                     all_targets,
@@ -257,9 +289,24 @@ class JvmCompileIsolatedStrategy(JvmCompileStrategy):
 
     exec_graph = ExecutionGraph(jobs)
     try:
-      exec_graph.execute(self._worker_pool, self.context.log)
+      exec_graph.execute(self._worker_pool, self.context.log, max_outstanding=self._worker_count)
     except ExecutionFailure as e:
       raise TaskError("Compilation failure: {}".format(e))
+    finally:
+      self._write_scheduling_trace(exec_graph)
+
+  def _write_scheduling_trace(self, exec_graph):
+    """Writes when each compile was run, so that schedules can be compared across runs."""
+    self.context.log.debug('Ran {} compile jobs in {:.3f}s with {} workers.'
+                           .format(len(exec_graph.trace), exec_graph.makespan or 0,
+                                   self._worker_count))
+    trace = {
+      'workers': self._worker_count,
+      'makespan': exec_graph.makespan,
+      'jobs': [job_trace._asdict() for job_trace in exec_graph.trace],
+    }
+    with safe_atomic_open(self._scheduling_trace_file) as fp:
+      json.dump(trace, fp, indent=2)
 
   def compute_resource_mapping(self, compile_contexts):
     return ResourceMapping(self._classes_dir)
@@ -81,6 +81,11 @@ class JvmCompileStrategy(object):
   def name(self):
     """A readable, unique name for this strategy."""
 
+  @property
+  def worker_count(self):
+    """The maximum number of compiles this strategy runs concurrently."""
+    return 1
+
   @abstractmethod
   def invalidation_hints(self, relevant_targets):
     """A tuple of partition_size_hint and locally_changed targets for the given inputs."""
@@ -0,0 +1,139 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import random
+import sys
+import time
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis import ZincAnalysis
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_parser import ZincAnalysisParser
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_tools import ZincAnalysisTools
+from pants.base.build_environment import get_buildroot
+from pants.util.contextutil import temporary_dir
+
+
+_NUM_SPLITS = 10
+_NUM_JARS = 200
+
+
+def write_synthetic_analysis(path, num_sources):
+  """Writes a zinc analysis of num_sources sources, with realistic numbers of items per source."""
+  rnd = random.Random(num_sources)
+  src_dir = os.path.join(get_buildroot(), 'src', 'scala', 'synthetic')
+  classes_dir = os.path.join(get_buildroot(), '.pants.d', 'compile', 'classes')
+  sources = [os.path.join(src_dir, 'Source{}.scala'.format(i)) for i in range(num_sources)]
+  jars = [os.path.join('/home/user/.ivy2/jars', 'lib{}.jar'.format(i)) for i in range(_NUM_JARS)]
+
+  def classes(src):
+    name = os.path.splitext(os.path.basename(src))[0]
+    return ['{}.class'.format(name), '{}$.class'.format(name), '{}$Inner.class'.format(name)]
+
+  def external_classes(src):
+    return ['lib.Class{}'.format(i) for i in sorted(rnd.sample(range(1000), 5))]
+
+  def blob(size):
+    return ''.join(rnd.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')
+                   for _ in range(size))
+
+  sections = []
+  def section(header, items):
+    sections.append((header, sorted(items)))
+
+  section('output mode', [('0', 'single')])
+  section('output directories', [('output dir', classes_dir)])
+  section('compile options', [('0', '-encoding'), ('1', 'UTF-8')])
+  section('javac options', [])
+  section('compiler version', [('0', '2.10.4')])
+  section('compile order', [('0', 'Mixed')])
+  section('name hashing', [('0', 'false')])
+  section('products', [(src, os.path.join(classes_dir, cls)) for src in sources
+                       for cls in classes(src)])
+  binary_deps = [(src, jar) for src in sources for jar in rnd.sample(jars, 3)]
+  section('binary dependencies', binary_deps)
+  section('direct source dependencies', [(src, dep) for src in sources
+                                         for dep in rnd.sample(sources, min(5, num_sources))])
+  external_deps = [(src, cls) for src in sources for cls in external_classes(src)]
+  section('direct external dependencies', external_deps)
+  for header in ('public inherited source dependencies', 'public inherited external dependencies',
+                 'member reference internal dependencies', 'member reference external dependencies',
+                 'inheritance internal dependencies', 'inheritance external dependencies'):
+    section(header, [])
+  section('class names', [(src, 'synthetic.{}'.format(os.path.basename(src)[:-6]))
+                          for src in sources])
+  section('used names', [])
+  section('product stamps', [(os.path.join(classes_dir, cls), 'lastModified(1430000000000)')
+                             for src in sources for cls in classes(src)])
+  section('source stamps', [(src, 'hash({})'.format(blob(40))) for src in sources])
+  section('binary stamps', [(jar, 'lastModified(1430000000000)')
+                            for jar in set(jar for _, jar in binary_deps)])
+  section('class names', [(jar, 'lib.Jar{}'.format(i)) for i, jar in enumerate(jars)])
+  section('internal apis', [(src, blob(2000)) for src in sources])
+  section('external apis', [(cls, blob(200)) for cls in set(cls for _, cls in external_deps)])
+  section('source infos', [(src, blob(100)) for src in sources])
+  section('compilations', [('0', blob(100))])
+
+  with open(path, 'wb') as outfile:
+    outfile.write(ZincAnalysis.FORMAT_VERSION_LINE)
+    for header, items in sections:
+      outfile.write('{}:\n{} items\n'.format(header, len(items)).encode('utf-8'))
+      for key, value in items:
+        outfile.write('{} -> {}\n'.format(key, value).encode('utf-8'))
+  return sources
+
+
+def benchmark(analysis_tools, analysis_path, sources, tmpdir):
+  """Returns the seconds taken to split the analysis into even splits and to merge them again."""
+  split_size = len(sources) // _NUM_SPLITS
+  split_path_pairs = [(sources[i * split_size:(i + 1) * split_size],
+                       os.path.join(tmpdir, 'split{}'.format(i))) for i in range(_NUM_SPLITS - 1)]
+  catchall_path = os.path.join(tmpdir, 'catchall')
+  start = time.time()
+  analysis_tools.split_to_paths(analysis_path, split_path_pairs, catchall_path)
+  split_secs = time.time() - start
+
+  start = time.time()
+  analysis_tools.merge_from_paths([path for _, path in split_path_pairs] + [catchall_path],
+                                  os.path.join(tmpdir, 'merged'))
+  merge_secs = time.time() - start
+  return split_secs, merge_secs
+
+
+def main():
+  """Benchmark splitting and merging synthetic zinc analysis files of increasing size.
+
+  Splits each analysis into ten and merges the splits back together, both a section at a time and,
+  for comparison, by parsing in full.  Track these numbers when changing either implementation,
+  since JvmCompileGlobalStrategy splits and merges analysis for every cache read and write.
+
+  To run:
+
+  ./pants run src/python/pants/backend/jvm/tasks/jvm_compile:benchmark_zinc_analysis -- \
+    [<num sources 1> <num sources 2> ...]
+
+  The default sizes are 1000, 4000 and 16000 sources, the largest of which is about 60MB.
+  """
+  sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 4000, 16000]
+  implementations = [
+    ('streaming', ZincAnalysisTools(None, ZincAnalysisParser(), ZincAnalysis)),
+    ('full parse', AnalysisTools(None, ZincAnalysisParser(), ZincAnalysis)),
+  ]
+  print('{:>8} {:>8} {:>12} {:>10} {:>10}'.format('sources', 'MB', 'impl', 'split(s)', 'merge(s)'))
+  for num_sources in sizes:
+    with temporary_dir() as tmpdir:
+      analysis_path = os.path.join(tmpdir, 'analysis')
+      sources = write_synthetic_analysis(analysis_path, num_sources)
+      size_mb = os.path.getsize(analysis_path) / (1024 * 1024)
+      for name, analysis_tools in implementations:
+        with temporary_dir(root_dir=tmpdir) as outdir:
+          split_secs, merge_secs = benchmark(analysis_tools, analysis_path, sources, outdir)
+        print('{:>8} {:>8.1f} {:>12} {:>10.2f} {:>10.2f}'.format(num_sources, size_mb, name,
+                                                                 split_secs, merge_secs))
+
+if __name__ == '__main__':
+  main()
@@ -16,6 +16,7 @@ from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
 from pants.backend.jvm.tasks.jvm_compile.jvm_compile import JvmCompile
 from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis import ZincAnalysis
 from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_parser import ZincAnalysisParser
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_tools import ZincAnalysisTools
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
 from pants.base.hash_utils import hash_file
@@ -74,6 +75,9 @@ class ZincCompile(JvmCompile):
              help='Map from plugin name to list of arguments for that plugin.')
     register('--name-hashing', action='store_true', default=False, fingerprint=True,
              help='Use zinc name hashing.')
+    register('--stream-analysis', advanced=True, action='store_true', default=True,
+             help='Split and merge analysis files a section at a time, rather than parsing them in '
+                  'full.')
 
     cls.register_jvm_tool(register,
                           'zinc',
@@ -102,6 +106,8 @@ class ZincCompile(JvmCompile):
     self._lazy_plugin_args = None
 
   def create_analysis_tools(self):
+    if self.get_options().stream_analysis:
+      return ZincAnalysisTools(self.context.java_home, ZincAnalysisParser(), ZincAnalysis)
     return AnalysisTools(self.context.java_home, ZincAnalysisParser(), ZincAnalysis)
 
   def zinc_classpath(self):
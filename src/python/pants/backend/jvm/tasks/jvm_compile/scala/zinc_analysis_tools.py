@@ -0,0 +1,303 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import heapq
+import os
+import re
+import shutil
+import tempfile
+from collections import defaultdict
+from contextlib import contextmanager
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_parser import ParseError
+from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
+from pants.base.build_environment import get_buildroot
+
+
+class ZincAnalysisTools(AnalysisTools):
+  """Splits and merges zinc analysis files without parsing them.
+
+  A zinc analysis file is a format version line followed by sections, each of which is a header
+  line, a '<num> items' line and that many 'key -> value' lines.  Splitting and merging only ever
+  needs the key of each line, so both are done a section at a time over the text, holding just the
+  sets of files needed to split the sections that are keyed by products, binaries or external
+  classes rather than by sources.  The underlying full parser is still used for everything else.
+  """
+
+  # Sections keyed by source file.  The 'class names' section of the relations is keyed by source,
+  # while the one of the stamps, which follows the binary stamps, is keyed by binary file.
+  _SOURCE_SECTIONS = frozenset([
+    b'products:\n',
+    b'binary dependencies:\n',
+    b'direct source dependencies:\n',
+    b'direct external dependencies:\n',
+    b'public inherited source dependencies:\n',
+    b'public inherited external dependencies:\n',
+    b'member reference internal dependencies:\n',
+    b'member reference external dependencies:\n',
+    b'inheritance internal dependencies:\n',
+    b'inheritance external dependencies:\n',
+    b'class names:\n',
+    b'used names:\n',
+    b'source stamps:\n',
+    b'internal apis:\n',
+    b'source infos:\n',
+  ])
+  # Sections that map each key to a single value, rather than relating it to any number of them.
+  # So is the 'class names' section that follows the binary stamps.
+  _MAP_SECTIONS = frozenset([
+    b'product stamps:\n',
+    b'source stamps:\n',
+    b'binary stamps:\n',
+    b'internal apis:\n',
+    b'external apis:\n',
+    b'source infos:\n',
+  ])
+  _PRODUCTS = b'products:\n'
+  _BINARY_DEPS = b'binary dependencies:\n'
+  _EXTERNAL_DEPS = frozenset([
+    b'direct external dependencies:\n',
+    b'public inherited external dependencies:\n',
+    b'member reference external dependencies:\n',
+    b'inheritance external dependencies:\n',
+  ])
+  _PRODUCT_STAMPS = b'product stamps:\n'
+  _BINARY_STAMPS = b'binary stamps:\n'
+  _BINARY_CLASS_NAMES = b'class names:\n'
+  _EXTERNAL_APIS = b'external apis:\n'
+
+  _num_items_re = re.compile(br'(\d+) items\n')
+  _separator = b' -> '
+
+  def split_to_paths(self, analysis_path, split_path_pairs, catchall_path=None):
+    splits, output_paths = zip(*split_path_pairs)
+    if catchall_path is not None:
+      output_paths = output_paths + (catchall_path, )
+    buildroot = get_buildroot()
+    outputs_by_source = defaultdict(list)
+    for i, split in enumerate(splits):
+      for src in split:
+        outputs_by_source[os.path.join(buildroot, src).encode('utf-8')].append(i)
+    catchall = [len(splits)] if catchall_path is not None else []
+
+    # The files that the sources of each output produce or depend on.
+    products = [set() for _ in output_paths]
+    binaries = [set() for _ in output_paths]
+    external_classes = [set() for _ in output_paths]
+
+    with open(analysis_path, 'rb') as infile:
+      with self._open_writers(output_paths) as writers:
+        version_line = self._read_line(infile)
+        for writer in writers:
+          writer.write_line(version_line)
+
+        after_binary_stamps = False
+        for header, items in self._sections(infile):
+          for writer in writers:
+            writer.begin_section(header)
+          if header == self._BINARY_STAMPS:
+            after_binary_stamps = True
+
+          if header in self._SOURCE_SECTIONS and not (after_binary_stamps and
+                                                      header == self._BINARY_CLASS_NAMES):
+            if header == self._PRODUCTS:
+              referenced = products
+            elif header == self._BINARY_DEPS:
+              referenced = binaries
+            elif header in self._EXTERNAL_DEPS:
+              referenced = external_classes
+            else:
+              referenced = None
+            for line in items:
+              key, value = self._split_line(line)
+              for i in outputs_by_source.get(key) or catchall:
+                writers[i].add_item(line)
+                if referenced is not None:
+                  referenced[i].add(value)
+          elif header in (self._PRODUCT_STAMPS, self._BINARY_STAMPS, self._BINARY_CLASS_NAMES,
+                          self._EXTERNAL_APIS):
+            if header == self._PRODUCT_STAMPS:
+              keys = products
+            elif header == self._EXTERNAL_APIS:
+              keys = external_classes
+            else:
+              keys = binaries
+            for line in items:
+              key, _ = self._split_line(line)
+              for i, writer in enumerate(writers):
+                if key in keys[i]:
+                  writer.add_item(line)
+          else:
+            # The compile setup and compilations apply to every output.
+            for line in items:
+              for writer in writers:
+                writer.add_item(line)
+
+          for writer in writers:
+            writer.end_section()
+
+  def merge_from_paths(self, analysis_paths, merged_analysis_path):
+    with self._open_readers(analysis_paths) as infiles:
+      with self._open_writers([merged_analysis_path]) as (writer, ):
+        version_lines = set(self._read_line(infile) for infile in infiles)
+        if len(version_lines) != 1:
+          raise ParseError('Cannot merge analyses of different formats: {}'.format(
+            ', '.join(sorted(version_lines))))
+        writer.write_line(version_lines.pop())
+
+        sections = [self._sections(infile) for infile in infiles]
+        after_binary_stamps = False
+        while True:
+          headers_and_items = [next(s, None) for s in sections]
+          if all(x is None for x in headers_and_items):
+            break
+          if any(x is None for x in headers_and_items):
+            raise ParseError('Cannot merge analyses with differing numbers of sections.')
+          headers, all_items = zip(*headers_and_items)
+          header = headers[0]
+          if any(h != header for h in headers):
+            raise ParseError('Cannot merge analyses with differing sections: {}'.format(
+              ', '.join(sorted(set(h.strip() for h in headers)))))
+
+          writer.begin_section(header)
+          if header == self._BINARY_STAMPS:
+            after_binary_stamps = True
+
+          # Zinc writes the items of each section in sorted order, so they can be merged lazily.
+          if header in self._MAP_SECTIONS or (after_binary_stamps and
+                                              header == self._BINARY_CLASS_NAMES):
+            for line in self._merge_map_items(all_items):
+              writer.add_item(line)
+          elif header in self._SOURCE_SECTIONS:
+            # A relation may relate a key to several values, so only identical items are dropped.
+            previous = None
+            for line in heapq.merge(*all_items):
+              if line != previous:
+                writer.add_item(line)
+              previous = line
+          else:
+            # The compile setup and compilations of all the analyses are the same.
+            for line in all_items[0]:
+              writer.add_item(line)
+          writer.end_section()
+
+  def _merge_map_items(self, all_items):
+    """Merges the sorted items of a section that maps each key to a single value.
+
+    Several analyses may have an item for the same key, such as the stamp of a binary they all
+    depend on, and their values may differ.  As when merging parsed analyses, the last one wins.
+    """
+    def keyed_items(index, items):
+      for line in items:
+        key, _ = self._split_line(line)
+        yield key, index, line
+
+    previous_key = previous_line = None
+    for key, _, line in heapq.merge(*[keyed_items(index, items)
+                                      for index, items in enumerate(all_items)]):
+      if previous_line is not None and key != previous_key:
+        yield previous_line
+      previous_key, previous_line = key, line
+    if previous_line is not None:
+      yield previous_line
+
+  @contextmanager
+  def _open_readers(self, paths):
+    infiles = []
+    try:
+      for path in paths:
+        infiles.append(open(path, 'rb'))
+      yield infiles
+    finally:
+      for infile in infiles:
+        infile.close()
+
+  @contextmanager
+  def _open_writers(self, paths):
+    writers = []
+    try:
+      for path in paths:
+        writers.append(_SectionWriter(open(path, 'wb')))
+      yield writers
+    finally:
+      for writer in writers:
+        writer.close()
+
+  def _sections(self, infile):
+    """Yields a (header, items) pair for each section of an analysis, where items is an iterator.
+
+    The remaining items of each section are skipped when the next section is requested.
+    """
+    while True:
+      header = infile.readline()
+      if not header:
+        return
+      if not header.endswith(b':\n'):
+        raise ParseError('Expected a section header in {}. Found: "{}"'.format(infile.name,
+                                                                               header))
+      num_items_line = self._read_line(infile)
+      matchobj = self._num_items_re.match(num_items_line)
+      if not matchobj:
+        raise ParseError('Expected: "<num> items" in {}. Found: "{}"'.format(infile.name,
+                                                                            num_items_line))
+      items = self._items(infile, int(matchobj.group(1)))
+      yield header, items
+      for _ in items:
+        pass
+
+  def _items(self, infile, num_items):
+    for _ in range(num_items):
+      yield self._read_line(infile)
+
+  def _read_line(self, infile):
+    line = infile.readline()
+    if not line:
+      raise ParseError('Unexpected end-of-file parsing {}'.format(infile.name))
+    return line
+
+  def _split_line(self, line):
+    key, sep, value = line.partition(self._separator)
+    if not sep:
+      raise ParseError('Expected: "<key> -> <value>". Found: "{}"'.format(line))
+    return key, value.rstrip(b'\n')
+
+
+class _SectionWriter(object):
+  """Writes an analysis file a section at a time.
+
+  The items of the current section are spooled to a temporary file, since the number of items,
+  which precedes them, is only known once they have all been added.
+  """
+
+  def __init__(self, outfile):
+    self._outfile = outfile
+    self._spool = tempfile.TemporaryFile()
+    self._header = None
+    self._num_items = 0
+
+  def write_line(self, line):
+    self._outfile.write(line)
+
+  def begin_section(self, header):
+    self._header = header
+    self._num_items = 0
+    self._spool.seek(0)
+    self._spool.truncate()
+
+  def add_item(self, line):
+    self._spool.write(line)
+    self._num_items += 1
+
+  def end_section(self):
+    self._outfile.write(self._header)
+    self._outfile.write(b'{} items\n'.format(self._num_items))
+    self._spool.seek(0)
+    shutil.copyfileobj(self._spool, self._outfile)
+
+  def close(self):
+    self._spool.close()
+    self._outfile.close()
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
 
 from pants.backend.core.tasks.task import Task, TaskBase
 from pants.backend.jvm.tasks.jvm_tool_task_mixin import JvmToolTaskMixin
@@ -13,7 +14,7 @@ from pants.base.exceptions import TaskError
 from pants.java import util
 from pants.java.distribution.distribution import Distribution
 from pants.java.executor import SubprocessExecutor
-from pants.java.nailgun_executor import NailgunExecutor, NailgunProcessGroup
+from pants.java.nailgun_executor import NailgunExecutorPool, NailgunProcessGroup
 
 
 class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
@@ -27,6 +28,18 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
              help='Use nailgun to make repeated invocations of this task quicker.')
     register('--nailgun-timeout-seconds', default=10, help='Timeout (secs) for nailgun startup.')
     register('--nailgun-connect-attempts', default=5, help='Max attempts for nailgun connects.')
+    register('--nailgun-pool-size', advanced=True, type=int, default=1,
+             help='The number of nailgun servers to run for this task, so that concurrent '
+                  'invocations each get a warm JVM.  Tasks that run java concurrently use at least '
+                  'as many servers as they have workers.')
+    register('--nailgun-max-servers', advanced=True, type=int, default=1,
+             help='The number of nailgun servers to keep warm for this task.  Raising it lets '
+                  'invocations alternating between classpaths or jvm options each reuse a server, '
+                  'at the cost of more resident JVMs.  The least recently used server is '
+                  'restarted when there would be more.  At least the pool size.')
+    register('--nailgun-idle-timeout-seconds', advanced=True, type=int, default=3600,
+             help='Kill the nailgun servers of this task that have been idle for this many '
+                  'seconds.')
 
   def __init__(self, *args, **kwargs):
     super(NailgunTaskBase, self).__init__(*args, **kwargs)
@@ -39,6 +52,10 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     self.set_distribution()    # Use default until told otherwise.
     # TODO: Choose default distribution based on options.
 
+    # Distribution -> NailgunExecutorPool, shared by all the invocations of this task.
+    self._nailgun_pools = {}
+    self._nailgun_pools_lock = threading.Lock()
+
   def set_distribution(self, minimum_version=None, maximum_version=None, jdk=False):
     try:
       self._dist = Distribution.cached(minimum_version=minimum_version,
@@ -46,19 +63,37 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     except Distribution.Error as e:
       raise TaskError(e)
 
+  @property
+  def nailgun_pool_size(self):
+    """The number of nailgun servers this task runs java in.
+
+    Subclasses that run java concurrently should override this to return at least their number of
+    concurrent invocations.
+    """
+    return self.get_options().nailgun_pool_size
+
   def create_java_executor(self):
-    """Create java executor that uses this task's ng daemon, if allowed.
+    """Create java executor that uses this task's pool of ng daemons, if allowed.
 
     Call only in execute() or later. TODO: Enforce this.
     """
     if self.get_options().use_nailgun:
-      classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
-      return NailgunExecutor(self._identity,
-                             self._executor_workdir,
-                             classpath,
-                             self._dist,
-                             connect_timeout=self.get_options().nailgun_timeout_seconds,
-                             connect_attempts=self.get_options().nailgun_connect_attempts)
+      with self._nailgun_pools_lock:
+        pool = self._nailgun_pools.get(self._dist)
+        if pool is None:
+          classpath = os.pathsep.join(self.tool_classpath('nailgun-server'))
+          pool = NailgunExecutorPool(self._identity,
+                                     self._executor_workdir,
+                                     classpath,
+                                     self._dist,
+                                     size=self.nailgun_pool_size,
+                                     max_servers=self.get_options().nailgun_max_servers,
+                                     idle_timeout=self.get_options().nailgun_idle_timeout_seconds,
+                                     stats=self.context.run_tracker.nailgun_stats,
+                                     connect_timeout=self.get_options().nailgun_timeout_seconds,
+                                     connect_attempts=self.get_options().nailgun_connect_attempts)
+          self._nailgun_pools[self._dist] = pool
+        return pool
     else:
       return SubprocessExecutor(self._dist)
 
@@ -67,8 +102,8 @@ class NailgunTaskBase(JvmToolTaskMixin, TaskBase):
     """Runs the java main using the given classpath and args.
 
     If --no-use-nailgun is specified then the java main is run in a freshly spawned subprocess,
-    otherwise a persistent nailgun server dedicated to this Task subclass is used to speed up
-    amortized run times.
+    otherwise one of a pool of persistent nailgun servers dedicated to this Task subclass is used to
+    speed up amortized run times.
     """
     executor = self.create_java_executor()
     try:
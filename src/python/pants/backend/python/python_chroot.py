@@ -13,6 +13,7 @@ from collections import defaultdict
 
 from pex.fetcher import Fetcher
 from pex.pex import PEX
+from pex.pex_info import PexInfo
 from pex.platforms import Platform
 from pex.resolver import resolve
 from twitter.common.collections import OrderedSet
@@ -23,6 +24,7 @@ from pants.backend.core.targets.dependencies import Dependencies
 from pants.backend.core.targets.prep_command import PrepCommand
 from pants.backend.python.antlr_builder import PythonAntlrBuilder
 from pants.backend.python.python_requirement import PythonRequirement
+from pants.backend.python.resolution_cache import ResolutionCache
 from pants.backend.python.targets.python_binary import PythonBinary
 from pants.backend.python.targets.python_library import PythonLibrary
 from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
@@ -30,7 +32,9 @@ from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.thrift_builder import PythonThriftBuilder
 from pants.base.build_environment import get_buildroot
 from pants.base.build_invalidator import BuildInvalidator, CacheKeyGenerator
-from pants.util.dirutil import safe_mkdir, safe_rmtree
+from pants.base.worker_pool import Work, WorkerPool
+from pants.base.workunit import WorkUnit
+from pants.util.dirutil import safe_mkdir, safe_rmtree, safe_walk
 
 
 logger = logging.getLogger(__name__)
@@ -172,13 +176,44 @@ class PythonChroot(object):
       target.walk(add_dep)
     return children
 
-  def dump(self):
+  def dump(self, requirements_layer=None):
+    """Dumps the sources and requirements of the targets into the chroot.
+
+    :param string requirements_layer: The path of a chroot dumped by `dump_requirements` for the
+      same requirements.  If specified, its distributions are linked into this chroot instead of
+      being resolved again.
+    """
     self.debug('Building chroot for {}:'.format(self._targets))
     targets = self.resolve(self._targets)
 
     for lib in targets['libraries'] | targets['binaries']:
       self._dump_library(lib)
 
+    if requirements_layer:
+      self._link_requirements_layer(requirements_layer)
+    else:
+      self._dump_requirements(targets)
+
+    if len(targets['binaries']) > 1:
+      print('WARNING: Target has multiple python_binary targets!', file=sys.stderr)
+
+    return self._builder
+
+  def dump_requirements(self):
+    """Dumps just the requirements of the targets, and the distributions that satisfy them."""
+    self.debug('Building requirements chroot for {}:'.format(self._targets))
+    self._dump_requirements(self.resolve(self._targets))
+    return self._builder
+
+  def requirements(self):
+    """Returns the requirements of the targets to resolve for this chroot's interpreter.
+
+    :returns: A pair of the set of :class:`PythonRequirement` objects to resolve, and the set of
+      additional paths to search for source packages during resolution.
+    """
+    return self._requirements(self.resolve(self._targets))
+
+  def _requirements(self, targets):
     generated_reqs = OrderedSet()
     if targets['thrifts']:
       for thr in set(targets['thrifts']):
@@ -204,10 +239,16 @@ class PythonChroot(object):
         self.debug('Skipping {} based upon version filter'.format(req))
         continue
       reqs_to_build.add(req)
-      self._dump_requirement(req.requirement)
       if req.repository:
         find_links.add(req.repository)
 
+    return reqs_to_build, find_links
+
+  def _dump_requirements(self, targets):
+    reqs_to_build, find_links = self._requirements(targets)
+    for req in reqs_to_build:
+      self._dump_requirement(req.requirement)
+
     distributions = self._resolve_multi(reqs_to_build, find_links)
 
     locations = set()
@@ -217,10 +258,21 @@ class PythonChroot(object):
           self._dump_distribution(dist)
         locations.add(dist.location)
 
-    if len(targets['binaries']) > 1:
-      print('WARNING: Target has multiple python_binary targets!', file=sys.stderr)
-
-    return self._builder
+  def _link_requirements_layer(self, requirements_layer):
+    self.debug('  Linking requirements from: {}'.format(requirements_layer))
+    layer_info = PexInfo.from_pex(requirements_layer)
+    for req in layer_info.requirements:
+      self._dump_requirement(req)
+
+    for dist_name, dist_hash in layer_info.distributions.items():
+      dist_relpath = os.path.join(layer_info.internal_cache, dist_name)
+      dist_dir = os.path.join(requirements_layer, dist_relpath)
+      for root, _, files in safe_walk(dist_dir):
+        for f in files:
+          path = os.path.join(root, f)
+          self._builder.chroot().link(path,
+                                      os.path.join(dist_relpath, os.path.relpath(path, dist_dir)))
+      self._builder.info.add_distribution(dist_name, dist_hash)
 
   def _resolve_multi(self, requirements, find_links):
     """Multi-platform dependency resolution for PEX files.
@@ -229,6 +281,9 @@ class PythonChroot(object):
        that must be included in order to satisfy them.  That may involve distributions for
        multiple platforms.
 
+       Resolves are remembered across chroots and runs, and the platforms that must be resolved
+       afresh are resolved concurrently.
+
        :param requirements: A list of :class:`PythonRequirement` objects to resolve.
        :param find_links: Additional paths to search for source packages during resolution.
     """
@@ -238,8 +293,21 @@ class PythonChroot(object):
     fetchers.extend(Fetcher([path]) for path in find_links)
     context = self._python_repos.get_network_context()
 
+    resolution_cache = ResolutionCache(
+      os.path.join(self._python_setup.resolver_cache_dir, 'resolutions'),
+      ttl=self._python_setup.resolver_cache_ttl)
+    fetcher_urls = self._python_repos.repos + self._python_repos.indexes
+    keys = {}
     for platform in platforms:
-      distributions[platform] = resolve(
+      keys[platform] = ResolutionCache.key([str(req.requirement) for req in requirements],
+                                           self._interpreter, platform, find_links, fetcher_urls)
+      resolved = resolution_cache.get(keys[platform])
+      if resolved is not None:
+        self.debug('Using the previous resolve for {}'.format(platform))
+        distributions[platform] = resolved
+
+    def resolve_for(platform):
+      resolved = resolve(
         requirements=[req.requirement for req in requirements],
         interpreter=self._interpreter,
         fetchers=fetchers,
@@ -247,5 +315,22 @@ class PythonChroot(object):
         context=context,
         cache=self._python_setup.resolver_cache_dir,
         cache_ttl=self._python_setup.resolver_cache_ttl)
+      resolution_cache.put(keys[platform], resolved)
+      return resolved
+
+    unresolved = [platform for platform in platforms if platform not in distributions]
+    if len(unresolved) > 1:
+      with self.context.new_workunit(name='resolve',
+                                     labels=[WorkUnit.MULTITOOL]) as workunit:
+        worker_pool = WorkerPool(workunit, self.context.run_tracker, len(unresolved))
+        try:
+          resolves = worker_pool.submit_work_and_wait(
+            Work(resolve_for, [(platform,) for platform in unresolved]), workunit_parent=workunit)
+        finally:
+          worker_pool.shutdown()
+      distributions.update(zip(unresolved, resolves))
+    else:
+      for platform in unresolved:
+        distributions[platform] = resolve_for(platform)
 
     return distributions
@@ -36,6 +36,10 @@ class PythonSetup(Subsystem):
     register('--chroot-cache-dir', advanced=True, default=None, metavar='<dir>',
              help='The parent directory for the chroot cache. '
                   'If unspecified, a standard path under the workdir is used.')
+    register('--chroot-cache-max-entries', advanced=True, type=int, default=100,
+             help='The maximum number of chroots to keep in the chroot cache, and separately the '
+                  'maximum number of requirement layers they are built from. The least recently '
+                  'used are deleted first.')
     register('--resolver-cache-dir', advanced=True, default=None, metavar='<dir>',
              help='The parent directory for the requirement resolver cache. '
                   'If unspecified, a standard path under the workdir is used.')
@@ -73,6 +77,10 @@ class PythonSetup(Subsystem):
     return (self.get_options().chroot_cache_dir or
             os.path.join(self.scratch_dir, 'chroots'))
 
+  @property
+  def chroot_cache_max_entries(self):
+    return self.get_options().chroot_cache_max_entries
+
   @property
   def resolver_cache_dir(self):
     return (self.get_options().resolver_cache_dir or
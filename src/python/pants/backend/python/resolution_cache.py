@@ -0,0 +1,118 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import json
+import logging
+import os
+import threading
+import time
+
+from pex.util import DistributionHelper
+
+from pants.base import hash_utils
+from pants.util.dirutil import safe_atomic_open
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutionCache(object):
+  """A persistent record of the distributions that sets of requirements resolved to.
+
+  Even when every distribution is already in the resolver cache, resolving requirements means
+  crawling for and checking candidates for each of them.  This cache instead maps a resolve's
+  inputs straight to the locations of the distributions it produced, which are reused until the
+  resolve is older than the ttl, or until any of the distributions has been deleted.
+  """
+
+  # Part of every key, so changing it orphans all persisted resolves.
+  VERSION = 1
+
+  # Resolves shared by all instances in this process, by cache dir and key.
+  _memo = {}
+  _memo_lock = threading.Lock()
+
+  @staticmethod
+  def key(requirements, interpreter, platform, find_links, fetcher_urls):
+    """Returns the key of a resolve of the given inputs.
+
+    :param requirements: The requirement strings to resolve.
+    :param interpreter: The PythonInterpreter to resolve for.
+    :param string platform: The platform to resolve for.
+    :param find_links: Additional paths searched for packages.
+    :param fetcher_urls: The urls of the repos and indexes searched for packages.
+    """
+    components = ['{}'.format(ResolutionCache.VERSION), str(interpreter.identity), platform]
+    for strs in (requirements, find_links, fetcher_urls):
+      components.append('\0'.join(sorted(strs)))
+    # Terminate each component, so that no two sets of inputs hash the same concatenation.
+    return hash_utils.hash_all(['{}\n'.format(component) for component in components])
+
+  def __init__(self, cache_dir, ttl=None):
+    """
+    :param string cache_dir: The directory to persist resolves in.
+    :param int ttl: The number of seconds after which a resolve is redone, or None to reuse
+      resolves for as long as their distributions exist.
+    """
+    self._cache_dir = cache_dir
+    self._ttl = ttl
+
+  def get(self, key):
+    """Returns the distributions a resolve with the given key produced, or None if unknown."""
+    memo_key = (self._cache_dir, key)
+    with self._memo_lock:
+      entry = self._memo.get(memo_key)
+    if entry is None:
+      entry = self._load(key)
+      if entry is None:
+        return None
+      with self._memo_lock:
+        self._memo[memo_key] = entry
+    resolved_at, distributions = entry
+    if self._ttl is not None and time.time() - resolved_at > self._ttl:
+      return None
+    return distributions
+
+  def put(self, key, distributions):
+    """Records the distributions that a resolve with the given key produced."""
+    resolved_at = time.time()
+    with self._memo_lock:
+      self._memo[(self._cache_dir, key)] = (resolved_at, list(distributions))
+    data = {'resolved_at': resolved_at,
+            'locations': [dist.location for dist in distributions]}
+    try:
+      with safe_atomic_open(self._path(key)) as fp:
+        json.dump(data, fp)
+    except (IOError, OSError) as e:
+      # The record is just an optimization for later runs.
+      logger.warn('Failed to persist the resolve {}: {}'.format(key, e))
+
+  def _path(self, key):
+    return os.path.join(self._cache_dir, '{}.json'.format(key))
+
+  def _load(self, key):
+    try:
+      with open(self._path(key), 'rb') as fp:
+        data = json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return None
+    except ValueError:
+      logger.warn('Ignoring corrupt resolve at {}'.format(self._path(key)))
+      return None
+
+    distributions = []
+    for location in data['locations']:
+      dist = (DistributionHelper.distribution_from_path(location)
+              if os.path.exists(location) else None)
+      if dist is None:
+        # The resolver cache was cleaned, so the requirements must be resolved again.
+        return None
+      distributions.append(dist)
+    return data['resolved_at'], distributions
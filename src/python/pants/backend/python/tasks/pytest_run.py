@@ -13,24 +13,30 @@ import shutil
 import subprocess
 import time
 import traceback
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
 from textwrap import dedent
+from xml.dom.minidom import getDOMImplementation
 
 from pex.pex_info import PexInfo
 from six import StringIO
 from six.moves import configparser
 
+from pants.backend.core.tasks.cached_test_results_mixin import CachedTestResultsMixin
 from pants.backend.python.python_requirement import PythonRequirement
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
+from pants.backend.python.targets.python_requirement_library import PythonRequirementLibrary
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.backend.python.tasks.python_task import PythonTask
 from pants.base.exceptions import TaskError, TestFailedTaskError
 from pants.base.target import Target
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnit
 from pants.util.contextutil import (environment_as, temporary_dir, temporary_file,
                                     temporary_file_path)
 from pants.util.dirutil import safe_mkdir, safe_open
 from pants.util.strutil import safe_shlex_split
+from pants.util.xml_parser import XmlParser
 
 
 # Initialize logging, since tests do not run via pants_exe (where it is usually done)
@@ -66,7 +72,7 @@ class PythonTestResult(object):
     return self._failed_targets
 
 
-class PytestRun(PythonTask):
+class PytestRun(CachedTestResultsMixin, PythonTask):
   _TESTING_TARGETS = [
     # Note: the requirement restrictions on pytest and pytest-cov match those in requirements.txt,
     # to avoid confusion when debugging pants tests.
@@ -85,14 +91,14 @@ class PytestRun(PythonTask):
   @classmethod
   def register_options(cls, register):
     super(PytestRun, cls).register_options(register)
-    register('--fast', action='store_true', default=True,
+    register('--fast', action='store_true', default=True, fingerprint=True,
              help='Run all tests in a single chroot. If turned off, each test target will '
                   'create a new chroot, which will be much slower, but more correct, as the'
                   'isolation verifies that all dependencies are correctly declared.')
     register('--fail-slow', action='store_true', default=False,
              help='Do not fail fast on the first test failure in a suite; instead run all tests '
                   'and report errors only after all tests complete.')
-    register('--junit-xml-dir', metavar='<DIR>',
+    register('--junit-xml-dir', metavar='<DIR>', fingerprint=True,
              help='Specifying a directory causes junit xml results files to be emitted under '
                   'that dir for each test run.')
     register('--profile', metavar='<FILE>',
@@ -107,6 +113,11 @@ class PytestRun(PythonTask):
     register('--shard',
              help='Subset of tests to run, in the form M/N, 0 <= M < N. For example, 1/3 means '
                   'run tests number 2, 5, 8, 11, ...')
+    register('--parallel-workers', type=int, default=1,
+             help='Run the tests of each target in its own pytest process, with up to this many '
+                  'processes running concurrently. Targets with the same interpreter and '
+                  'requirements share a chroot, and the junit xml reports of all processes are '
+                  'merged into one. Not supported with coverage.')
 
   @classmethod
   def supports_passthru_args(cls):
@@ -127,11 +138,47 @@ class PytestRun(PythonTask):
         # into thinking the terminal window is narrower than it is.
         cols = os.environ.get('COLUMNS', 80)
         with environment_as(COLUMNS=str(int(cols) - 30)):
-          self.run_tests(test_targets, workunit)
+          if self._cache_results:
+            def run_tests(results_dirs):
+              self.run_tests(list(results_dirs.keys()), workunit, results_dirs=results_dirs)
+            self.run_uncached_tests(test_targets, run_tests)
+          else:
+            self.run_tests(test_targets, workunit)
 
-  def run_tests(self, targets, workunit):
-    if self.get_options().fast:
-      result = self._do_run_tests(targets, workunit)
+  @property
+  def _cache_results(self):
+    # Only a run of all the tests of a target determines that it passed, and coverage must see
+    # every test run.
+    options = self.get_options()
+    return not (options.coverage or options.shard or options.options or self.get_passthru_args())
+
+  def test_environment_fingerprint(self, target):
+    return str(self.select_interpreter_for_targets([target]).identity)
+
+  def replay_test_results(self, target, results_dir):
+    junit_xml = self._junit_xml_path([target])
+    if junit_xml:
+      stored_junit_xml = os.path.join(results_dir, os.path.basename(junit_xml))
+      if os.path.exists(stored_junit_xml):
+        safe_mkdir(os.path.dirname(junit_xml))
+        shutil.copy(stored_junit_xml, junit_xml)
+
+  def run_tests(self, targets, workunit, results_dirs=None):
+    """Runs the tests of the targets.
+
+    :param results_dirs: An optional map from each target to the dir to store its results in, if its
+      tests all pass.
+    """
+    if self.get_options().parallel_workers > 1:
+      if self.get_options().coverage:
+        # Concurrent processes would all write to the same coverage data file.
+        raise TaskError('--parallel-workers is not supported with --coverage. Run with '
+                        '--parallel-workers=1 to collect coverage.')
+      result = self._do_run_tests_in_parallel(targets, workunit, results_dirs)
+      if not result.success:
+        raise TestFailedTaskError(failed_targets=result.failed_targets)
+    elif self.get_options().fast:
+      result = self._do_run_tests(targets, workunit, results_dirs)
       if not result.success:
         raise TestFailedTaskError(failed_targets=result.failed_targets)
     else:
@@ -140,7 +187,7 @@ class PytestRun(PythonTask):
       fail_hard = not self.get_options().fail_slow and not self.get_options().coverage
       for target in targets:
         if isinstance(target, PythonTests):
-          rv = self._do_run_tests([target], workunit)
+          rv = self._do_run_tests([target], workunit, results_dirs)
           results[target] = rv
           if not rv.success and fail_hard:
             break
@@ -205,13 +252,18 @@ class PytestRun(PythonTask):
         """.format(shard=shard, total=total)))
       yield [path]
 
-  @contextmanager
-  def _maybe_emit_junit_xml(self, targets):
-    args = []
+  def _junit_xml_path(self, targets):
     xml_base = self.get_options().junit_xml_dir
     if xml_base and targets:
       xml_base = os.path.realpath(xml_base)
-      xml_path = os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
+      return os.path.join(xml_base, Target.maybe_readable_identify(targets) + '.xml')
+    return None
+
+  @contextmanager
+  def _maybe_emit_junit_xml(self, targets):
+    args = []
+    xml_path = self._junit_xml_path(targets)
+    if xml_path:
       safe_mkdir(os.path.dirname(xml_path))
       args.append('--junitxml={}'.format(xml_path))
     yield args
@@ -400,8 +452,8 @@ class PytestRun(PythonTask):
           pex_run(args=['xml', '-i', '--rcfile', coverage_rc, '-o', coverage_xml])
 
   @contextmanager
-  def _test_runner(self, targets, workunit):
-    interpreter = self.select_interpreter_for_targets(targets)
+  def _test_chroot(self, targets, interpreter=None):
+    interpreter = interpreter or self.select_interpreter_for_targets(targets)
     pex_info = PexInfo.default()
     pex_info.entry_point = 'pytest'
 
@@ -410,6 +462,11 @@ class PytestRun(PythonTask):
                             targets=targets,
                             platforms=('current',),
                             extra_requirements=self._TESTING_TARGETS) as chroot:
+      yield chroot
+
+  @contextmanager
+  def _test_runner(self, targets, workunit):
+    with self._test_chroot(targets) as chroot:
       pex = chroot.pex()
       with self._maybe_shard() as shard_args:
         with self._maybe_emit_junit_xml(targets) as junit_args:
@@ -432,9 +489,10 @@ class PytestRun(PythonTask):
       profile = self.get_options().profile
       if profile:
         env['PEX_PROFILE'] = '{0}.subprocess.{1:.6f}'.format(profile, time.time())
-      with environment_as(**env):
-        rc = self._pex_run(pex, workunit, args=args, setsid=True)
-        return PythonTestResult.rc(rc)
+      # Passed to the process rather than set in our own environment, as tests may run in
+      # concurrent threads.
+      rc = self._pex_run(pex, workunit, args=args, setsid=True, env=env)
+      return PythonTestResult.rc(rc)
     except Exception:
       self.context.log.error('Failed to run test!')
       self.context.log.info(traceback.format_exc())
@@ -461,7 +519,36 @@ class PytestRun(PythonTask):
 
     return list(failed_targets)
 
-  def _do_run_tests(self, targets, workunit):
+  # The resultlog codes of passed, skipped, xfailed and xpassed tests.
+  RESULTLOG_PASSED_CODES = frozenset(['.', 's', 'x', 'X'])
+
+  def _store_passing_results(self, targets, resultlog_path, results_dirs, junit_xml=None):
+    """Stores the resultlog entries of each target whose tests all ran and passed.
+
+    :param junit_xml: The junit xml report of the run, if it only ran the tests of a single target.
+    """
+    entries_by_source = defaultdict(list)
+    with open(resultlog_path, 'r') as fp:
+      for line in fp:
+        # The lines of a test's failure report are indented under its entry.
+        if line.startswith(' '):
+          continue
+        code, _, test = line.rstrip('\n').partition(' ')
+        entries_by_source[test.split('::')[0]].append((code, line))
+
+    for target in targets:
+      entries = list(itertools.chain.from_iterable(
+        entries_by_source[source] for source in target.sources_relative_to_buildroot()))
+      if entries and all(code in self.RESULTLOG_PASSED_CODES for code, _ in entries):
+        results_dir = results_dirs[target]
+        with safe_open(os.path.join(results_dir, 'resultlog'), 'w') as fp:
+          fp.writelines(line for _, line in entries)
+        if junit_xml and os.path.exists(junit_xml):
+          # Stored under the name a run of just this target reports to, for replay.
+          shutil.copy(junit_xml,
+                      os.path.join(results_dir, os.path.basename(self._junit_xml_path([target]))))
+
+  def _do_run_tests(self, targets, workunit, results_dirs=None):
 
     def _extract_resultlog_filename(args):
       resultlogs = [arg[arg.find('=') + 1:] for arg in args if arg.startswith('--resultlog=')]
@@ -487,16 +574,13 @@ class PytestRun(PythonTask):
 
       def run_and_analyze(resultlog_path):
         result = self._do_run_tests_with_args(pex, workunit, args)
+        if results_dirs is not None:
+          junit_xml = self._junit_xml_path(targets) if len(targets) == 1 else None
+          self._store_passing_results(targets, resultlog_path, results_dirs, junit_xml=junit_xml)
         failed_targets = self._get_failed_targets_from_resultlogs(resultlog_path, targets)
         return result.with_failed_targets(failed_targets)
 
-      args = []
-      if self._debug:
-        args.extend(['-s'])
-      if self.get_options().colors:
-        args.extend(['--color', 'yes'])
-      for options in self.get_options().options + self.get_passthru_args():
-        args.extend(safe_shlex_split(options))
+      args = self._pytest_args()
       args.extend(test_args)
       args.extend(sources)
 
@@ -510,12 +594,142 @@ class PytestRun(PythonTask):
           args.insert(0, '--resultlog={0}'.format(resultlog_path))
           return run_and_analyze(resultlog_path)
 
-  def _pex_run(self, pex, workunit, args, setsid=False):
+  def _pytest_args(self):
+    args = []
+    if self._debug:
+      args.extend(['-s'])
+    if self.get_options().colors:
+      args.extend(['--color', 'yes'])
+    for options in self.get_options().options + self.get_passthru_args():
+      args.extend(safe_shlex_split(options))
+    return args
+
+  def _do_run_tests_in_parallel(self, targets, workunit, results_dirs=None):
+    """Runs the tests of each target in its own pytest process, up to --parallel-workers at once.
+
+    The chroots are built first, one for each group of targets with the same interpreter and
+    transitive requirements, so that targets which could share a chroot do.  The targets whose
+    tests took longest in previous runs are started first.
+    """
+    targets = [target for target in targets if target.sources_relative_to_buildroot()]
+    if not targets:
+      return PythonTestResult.rc(0)
+
+    groups = OrderedDict()
+    interpreters = {}
+    for target in targets:
+      interpreter = self.select_interpreter_for_targets([target])
+      requirements = frozenset(t for t in target.closure()
+                               if isinstance(t, PythonRequirementLibrary))
+      key = (str(interpreter.identity), requirements)
+      interpreters[key] = interpreter
+      groups.setdefault(key, []).append(target)
+
+    pexes = {}
+    for key, group in groups.items():
+      with self._test_chroot(group, interpreter=interpreters[key]) as chroot:
+        pex = chroot.pex()
+      for target in group:
+        pexes[target] = pex
+
+    with temporary_dir() as reports_dir:
+      def report_file(target, suffix):
+        return os.path.join(reports_dir, '{0}.{1}'.format(target.id, suffix))
+
+      junit_xml = self._junit_xml_path(targets)
+
+      def run_target(target):
+        args = ['--resultlog={0}'.format(report_file(target, 'resultlog'))]
+        if junit_xml:
+          args.append('--junitxml={0}'.format(report_file(target, 'xml')))
+        with self.context.new_workunit(name=target.id, labels=[WorkUnit.TOOL, WorkUnit.TEST],
+                                       targets=[target]) as target_workunit:
+          with self._maybe_shard() as shard_args:
+            args.extend(shard_args)
+            args.extend(self._pytest_args())
+            args.extend(target.sources_relative_to_buildroot())
+            return self._do_run_tests_with_args(pexes[target], target_workunit, args)
+
+      parallel_workers = self.get_options().parallel_workers
+      self.context.log.info('Running the tests of {0} targets in up to {1} concurrent processes.'
+                            .format(len(targets), parallel_workers))
+      with self.context.new_workunit(name='parallel-run',
+                                     labels=[WorkUnit.MULTITOOL]) as parallel_workunit:
+        # Start the targets whose tests took longest in previous runs first, so that they don't
+        # hold up the end of the run.
+        run_tracker = self.context.run_tracker
+        scheduled = sorted(targets, reverse=True,
+                           key=lambda t: run_tracker.estimate_target_duration(t, default=0))
+        worker_pool = WorkerPool(parallel_workunit, run_tracker, parallel_workers)
+        try:
+          results = worker_pool.submit_work_and_wait(Work(run_target, [(t,) for t in scheduled]),
+                                                     workunit_parent=parallel_workunit)
+        finally:
+          worker_pool.shutdown()
+        results = dict(zip(scheduled, results))
+
+      merged_resultlog = os.path.join(reports_dir, 'merged.resultlog')
+      with open(merged_resultlog, 'w') as merged:
+        for target in targets:
+          resultlog = report_file(target, 'resultlog')
+          if os.path.exists(resultlog):
+            with open(resultlog, 'r') as fp:
+              shutil.copyfileobj(fp, merged)
+            if results_dirs is not None:
+              self._store_passing_results([target], resultlog, results_dirs,
+                                          junit_xml=junit_xml and report_file(target, 'xml'))
+      if junit_xml:
+        self._merge_junit_xml([report_file(target, 'xml') for target in targets], junit_xml)
+
+      failed_targets = set(self._get_failed_targets_from_resultlogs(merged_resultlog, targets))
+      # A process may also fail without reporting any failed test, e.g., if collection errors.
+      failed_targets.update(target for target, result in results.items() if not result.success)
+
+    if failed_targets:
+      return PythonTestResult.rc(1).with_failed_targets(list(failed_targets))
+    return PythonTestResult.rc(0)
+
+  _JUNIT_XML_COUNTS = ('tests', 'failures', 'errors', 'skips')
+
+  def _merge_junit_xml(self, reports, merged_report):
+    """Merges junit xml reports into a single testsuite of all their testcases."""
+    document = getDOMImplementation().createDocument(None, 'testsuite', None)
+    merged = document.documentElement
+    counts = dict((attribute, 0) for attribute in self._JUNIT_XML_COUNTS)
+    total_time = 0.0
+    for report in reports:
+      if not os.path.exists(report):
+        continue
+      try:
+        xml = XmlParser.from_file(report)
+      except XmlParser.XmlError as e:
+        self.context.log.error('Error parsing test result file {0}: {1}'.format(report, e))
+        continue
+      for testsuite in xml.parsed.getElementsByTagName('testsuite'):
+        for attribute in self._JUNIT_XML_COUNTS:
+          counts[attribute] += int(testsuite.getAttribute(attribute) or 0)
+        total_time += float(testsuite.getAttribute('time') or 0)
+        for child in testsuite.childNodes:
+          if child.nodeType == child.ELEMENT_NODE:
+            merged.appendChild(document.importNode(child, True))
+    merged.setAttribute('name', '')
+    for attribute, count in counts.items():
+      merged.setAttribute(attribute, str(count))
+    merged.setAttribute('time', '{0:.3f}'.format(total_time))
+    with safe_open(merged_report, 'wb') as fp:
+      fp.write(document.toxml(encoding='utf-8'))
+
+  def _pex_run(self, pex, workunit, args, setsid=False, env=None):
     # NB: We don't use pex.run(...) here since it makes a point of running in a clean environment,
     # scrubbing all `PEX_*` environment overrides and we use overrides when running pexes in this
     # task.
+    process_env = None
+    if env:
+      process_env = os.environ.copy()
+      process_env.update(env)
     process = subprocess.Popen(pex.cmdline(args),
                                preexec_fn=os.setsid if setsid else None,
+                               env=process_env,
                                stdout=workunit.output('stdout'),
                                stderr=workunit.output('stderr'))
     return process.wait()
@@ -5,9 +5,11 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import errno
 import os
 import shutil
 import tempfile
+import time
 from contextlib import contextmanager
 
 from pex.pex_builder import PEXBuilder
@@ -20,6 +22,7 @@ from pants.backend.python.python_chroot import PythonChroot
 from pants.backend.python.python_setup import PythonRepos, PythonSetup
 from pants.base import hash_utils
 from pants.base.exceptions import TaskError
+from pants.util.dirutil import safe_rmtree
 
 
 class PythonTask(Task):
@@ -35,6 +38,8 @@ class PythonTask(Task):
     self._compatibilities = self.get_options().interpreter or [b'']
     self._interpreter_cache = None
     self._interpreter = None
+    # The paths of the cached chroots and requirements layers this task has used.
+    self._used_chroots = set()
 
   @property
   def interpreter_cache(self):
@@ -103,9 +108,9 @@ class PythonTask(Task):
                     extra_requirements=None, executable_file_content=None):
     """Returns a cached PythonChroot created with the specified args.
 
-    The returned chroot will be cached for future use.
+    The returned chroot will be cached for future use.  Cached chroots, and the requirements layers
+    they link in, are evicted least recently used first.
 
-    TODO: Garbage-collect old chroots, so they don't pile up?
     TODO: Ideally chroots would just be products produced by some other task. But that's
           a bit too complicated to implement right now, as we'd need a way to request
           chroots for a variety of sets of targets.
@@ -121,6 +126,11 @@ class PythonTask(Task):
       self._build_chroot(path_tmp, interpreter, pex_info, targets, platforms,
                          extra_requirements, executable_file_content)
       shutil.move(path_tmp, path)
+      self._mark_used(path)
+      self._evict_least_recently_used(os.path.dirname(path))
+      self._reclaim_old_format_chroots()
+    else:
+      self._mark_used(path)
 
     # We must read the PexInfo that was frozen into the pex, so we get the modifications
     # created when that pex was built.
@@ -165,7 +175,9 @@ class PythonTask(Task):
         targets=targets,
         platforms=platforms,
         extra_requirements=extra_requirements)
-      chroot.dump()
+      requirements_layer = self._requirements_layer(chroot, interpreter, targets, platforms,
+                                                    extra_requirements)
+      chroot.dump(requirements_layer=requirements_layer)
       if executable_file_content is not None:
         with open(os.path.join(path, '{}.py'.format(self.CHROOT_EXECUTABLE_NAME)), 'w') as outfile:
           outfile.write(executable_file_content)
@@ -176,14 +188,91 @@ class PythonTask(Task):
       builder.freeze()
     return chroot
 
-  def _chroot_path(self, python_setup, interpreter, pex_info, targets, platforms,
-                   extra_requirements, executable_file_content):
-    """Pick a unique, well-known directory name for the chroot with the specified parameters.
+  def _requirements_layer(self, chroot, interpreter, targets, platforms, extra_requirements):
+    """Returns the path of a chroot of just the requirements of the given chroot.
 
-    TODO: How many of these do we expect to have? Currently they are all under a single
-    directory, and some filesystems (E.g., HFS+) don't handle directories with thousands of
-    entries well. GC'ing old chroots may be enough of a solution, assuming this is even a problem.
+    Resolving requirements is the slow part of building a chroot, so chroots link in the
+    distributions of a requirements layer that is keyed only by the requirements and what they are
+    resolved for.  Edits to the sources of targets then only need a new chroot of their sources.
+    The layer is built if needed, and rebuilt once older than the resolver cache ttl, so that
+    open-ended requirements are eventually re-resolved.
     """
+    python_setup = PythonSetup.global_instance()
+    python_repos = PythonRepos.global_instance()
+    requirements, find_links = chroot.requirements()
+    fingerprint_components = [str(interpreter.identity)]
+    fingerprint_components.extend(platforms or python_setup.platforms)
+    fingerprint_components.extend(python_repos.repos)
+    fingerprint_components.extend(python_repos.indexes)
+    fingerprint_components.extend(sorted(str(req.requirement) for req in requirements))
+    fingerprint_components.extend(sorted(find_links))
+    fingerprint = hash_utils.hash_all(fingerprint_components)
+    path = os.path.join(self.chroot_cache_dir, 'requirements', fingerprint)
+
+    pex_info_file = os.path.join(path, PexInfo.PATH)
+    if (not os.path.exists(pex_info_file) or
+        time.time() - os.path.getmtime(pex_info_file) > python_setup.resolver_cache_ttl):
+      path_tmp = path + '.tmp'
+      safe_rmtree(path_tmp)
+      builder = PEXBuilder(path=path_tmp, interpreter=interpreter)
+      layer = PythonChroot(
+        context=self.context,
+        python_setup=python_setup,
+        python_repos=python_repos,
+        interpreter=interpreter,
+        builder=builder,
+        targets=targets,
+        platforms=platforms,
+        extra_requirements=extra_requirements)
+      layer.dump_requirements()
+      builder.freeze(bytecode_compile=False)
+      safe_rmtree(path)
+      shutil.move(path_tmp, path)
+      self._mark_used(path)
+      self._evict_least_recently_used(os.path.dirname(path))
+    else:
+      self._mark_used(path)
+    return path
+
+  def _mark_used(self, path):
+    # Entries of the chroot cache are evicted least recently used first.
+    os.utime(path, None)
+    self._used_chroots.add(path)
+
+  def _evict_least_recently_used(self, cache_dir):
+    """Deletes all but the most recently used entries of a chroot cache dir.
+
+    The entries this task has used are kept regardless, since a task may build several chroots
+    before using any of them, e.g., to run tests in each concurrently.
+    """
+    def last_used(name):
+      try:
+        return os.path.getmtime(os.path.join(cache_dir, name))
+      except OSError as e:
+        # A concurrent run may have evicted it.
+        if e.errno != errno.ENOENT:
+          raise
+        return None
+
+    entries = [(last_used(name), name) for name in os.listdir(cache_dir)]
+    entries = sorted((entry for entry in entries if entry[0] is not None), reverse=True)
+    for _, name in entries[PythonSetup.global_instance().chroot_cache_max_entries:]:
+      path = os.path.join(cache_dir, name)
+      if path not in self._used_chroots:
+        safe_rmtree(path)
+
+  def _reclaim_old_format_chroots(self):
+    """Deletes the chroots that were cached directly under the chroot cache dir.
+
+    Chroots used to be cached there, rather than in a dir per layer, so are never evicted.
+    """
+    for name in os.listdir(self.chroot_cache_dir):
+      if name not in ('requirements', 'sources'):
+        safe_rmtree(os.path.join(self.chroot_cache_dir, name))
+
+  def _chroot_path(self, python_setup, interpreter, pex_info, targets, platforms,
+                   extra_requirements, executable_file_content):
+    """Pick a unique, well-known directory name for the chroot with the specified parameters."""
     fingerprint_components = [str(interpreter.identity)]
     if pex_info:
       fingerprint_components.append(pex_info.dump())
@@ -196,4 +285,4 @@ class PythonTask(Task):
       fingerprint_components.append(executable_file_content)
 
     fingerprint = hash_utils.hash_all(fingerprint_components)
-    return os.path.join(self.chroot_cache_dir, fingerprint)
+    return os.path.join(self.chroot_cache_dir, 'sources', fingerprint)
@@ -12,12 +12,17 @@ from pants.util.meta import AbstractClass
 class AddressableCallProxy(object):
   """A registration proxy for objects to be captured and addressed from BUILD files."""
 
-  def __init__(self, addressable_type, build_file, registration_callback):
+  def __init__(self, addressable_type, build_file, registration_callback, alias=None,
+               call_recorder=None):
     self._addressable_type = addressable_type
     self._build_file = build_file
     self._registration_callback = registration_callback
+    self._alias = alias
+    self._call_recorder = call_recorder
 
   def __call__(self, *args, **kwargs):
+    if self._call_recorder:
+      self._call_recorder(self._alias, args, kwargs)
     addressable = self._addressable_type(*args, **kwargs)
     addressable_name = addressable.addressable_name
     if addressable_name:
@@ -23,7 +23,8 @@ class BuildConfiguration(object):
   that can operate on the targets defined in them.
   """
 
-  ParseState = namedtuple('ParseState', ['registered_addressable_instances', 'parse_globals'])
+  ParseState = namedtuple('ParseState', ['registered_addressable_instances', 'parse_globals',
+                                         'parse_context'])
 
   @staticmethod
   def _is_target_type(obj):
@@ -136,8 +137,12 @@ class BuildConfiguration(object):
       raise TypeError('The given context aware object factory {factory} must be a callable.'
                       .format(factory=context_aware_object_factory))
 
-  def initialize_parse_state(self, build_file):
-    """Creates a fresh parse state for the given build file."""
+  def initialize_parse_state(self, build_file, call_recorder=None):
+    """Creates a fresh parse state for the given build file.
+
+    :param call_recorder: An optional callable that is passed the alias, args and kwargs of each
+      addressable call made while parsing, before the addressable is constructed.
+    """
     type_aliases = self._exposed_objects.copy()
 
     registered_addressable_instances = []
@@ -147,7 +152,9 @@ class BuildConfiguration(object):
     for alias, addressable_type in self._addressable_alias_map.items():
       call_proxy = AddressableCallProxy(addressable_type=addressable_type,
                                         build_file=build_file,
-                                        registration_callback=registration_callback)
+                                        registration_callback=registration_callback,
+                                        alias=alias,
+                                        call_recorder=call_recorder)
       type_aliases[alias] = call_proxy
 
     parse_context = ParseContext(rel_path=build_file.spec_path, type_aliases=type_aliases)
@@ -156,4 +163,4 @@ class BuildConfiguration(object):
     for alias, object_factory in self._exposed_context_aware_object_factories.items():
       parse_globals[alias] = object_factory(parse_context)
 
-    return self.ParseState(registered_addressable_instances, parse_globals)
+    return self.ParseState(registered_addressable_instances, parse_globals, parse_context)
@@ -87,33 +87,23 @@ class BuildFile(AbstractClass):
         if exclude:
           if not os.path.isabs(exclude):
             exclude = os.path.join(root_dir, exclude)
+          exclude = os.path.normpath(exclude)
           if exclude.startswith(root_dir):
             result[os.path.dirname(exclude)].add(os.path.basename(exclude))
 
       return result
 
-    def find_excluded(root, dirs, exclude_roots):
-      """Removes any of the directories specified in exclude_roots from dirs.
-      """
-      to_remove = []
-      for exclude_root in exclude_roots:
-        # root ends with a /, trim it off
-        if root.rstrip('/') == exclude_root:
-          for subdir in exclude_roots[exclude_root]:
-            if subdir in dirs:
-              to_remove.append(subdir)
-      return to_remove
-
     buildfiles = []
     if not spec_excludes:
       exclude_roots = {}
     else:
-      exclude_roots = calc_exclude_roots(root_dir, spec_excludes)
+      exclude_roots = calc_exclude_roots(os.path.normpath(root_dir), spec_excludes)
 
     for root, dirs, files in cls._walk(root_dir, base_path or '', topdown=True):
-      to_remove = find_excluded(root, dirs, exclude_roots)
-      for subdir in to_remove:
-        dirs.remove(subdir)
+      # A single lookup per directory, rather than a scan of every exclude root.
+      excluded = exclude_roots.get(os.path.normpath(root))
+      if excluded:
+        dirs[:] = [d for d in dirs if d not in excluded]
       for filename in files:
         if cls._is_buildfile_name(filename):
           buildfile_relpath = os.path.relpath(os.path.join(root, filename), root_dir)
@@ -46,20 +46,27 @@ class BuildFileAddressMapper(object):
   class BuildFileScanError(AddressLookupError):
     """ Raised when a problem was encountered scanning a tree of BUILD files."""
 
-  def __init__(self, build_file_parser, build_file_type):
+  def __init__(self, build_file_parser, build_file_type, scan_workers=1):
     """Create a BuildFileAddressMapper.
 
     :param build_file_parser: An instance of BuildFileParser
     :param build_file_type: A subclass of BuildFile used to construct and cache BuildFile objects
+    :param int scan_workers: The number of processes to execute BUILD files in when scanning many
+      BUILD files at once.
     """
     self._build_file_parser = build_file_parser
     self._spec_path_to_address_map_map = {}  # {spec_path: {address: addressable}} mapping
     self._build_file_type = build_file_type
+    self._scan_workers = scan_workers
 
   @property
   def root_dir(self):
     return self._build_file_parser.root_dir
 
+  def registered_aliases(self):
+    """Returns the build file aliases that BUILD files are parsed with."""
+    return self._build_file_parser.registered_aliases()
+
   def _raise_incorrect_address_error(self, build_file, wrong_target_name, targets):
     """Search through the list of targets and return those which originate from the same folder
     which wrong_target_name resides in.
@@ -131,7 +138,7 @@ class BuildFileAddressMapper(object):
     _, addressable = self.resolve(address)
     return addressable
 
-  def _address_map_from_spec_path(self, spec_path):
+  def _address_map_from_spec_path(self, spec_path, recorders=None):
     """Returns a resolution map of all addresses in a "directory" in the virtual address space.
 
     :returns {Address: (Address, <resolved Object>)}:
@@ -144,7 +151,8 @@ class BuildFileAddressMapper(object):
           raise self.BuildFileScanError("{message}\n searching {spec_path}"
                                         .format(message=e,
                                                 spec_path=spec_path))
-        mapping = self._build_file_parser.address_map_from_build_file(build_file)
+        mapping = self._build_file_parser.address_map_from_build_file(build_file,
+                                                                      recorders=recorders)
       except BuildFileParser.BuildFileParserError as e:
         raise AddressLookupError("{message}\n Loading addresses from '{spec_path}' failed."
                                  .format(message=e, spec_path=spec_path))
@@ -153,6 +161,32 @@ class BuildFileAddressMapper(object):
       self._spec_path_to_address_map_map[spec_path] = address_map
     return self._spec_path_to_address_map_map[spec_path]
 
+  def prefetch_build_files(self, build_files):
+    """Parses the given BUILD files in parallel, ahead of their addresses being looked up.
+
+    This is a no-op unless the mapper was configured with more than one scan worker.  BUILD files
+    that fail to parse are skipped; their errors are raised when their addresses are looked up.
+
+    :param build_files: An iterable of BuildFile instances, e.g., as returned by `scan_buildfiles`.
+    """
+    if self._scan_workers <= 1:
+      return
+    families = {}
+    for build_file in build_files:
+      if build_file.spec_path not in self._spec_path_to_address_map_map:
+        families.setdefault(build_file.spec_path, build_file)
+    if len(families) <= 1:
+      return
+
+    recorded = self._build_file_parser.record_build_file_families(families.values(),
+                                                                  workers=self._scan_workers)
+    for spec_path, recorders in recorded.items():
+      if recorders is not None:
+        try:
+          self._address_map_from_spec_path(spec_path, recorders=recorders)
+        except AddressLookupError:
+          pass
+
   def addresses_in_spec_path(self, spec_path):
     """Returns only the addresses gathered by `address_map_from_spec_path`, with no values."""
     return self._address_map_from_spec_path(spec_path).keys()
@@ -202,7 +236,9 @@ class BuildFileAddressMapper(object):
     addresses = set()
     root = root or get_buildroot()
     try:
-      for build_file in self._build_file_type.scan_buildfiles(root, spec_excludes=spec_excludes):
+      build_files = self._build_file_type.scan_buildfiles(root, spec_excludes=spec_excludes)
+      self.prefetch_build_files(build_files)
+      for build_file in build_files:
         for address in self.addresses_in_spec_path(build_file.spec_path):
           addresses.add(address)
     except BuildFile.BuildFileError as e:
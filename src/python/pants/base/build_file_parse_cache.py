@@ -0,0 +1,294 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import ast
+import errno
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from pants.util.dirutil import safe_atomic_open
+from pants.version import VERSION as PANTS_VERSION
+
+
+logger = logging.getLogger(__name__)
+
+
+class BuildFileRecorder(object):
+  """Records the addressable calls made while executing a single BUILD file."""
+
+  def __init__(self):
+    self.calls = []
+    self.globbed_dirs = []
+    self.cacheable = True
+
+  def record_call(self, alias, args, kwargs):
+    # Pickle eagerly: addressables may consume their arguments, e.g., by popping dependencies.
+    if self.cacheable:
+      try:
+        self.calls.append(pickle.dumps((alias, args, kwargs), pickle.HIGHEST_PROTOCOL))
+      except Exception as e:
+        logger.debug('Not caching {} call with unpicklable arguments: {}'.format(alias, e))
+        self.cacheable = False
+
+  def record_globs(self, globbed_dirs):
+    self.globbed_dirs.extend(globbed_dirs)
+
+  def recorded_calls(self):
+    """Returns the recorded (alias, args, kwargs) calls, in order."""
+    return [pickle.loads(call) for call in self.calls]
+
+
+class BuildFileParseCache(object):
+  """A persistent cache of the addressable calls made by executing BUILD file families.
+
+  Executing a BUILD file registers addressables through the `AddressableCallProxy` for each alias
+  it calls.  The first time a BUILD file family is parsed its calls are recorded; subsequent parses
+  of an unchanged family replay those calls through fresh proxies instead of re-executing the
+  BUILD files, yielding the same addressables and dependency specs.
+
+  A family's entry is valid while the content of each of its BUILD files, the set of registered
+  aliases and the listings of any directories its globs read are unchanged.  BUILD files that
+  might do anything else when executed - import modules, read files, call context aware object
+  factories with side effects like `source_root` - are never cached.
+  """
+
+  # The format of the recorded calls.  Caches persisted in other formats are discarded.
+  VERSION = 1
+
+  # Directories modified this recently may be modified again within the same mtime tick without
+  # any visible change in stat info, so families that glob them are not cached.
+  RACY_WINDOW_SECS = 2.0
+
+  # Context aware object factories whose results depend only on the BUILD file's location and the
+  # directories it globs.
+  CACHEABLE_FACTORIES = frozenset(['buildfile_path', 'globs', 'rglobs', 'zglobs'])
+
+  # Builtins that cannot observe or affect anything outside of the BUILD file.
+  SAFE_BUILTINS = frozenset([
+    'None', 'True', 'False',
+    'abs', 'all', 'any', 'basestring', 'bool', 'dict', 'enumerate', 'filter', 'float', 'format',
+    'frozenset', 'int', 'isinstance', 'len', 'list', 'long', 'map', 'max', 'min', 'object',
+    'range', 'repr', 'reversed', 'set', 'sorted', 'str', 'sum', 'tuple', 'unicode', 'xrange',
+    'zip',
+  ])
+
+  @classmethod
+  def replayable_names(cls, aliases):
+    """Returns the names a BUILD file may reference and still have its calls replayed.
+
+    :param aliases: The BuildFileAliases registered with the BuildConfiguration.
+    """
+    return (cls.SAFE_BUILTINS |
+            set(aliases.objects) |
+            set(aliases.addressables) |
+            (cls.CACHEABLE_FACTORIES & set(aliases.context_aware_object_factories)))
+
+  @staticmethod
+  def is_replayable_source(source, replayable_names):
+    """Returns True if executing the BUILD file source can have no effect beyond its calls.
+
+    :param string source: The BUILD file's source code.
+    :param replayable_names: The names as returned by `replayable_names`.
+    """
+    try:
+      tree = ast.parse(source)
+    except SyntaxError:
+      return False
+    bound = set()
+    free = set()
+    for node in ast.walk(tree):
+      if isinstance(node, (ast.Import, ast.ImportFrom, ast.Exec, ast.Global)):
+        return False
+      elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        bound.add(node.name)
+      elif isinstance(node, ast.Name):
+        if isinstance(node.ctx, ast.Load):
+          free.add(node.id)
+        else:
+          bound.add(node.id)
+    return (free - bound) <= replayable_names
+
+  def __init__(self, build_configuration, root_dir, path=None):
+    """
+    :param build_configuration: The BuildConfiguration BUILD files are parsed with.
+    :param string root_dir: The build root BUILD file paths are relative to.
+    :param string path: An optional file to persist the cache to.
+    """
+    self._root_dir = root_dir
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = {}
+    self._dirty = False
+    self._hits = 0
+    self._misses = 0
+
+    aliases = build_configuration.registered_aliases()
+    self._replayable_names = self.replayable_names(aliases)
+    self._aliases_fingerprint = self.fingerprint_aliases(aliases)
+
+    if self._path:
+      self._load()
+
+  @property
+  def hits(self):
+    """The number of BUILD file families served from the cache."""
+    return self._hits
+
+  @property
+  def misses(self):
+    """The number of BUILD file families that had to be executed."""
+    return self._misses
+
+  def contains(self, build_files):
+    """Returns True if the cache holds a valid entry for the given BUILD file family.
+
+    Unlike `lookup`, this does not count as a hit or miss.
+    """
+    entry = self._entries.get(self._family_key(build_files))
+    return entry is not None and self._is_valid(entry, build_files)
+
+  def lookup(self, build_files):
+    """Returns the recorded calls for an unchanged BUILD file family, or None.
+
+    :param list build_files: All the BUILD files in the family.
+    :returns: A dict from each BUILD file's relpath to the list of (alias, args, kwargs) calls it
+      made, in order.
+    """
+    entry = self._entries.get(self._family_key(build_files))
+    calls = None
+    if entry is not None and self._is_valid(entry, build_files):
+      try:
+        calls = dict((relpath, [pickle.loads(call) for call in pickled_calls])
+                     for relpath, pickled_calls in entry['calls'].items())
+      except Exception as e:
+        logger.debug('Ignoring unreadable parse cache entry for {}: {}'
+                     .format(self._family_key(build_files), e))
+    with self._lock:
+      if calls is None:
+        self._misses += 1
+      else:
+        self._hits += 1
+    return calls
+
+  def store(self, recorders_by_build_file):
+    """Records the calls made by executing each BUILD file in a family, if they are cacheable.
+
+    :param dict recorders_by_build_file: A BuildFileRecorder for every BUILD file in the family.
+    """
+    build_files = list(recorders_by_build_file)
+    files = {}
+    for build_file, recorder in recorders_by_build_file.items():
+      source = build_file.source()
+      if not recorder.cacheable or not self.is_replayable_source(source, self._replayable_names):
+        return
+      files[build_file.relpath] = hashlib.sha1(source).hexdigest()
+
+    dirs = {}
+    for recorder in recorders_by_build_file.values():
+      for rel_dir, recursive in recorder.globbed_dirs:
+        dirs.update(self._dir_mtimes(rel_dir, recursive))
+    now = time.time()
+    if any(mtime is not None and now - mtime < self.RACY_WINDOW_SECS for mtime in dirs.values()):
+      return
+
+    entry = {
+      'files': files,
+      'dirs': dirs,
+      'calls': dict((build_file.relpath, recorder.calls)
+                    for build_file, recorder in recorders_by_build_file.items()),
+    }
+    with self._lock:
+      self._entries[self._family_key(build_files)] = entry
+      self._dirty = True
+
+  def save(self):
+    """Writes the cache to its path, if it has one and anything changed."""
+    if not self._path or not self._dirty:
+      return
+    with self._lock:
+      data = {
+        'version': self.VERSION,
+        'aliases': self._aliases_fingerprint,
+        'entries': self._entries,
+      }
+      with safe_atomic_open(self._path) as fp:
+        pickle.dump(data, fp, pickle.HIGHEST_PROTOCOL)
+      self._dirty = False
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = pickle.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return
+    except Exception:
+      logger.warn('Ignoring corrupt BUILD file parse cache at {}'.format(self._path))
+      return
+    if (isinstance(data, dict) and data.get('version') == self.VERSION and
+        data.get('aliases') == self._aliases_fingerprint):
+      self._entries = data.get('entries', {})
+
+  def _family_key(self, build_files):
+    return os.path.dirname(build_files[0].relpath)
+
+  def _is_valid(self, entry, build_files):
+    if set(entry['files']) != set(build_file.relpath for build_file in build_files):
+      return False
+    for build_file in build_files:
+      if hashlib.sha1(build_file.source()).hexdigest() != entry['files'][build_file.relpath]:
+        return False
+    for rel_dir, mtime in entry['dirs'].items():
+      if self._mtime(rel_dir) != mtime:
+        return False
+    return True
+
+  def _mtime(self, rel_dir):
+    try:
+      return os.stat(os.path.join(self._root_dir, rel_dir)).st_mtime
+    except OSError as e:
+      if e.errno not in (errno.ENOENT, errno.ENOTDIR):
+        raise
+      return None
+
+  def _dir_mtimes(self, rel_dir, recursive):
+    mtimes = {rel_dir: self._mtime(rel_dir)}
+    if recursive and mtimes[rel_dir] is not None:
+      seen = set()
+      for root, dirs, _ in os.walk(os.path.join(self._root_dir, rel_dir), followlinks=True):
+        real_root = os.path.realpath(root)
+        if real_root in seen:
+          # A symlink cycle: don't descend into it again.
+          dirs[:] = []
+          continue
+        seen.add(real_root)
+        rel_root = os.path.relpath(root, self._root_dir)
+        mtimes[rel_root] = self._mtime(rel_root)
+    return mtimes
+
+  @staticmethod
+  def fingerprint_aliases(aliases):
+    """Returns a fingerprint of the given BuildFileAliases and the pants version."""
+    def qualified_name(obj):
+      if not hasattr(obj, '__name__'):
+        obj = type(obj)
+      return '{}.{}'.format(getattr(obj, '__module__', ''), obj.__name__)
+
+    hasher = hashlib.sha1()
+    hasher.update(PANTS_VERSION)
+    for kind, mapping in (('targets', aliases.targets),
+                          ('objects', aliases.objects),
+                          ('addressables', aliases.addressables),
+                          ('factories', aliases.context_aware_object_factories)):
+      for alias, obj in sorted(mapping.items()):
+        hasher.update('{}:{}={}\n'.format(kind, alias, qualified_name(obj)))
+    return hasher.hexdigest()
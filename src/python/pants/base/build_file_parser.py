@@ -6,10 +6,14 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import multiprocessing
+import os
 import warnings
 
 import six
 
+from pants.base.build_file_parse_cache import BuildFileParseCache, BuildFileRecorder
+
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,26 @@ logger = logging.getLogger(__name__)
 # Note: In general, 'spec' should not be a user visible term, it is usually appropriate to
 # substitute 'address' instead.
 
+# The (parser, build_file_type) that worker processes forked by `record_build_file_families` use.
+_recording_state = None
+
+
+def _record_build_file_family(relpath):
+  """Executes the BUILD file family at relpath in a worker process, recording each file's calls."""
+  parser, build_file_type = _recording_state
+  spec_path = os.path.dirname(relpath)
+  try:
+    recorders = {}
+    for bf in build_file_type.from_cache(parser.root_dir, relpath).family():
+      recorder = BuildFileRecorder()
+      parser.parse_build_file(bf, recorder=recorder)
+      recorders[bf.relpath] = recorder
+    return spec_path, recorders
+  except Exception:
+    # The family is re-parsed by the parent, which reports the error in context.
+    return spec_path, None
+
+
 class BuildFileParser(object):
   """Parses BUILD files for a given repo build configuration."""
 
@@ -51,10 +75,16 @@ class BuildFileParser(object):
   class ExecuteError(BuildFileParserError):
     """An exception was encountered executing code in the BUILD file"""
 
-  def __init__(self, build_configuration, root_dir, run_tracker=None):
+  def __init__(self, build_configuration, root_dir, run_tracker=None, parse_cache=None):
+    """
+    :param parse_cache: An optional BuildFileParseCache used to skip executing unchanged BUILD
+      file families.
+    """
     self._build_configuration = build_configuration
     self._root_dir = root_dir
     self.run_tracker = run_tracker
+    self._parse_cache = parse_cache
+    self._replayable_names = None
 
   @property
   def root_dir(self):
@@ -64,17 +94,37 @@ class BuildFileParser(object):
     """Returns a copy of the registered build file aliases this build file parser uses."""
     return self._build_configuration.registered_aliases()
 
-  def address_map_from_build_file(self, build_file):
-    family_address_map_by_build_file = self.parse_build_file_family(build_file)
+  def address_map_from_build_file(self, build_file, recorders=None):
+    family_address_map_by_build_file = self.parse_build_file_family(build_file,
+                                                                    recorders=recorders)
     address_map = {}
     for build_file, sibling_address_map in family_address_map_by_build_file.items():
       address_map.update(sibling_address_map)
     return address_map
 
-  def parse_build_file_family(self, build_file):
+  def parse_build_file_family(self, build_file, recorders=None):
+    """Parses each BUILD file in the family of `build_file`.
+
+    :param dict recorders: An optional {relpath: BuildFileRecorder} made by executing each BUILD
+      file in the family elsewhere, as returned by `record_build_file_families`.  The recorded
+      calls are replayed if they capture everything the BUILD files do.
+    """
+    family = list(build_file.family())
+    cached_calls = self._parse_cache.lookup(family) if self._parse_cache else None
+    if cached_calls is None and recorders is not None:
+      cached_calls = self._replayable_calls(family, recorders)
+      if cached_calls is not None and self._parse_cache:
+        self._parse_cache.store(dict((bf, recorders[bf.relpath]) for bf in family))
+    new_recorders = {}  # {build_file: BuildFileRecorder}
+
     family_address_map_by_build_file = {}  # {build_file: {address: addressable}}
-    for bf in build_file.family():
-      bf_address_map = self.parse_build_file(bf)
+    for bf in family:
+      if cached_calls is not None:
+        bf_address_map = self._replay_build_file(bf, cached_calls[bf.relpath])
+      else:
+        if self._parse_cache:
+          new_recorders[bf] = BuildFileRecorder()
+        bf_address_map = self.parse_build_file(bf, recorder=new_recorders.get(bf))
       for address, addressable in bf_address_map.items():
         for sibling_build_file, sibling_address_map in family_address_map_by_build_file.items():
           if address in sibling_address_map:
@@ -85,12 +135,63 @@ class BuildFileParser(object):
                       addressable_file=address.build_file,
                       target_name=address.target_name))
       family_address_map_by_build_file[bf] = bf_address_map
+
+    if new_recorders:
+      self._parse_cache.store(new_recorders)
     return family_address_map_by_build_file
 
-  def parse_build_file(self, build_file):
+  def record_build_file_families(self, build_files, workers):
+    """Executes the families of the given BUILD files across a pool of worker processes.
+
+    Families with a valid parse cache entry are skipped.  The BUILD file type must be
+    reconstructable in the workers via `from_cache`.
+
+    :param build_files: BUILD files, at most one per family.
+    :param int workers: The number of worker processes to use.
+    :returns: A dict from the spec_path of each executed family to its recorders, suitable for
+      `parse_build_file_family`, or to None if the family could not be recorded.
+    """
+    pending = [build_file for build_file in build_files
+               if not (self._parse_cache and self._parse_cache.contains(list(build_file.family())))]
+    if not pending:
+      return {}
+    build_file_type = type(pending[0])
+
+    global _recording_state
+    _recording_state = (self, build_file_type)
+    # The pool is forked only now, so that the workers inherit the parser via _recording_state.
+    pool = multiprocessing.Pool(min(workers, len(pending)))
+    try:
+      chunksize = max(1, len(pending) // (workers * 4))
+      # Use a long timeout on get() rather than none at all, so that ctrl-c is delivered.
+      results = pool.map_async(_record_build_file_family,
+                               [build_file.relpath for build_file in pending],
+                               chunksize=chunksize).get(timeout=1000000000)
+    finally:
+      pool.terminate()
+      pool.join()
+      _recording_state = None
+    return dict(results)
+
+  def _replayable_calls(self, family, recorders):
+    if set(recorders) != set(bf.relpath for bf in family):
+      return None
+    if self._replayable_names is None:
+      self._replayable_names = BuildFileParseCache.replayable_names(self.registered_aliases())
+    for bf in family:
+      recorder = recorders[bf.relpath]
+      if not recorder.cacheable or not BuildFileParseCache.is_replayable_source(
+          bf.source(), self._replayable_names):
+        return None
+    return dict((relpath, recorder.recorded_calls()) for relpath, recorder in recorders.items())
+
+  def parse_build_file(self, build_file, recorder=None):
     """Capture Addressable instances from parsing `build_file`.
     Prepare a context for parsing, read a BUILD file from the filesystem, and return the
     Addressable instances generated by executing the code.
+
+    :param recorder: An optional BuildFileRecorder to record the addressable calls and
+      globs made by executing `build_file`.
     """
 
     def _format_context_msg(lineno, offset, error_type, message):
@@ -131,7 +232,9 @@ class BuildFileParser(object):
                               .format(error_type=e.__class__.__name__,
                                       message=e, build_file=build_file))
 
-    parse_state = self._build_configuration.initialize_parse_state(build_file)
+    call_recorder = recorder.record_call if recorder else None
+    parse_state = self._build_configuration.initialize_parse_state(build_file,
+                                                                   call_recorder=call_recorder)
     try:
       with warnings.catch_warnings(record=True) as warns:
         six.exec_(build_file_code, parse_state.parse_globals)
@@ -143,7 +246,26 @@ class BuildFileParser(object):
     except Exception as e:
       raise self.ExecuteError("{message}\n while executing BUILD file {build_file}"
                               .format(message=e, build_file=build_file))
+    if recorder:
+      recorder.record_globs(parse_state.parse_context.globbed_dirs)
+
+    return self._address_map_from_parse_state(build_file, parse_state)
+
+  def _replay_build_file(self, build_file, calls):
+    """Re-creates the Addressable instances of `build_file` from its cached addressable calls."""
+    logger.debug("Replaying cached BUILD file {build_file}."
+                 .format(build_file=build_file))
+
+    parse_state = self._build_configuration.initialize_parse_state(build_file)
+    try:
+      for alias, args, kwargs in calls:
+        parse_state.parse_globals[alias](*args, **kwargs)
+    except Exception as e:
+      raise self.ExecuteError("{message}\n while executing BUILD file {build_file}"
+                              .format(message=e, build_file=build_file))
+    return self._address_map_from_parse_state(build_file, parse_state)
 
+  def _address_map_from_parse_state(self, build_file, parse_state):
     address_map = {}
     for address, addressable in parse_state.registered_addressable_instances:
       logger.debug('Adding {addressable} to the BuildFileParser address map with {address}'
@@ -44,6 +44,14 @@ class BuildGraph(object):
     self._target_dependencies_by_address = defaultdict(OrderedSet)
     self._target_dependees_by_address = defaultdict(set)
     self._derived_from_by_derivative_address = {}
+    self._invalidate_topological_order()
+
+  def _invalidate_topological_order(self):
+    # A cached topological order of all addresses in the graph, least dependent first, and the
+    # position of each address in that order.  Maintained incrementally where possible by
+    # inject_target and inject_dependency, and otherwise recomputed by sorted_targets.
+    self._topological_order = None
+    self._topological_ordinals = None
 
   def contains_address(self, address):
     return address in self._target_by_address
@@ -131,6 +139,14 @@ class BuildGraph(object):
 
     self._target_by_address[address] = target
 
+    if self._topological_order is not None:
+      if self._target_dependees_by_address.get(address):
+        # Something already depends on this address, so it can't simply go last.
+        self._invalidate_topological_order()
+      else:
+        self._topological_ordinals[address] = len(self._topological_order)
+        self._topological_order.append(address)
+
     for dependency_address in dependencies:
       self.inject_dependency(dependent=address, dependency=dependency_address)
 
@@ -153,9 +169,9 @@ class BuildGraph(object):
     # and allow the cycle to appear.  It is the caller's responsibility to call sort_targets on the
     # entire graph to generate a friendlier CycleException that actually prints the cycle.
     # Alternatively, we could call sort_targets after every inject_dependency/inject_target, but
-    # that could have nasty performance implications.  Alternative 2 would be to have an internal
-    # data structure of the topologically sorted graph which would have acceptable amortized
-    # performance for inserting new nodes, and also cycle detection on each insert.
+    # that could have nasty performance implications.  Note that any dependency that would
+    # introduce a cycle does invalidate the cached topological order, so the next call to
+    # sorted_targets will raise.
 
     if dependency not in self._target_by_address:
       logger.warning('Injecting dependency from {dependent} on {dependency}, but the dependency'
@@ -170,6 +186,11 @@ class BuildGraph(object):
     else:
       self._target_dependencies_by_address[dependent].add(dependency)
       self._target_dependees_by_address[dependency].add(dependent)
+      if self._topological_order is not None:
+        # The cached order remains valid as long as the dependency already precedes its dependent.
+        dependency_ordinal = self._topological_ordinals.get(dependency)
+        if dependency_ordinal is None or dependency_ordinal > self._topological_ordinals[dependent]:
+          self._invalidate_topological_order()
 
   def targets(self, predicate=None):
     """Returns all the targets in the graph in no particular order.
@@ -179,8 +200,19 @@ class BuildGraph(object):
     return filter(predicate, self._target_by_address.values())
 
   def sorted_targets(self):
-    """:return: targets ordered from most dependent to least."""
-    return sort_targets(self._target_by_address.values())
+    """:return: targets ordered from most dependent to least.
+
+    The order is cached and maintained as targets and dependencies are injected, so repeated calls
+    are cheap.
+
+    :raises: :class:`CycleException` if the graph contains a cycle.
+    """
+    if self._topological_order is None:
+      ordered = sort_targets(self._target_by_address.values())
+      self._topological_order = [target.address for target in reversed(ordered)]
+      self._topological_ordinals = dict((address, ordinal)
+                                        for ordinal, address in enumerate(self._topological_order))
+    return [self._target_by_address[address] for address in reversed(self._topological_order)]
 
   def walk_transitive_dependency_graph(self, addresses, work, predicate=None, postorder=False):
     """Given a work function, walks the transitive dependency closure of `addresses` using DFS.
@@ -414,28 +446,42 @@ def invert_dependencies(targets):
   roots = set()
   inverted_deps = defaultdict(OrderedSet)  # target -> dependent targets
   visited = set()
-  path = OrderedSet()
 
-  def invert(target):
-    if target in path:
-      path_list = list(path)
-      cycle_head = path_list.index(target)
-      cycle = path_list[cycle_head:] + [target]
+  # An iterative depth-first walk, so that deep dependency chains can't exhaust the stack.  The
+  # current path is tracked by `path` (in order, for reporting cycles) and `on_path` (for O(1)
+  # membership tests); `stack` holds the iterator over the remaining dependencies of each target
+  # on the path.
+  path = []
+  on_path = set()
+  stack = []
+
+  def enter(target):
+    if target in on_path:
+      cycle_head = path.index(target)
+      cycle = path[cycle_head:] + [target]
       raise CycleException(cycle)
-    path.add(target)
+    path.append(target)
+    on_path.add(target)
     if target not in visited:
       visited.add(target)
       if target.dependencies:
-        for dependency in target.dependencies:
-          inverted_deps[dependency].add(target)
-          invert(dependency)
+        stack.append(iter(target.dependencies))
+        return
       else:
         roots.add(target)
+    stack.append(iter(()))
 
-    path.remove(target)
-
+  exhausted = object()
   for target in targets:
-    invert(target)
+    enter(target)
+    while stack:
+      dependency = next(stack[-1], exhausted)
+      if dependency is exhausted:
+        stack.pop()
+        on_path.discard(path.pop())
+      else:
+        inverted_deps[dependency].add(path[-1])
+        enter(dependency)
 
   return roots, inverted_deps
 
@@ -446,15 +492,21 @@ def sort_targets(targets):
   ordered = []
   visited = set()
 
-  def topological_sort(target):
-    if target not in visited:
-      visited.add(target)
-      if target in inverted_deps:
-        for dep in inverted_deps[target]:
-          topological_sort(dep)
-      ordered.append(target)
-
+  # An iterative postorder walk of the inverted graph from each root.
+  exhausted = object()
   for root in roots:
-    topological_sort(root)
+    if root in visited:
+      continue
+    visited.add(root)
+    stack = [(root, iter(inverted_deps.get(root, ())))]
+    while stack:
+      target, dependents = stack[-1]
+      dependent = next(dependents, exhausted)
+      if dependent is exhausted:
+        stack.pop()
+        ordered.append(target)
+      elif dependent not in visited:
+        visited.add(dependent)
+        stack.append((dependent, iter(inverted_deps.get(dependent, ()))))
 
   return ordered
@@ -7,13 +7,19 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import errno
 import hashlib
+import json
+import logging
 import os
+import threading
 from collections import namedtuple
 
 from pants.base.hash_utils import hash_all
 from pants.base.target import Target
 from pants.fs.fs import safe_filename
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_atomic_open, safe_delete, safe_mkdir
+
+
+logger = logging.getLogger(__name__)
 
 
 # A CacheKey represents some version of a set of targets.
@@ -99,6 +105,10 @@ class BuildInvalidator(object):
   def __init__(self, root):
     self._root = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION)
     safe_mkdir(self._root)
+    # Otherwise the hashes an IndexedBuildInvalidator left under root would override those this
+    # invalidates, when it is next used.
+    if os.path.exists(os.path.join(self._root, IndexedBuildInvalidator.INDEX_FILENAME)):
+      IndexedBuildInvalidator(root).export()
 
   def needs_update(self, cache_key):
     """Check if the given cached item is invalid.
@@ -155,3 +165,190 @@ class BuildInvalidator(object):
       if e.errno != errno.ENOENT:
         raise
       return None  # File doesn't exist.
+
+
+class IndexedBuildInvalidator(object):
+  """A BuildInvalidator that keeps all of its hashes in a single append-only index file.
+
+  The index is read once, on first use, and each update or invalidation appends one record to it,
+  so checking and updating thousands of targets costs a handful of syscalls rather than an
+  open/read/close per target.  Stale records are compacted away by atomically rewriting the index.
+
+  The index lives alongside the per-target files written by BuildInvalidator.  Any such files are
+  migrated into the index when it is loaded, and a BuildInvalidator exports the index back into
+  files, so that either can be switched to at any time.
+  """
+
+  INDEX_FILENAME = 'index'
+
+  # Compact the index on load once it holds this many more records than live entries.
+  COMPACTION_SLACK = 1000
+
+  def __init__(self, root):
+    self._root = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION)
+    self._index_file = os.path.join(self._root, self.INDEX_FILENAME)
+    self._lock = threading.Lock()
+    self._hashes = None
+    self._appender = None
+
+  def needs_update(self, cache_key):
+    """Check if the given cached item is invalid.
+
+    :param cache_key: A CacheKey object (as returned by BuildInvalidator.key_for().
+    :returns: True if the cached version of the item is out of date.
+    """
+    return self.existing_hash(cache_key.id) != cache_key.hash
+
+  def update(self, cache_key):
+    """Makes cache_key the valid version of the corresponding target set.
+
+    :param cache_key: A CacheKey object (typically returned by BuildInvalidator.key_for()).
+    """
+    self._append(cache_key.id, cache_key.hash)
+
+  def force_invalidate_all(self):
+    """Force-invalidates all cached items."""
+    with self._lock:
+      self._close()
+      safe_mkdir(self._root, clean=True)
+      self._hashes = {}
+
+  def force_invalidate(self, cache_key):
+    """Force-invalidate the cached item."""
+    self._append(cache_key.id, None)
+
+  def existing_hash(self, id):
+    """Returns the existing hash for the specified id.
+
+    Returns None if there is no existing hash for this id.
+    """
+    return self._index().get(self._key(id))
+
+  def migrate(self):
+    """Moves any hashes stored in the per-target file layout of BuildInvalidator into the index.
+
+    This happens automatically when the index is first loaded, but may be called eagerly.
+
+    :returns: The number of hashes migrated.
+    """
+    with self._lock:
+      self._close()
+      self._hashes, migrated = self._load()
+      return migrated
+
+  def export(self):
+    """Moves the hashes in the index into the per-target file layout of BuildInvalidator.
+
+    The index is deleted, so that it cannot later restore hashes that a BuildInvalidator has since
+    invalidated.
+
+    :returns: The number of hashes exported.
+    """
+    with self._lock:
+      self._close()
+      hashes = self._read_index()
+      safe_mkdir(self._root)
+      for key, hash in hashes.items():
+        path = os.path.join(self._root, key + '.hash')
+        # Per-target files are always at least as fresh as the index.
+        if not os.path.exists(path):
+          with open(path, 'w') as fd:
+            fd.write(hash)
+      safe_delete(self._index_file)
+      self._hashes = None
+      return len(hashes)
+
+  def _key(self, id):
+    # Use the same name as the per-target file layout, so that migration is lossless.
+    return os.path.splitext(safe_filename(id, extension='.hash'))[0]
+
+  def _index(self):
+    if self._hashes is None:
+      with self._lock:
+        if self._hashes is None:
+          self._hashes, migrated = self._load()
+          if migrated:
+            logger.debug('Migrated {} hashes into {}'.format(migrated, self._index_file))
+    return self._hashes
+
+  def _load(self):
+    hashes = self._read_index()
+    # Per-target files are always at least as fresh as the index: they can only have been written
+    # by a BuildInvalidator since the index was last used.
+    migrated = []
+    for filename in os.listdir(self._root) if os.path.isdir(self._root) else ():
+      key, ext = os.path.splitext(filename)
+      if ext == '.hash':
+        path = os.path.join(self._root, filename)
+        with open(path, 'rb') as fd:
+          hashes[key] = fd.read().strip()
+        migrated.append(path)
+    if migrated:
+      self._write_index(hashes)
+      for path in migrated:
+        safe_delete(path)
+    return hashes, len(migrated)
+
+  def _append(self, id, hash):
+    hashes = self._index()
+    key = self._key(id)
+    with self._lock:
+      if hash is None:
+        hashes.pop(key, None)
+      else:
+        hashes[key] = hash
+      if self._appender is None:
+        self._appender = self._open_appender()
+      self._appender.write(json.dumps([key, hash]))
+      self._appender.write(b'\n')
+      self._appender.flush()
+
+  def _open_appender(self):
+    safe_mkdir(self._root)
+    appender = open(self._index_file, 'ab')
+    if os.path.getsize(self._index_file) > 0:
+      # Terminate any partial record left by an interrupted run, so it can't corrupt the next one.
+      with open(self._index_file, 'rb') as fd:
+        fd.seek(-1, os.SEEK_END)
+        if fd.read(1) != b'\n':
+          appender.write(b'\n')
+    return appender
+
+  def _close(self):
+    if self._appender is not None:
+      self._appender.close()
+      self._appender = None
+
+  def _read_index(self):
+    hashes = {}
+    num_records = 0
+    try:
+      with open(self._index_file, 'rb') as fd:
+        for line in fd:
+          try:
+            key, hash = json.loads(line)
+          except ValueError:
+            # A partially written record from an interrupted run; everything before it is intact.
+            continue
+          num_records += 1
+          if hash is None:
+            hashes.pop(key, None)
+          else:
+            hashes[key] = hash
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    if num_records > len(hashes) + self.COMPACTION_SLACK:
+      self._write_index(hashes)
+    return hashes
+
+  def _write_index(self, hashes):
+    with safe_atomic_open(self._index_file) as fd:
+      for key, hash in sorted(hashes.items()):
+        fd.write(json.dumps([key, hash]))
+        fd.write(b'\n')
+
+
+def create_build_invalidator(root, indexed=False):
+  """Returns a BuildInvalidator, or an IndexedBuildInvalidator if indexed, rooted at root."""
+  return IndexedBuildInvalidator(root) if indexed else BuildInvalidator(root)
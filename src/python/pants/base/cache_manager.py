@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import sys
+from multiprocessing.pool import ThreadPool
 
 from pants.base.build_graph import sort_targets
 from pants.base.build_invalidator import BuildInvalidator, CacheKeyGenerator
@@ -207,12 +208,23 @@ class InvalidationCacheManager(object):
                invalidate_dependents,
                fingerprint_strategy=None,
                invalidation_report=None,
-               task_name=None):
+               task_name=None,
+               build_invalidator=None,
+               fingerprint_workers=1):
+    """
+    :param build_invalidator: An optional BuildInvalidator or IndexedBuildInvalidator to use,
+      e.g., one shared by all of a task's cache managers.  If not specified a BuildInvalidator
+      rooted at build_invalidator_dir is used.
+    :param int fingerprint_workers: The number of threads to fingerprint targets with.  Target
+      fingerprinting is dominated by reading and hashing sources, so this can help even under
+      the GIL.  Values of 1 or less fingerprint serially.
+    """
     self._cache_key_generator = cache_key_generator
     self._task_name = task_name or 'UNKNOWN'
     self._invalidate_dependents = invalidate_dependents
-    self._invalidator = BuildInvalidator(build_invalidator_dir)
+    self._invalidator = build_invalidator or BuildInvalidator(build_invalidator_dir)
     self._fingerprint_strategy = fingerprint_strategy
+    self._fingerprint_workers = fingerprint_workers
     self.invalidation_report = invalidation_report
 
   def update(self, vts):
@@ -264,9 +276,13 @@ class InvalidationCacheManager(object):
 
     Returns a list of VersionedTargets, each representing one input target.
     """
+    if self._fingerprint_workers > 1:
+      self._precompute_fingerprints(targets)
+
     def vt_iter():
       if topological_order:
-        sorted_targets = [t for t in reversed(sort_targets(targets)) if t in targets]
+        target_set = set(targets)
+        sorted_targets = [t for t in reversed(sort_targets(targets)) if t in target_set]
       else:
         sorted_targets = sorted(targets)
       for target in sorted_targets:
@@ -278,6 +294,46 @@ class InvalidationCacheManager(object):
   def needs_update(self, cache_key):
     return self._invalidator.needs_update(cache_key)
 
+  def _precompute_fingerprints(self, targets):
+    """Warms the fingerprint memos of targets, and of their dependencies if invalidating dependents.
+
+    Each target's own fingerprint is computed concurrently, and transitive fingerprints are then
+    combined serially, dependencies first.  Both are memoized on the targets, so the keys later
+    computed by _key_for are identical to those computed by a serial pass.
+    """
+    if self._invalidate_dependents:
+      closure = list(reversed(sort_targets(targets)))
+    else:
+      closure = list(targets)
+    if len(closure) < 2:
+      return
+
+    def fingerprint(target):
+      try:
+        target.invalidation_hash(self._fingerprint_strategy)
+      except Exception:
+        # Leave it to _key_for to recompute the fingerprint and raise a better diagnostic.
+        pass
+
+    # The first fingerprint is computed on this thread, so that any lazily computed state shared
+    # by the fingerprint strategy (e.g., a task's own fingerprint) is not computed concurrently.
+    fingerprint(closure[0])
+    pool = ThreadPool(processes=min(self._fingerprint_workers, len(closure) - 1))
+    try:
+      # We need to specify a timeout explicitly, because otherwise python ignores SIGINT when
+      # waiting on a condition variable, so we won't be able to ctrl-c out.
+      pool.map_async(fingerprint, closure[1:]).get(timeout=1000000000)
+    finally:
+      pool.close()
+      pool.join()
+
+    if self._invalidate_dependents:
+      for target in closure:
+        try:
+          target.transitive_invalidation_hash(self._fingerprint_strategy)
+        except Exception:
+          pass
+
   def _key_for(self, target):
     try:
       return self._cache_key_generator.key_for_target(target,
@@ -138,6 +138,8 @@ class CmdLineSpecParser(object):
       except (BuildFile.BuildFileError, AddressLookupError) as e:
         raise self.BadSpecError(e)
 
+      self._address_mapper.prefetch_build_files(
+        build_file for build_file in build_files if self._not_excluded_spec(build_file.spec_path))
       for build_file in build_files:
         try:
           # This attempts to filter out broken BUILD files before we parse them.
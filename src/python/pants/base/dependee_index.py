@@ -0,0 +1,175 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import hashlib
+import json
+import logging
+from collections import defaultdict, deque
+
+from pants.base.address import SyntheticAddress
+from pants.base.build_file_parse_cache import BuildFileParseCache
+from pants.util.dirutil import safe_atomic_open
+
+
+logger = logging.getLogger(__name__)
+
+
+class DependeeIndex(object):
+  """A persistent index from each address to the addresses that directly depend on it.
+
+  Finding the dependees of an address otherwise requires loading every BUILD file in the repo.
+  The index records the direct dependencies of the addresses defined by each BUILD file family,
+  along with the content hash of each of its BUILD files, and inverts them when queried.  An
+  `update` only loads the families that were added or changed since the index was persisted, and
+  drops those that were removed.
+
+  Families whose BUILD files could define different dependencies without changing, such as those
+  that import modules, are loaded on every update, just as the BuildFileParseCache re-executes them.
+  """
+
+  # The format of the persisted entries; indexes in any other format are rebuilt from scratch.
+  VERSION = 1
+
+  def __init__(self, address_mapper, build_graph, path=None):
+    """
+    :param address_mapper: The BuildFileAddressMapper to load changed BUILD files with.
+    :param build_graph: The BuildGraph that the targets of changed BUILD files are instantiated for.
+    :param string path: An optional file to persist the index to.
+    """
+    self._address_mapper = address_mapper
+    self._build_graph = build_graph
+    self._path = path
+    self._families = {}  # {spec_path: {'files': {relpath: sha1}, 'dependencies': {spec: [spec]}}}
+    self._dependees = None  # {spec: set(dependee specs)}, computed lazily from self._families.
+    self._dirty = False
+    self._loaded = 0
+
+    aliases = address_mapper.registered_aliases()
+    # Context aware object factories, like `source_root`, may have side effects but cannot change
+    # the dependencies a BUILD file declares.
+    self._indexable_names = (BuildFileParseCache.replayable_names(aliases) |
+                             set(aliases.context_aware_object_factories))
+    self._aliases_fingerprint = BuildFileParseCache.fingerprint_aliases(aliases)
+
+    if self._path:
+      self._load()
+
+  @property
+  def loaded(self):
+    """The number of BUILD file families loaded by the last `update`."""
+    return self._loaded
+
+  def update(self, spec_excludes=None):
+    """Brings the index up to date with the BUILD files in the repo, and persists it.
+
+    :param list spec_excludes: Paths to exclude BUILD files under.
+    :raises AddressLookupError: if a changed BUILD file fails to load.
+    """
+    families = defaultdict(list)  # {spec_path: [BuildFile]}
+    for build_file in self._address_mapper.scan_buildfiles(self._address_mapper.root_dir,
+                                                           spec_excludes=spec_excludes):
+      families[build_file.spec_path].append(build_file)
+
+    self._loaded = 0
+    for spec_path in set(self._families) - set(families):
+      del self._families[spec_path]
+      self._dependees = None
+      self._dirty = True
+
+    for spec_path, build_files in families.items():
+      files = self._hash_files(build_files)
+      entry = self._families.get(spec_path)
+      if files is not None and entry is not None and entry['files'] == files:
+        continue
+      self._families[spec_path] = {
+        'files': files,
+        'dependencies': self._load_dependencies(spec_path),
+      }
+      self._loaded += 1
+      self._dependees = None
+      self._dirty = True
+
+    self._save()
+
+  def dependees_of(self, address):
+    """Returns the addresses that directly depend on `address`."""
+    return set(self._address_mapper.spec_to_address(spec)
+               for spec in self._get_dependees().get(address.spec, ()))
+
+  def transitive_dependees_of(self, addresses):
+    """Returns the given addresses and all the addresses that transitively depend on them."""
+    dependees = self._get_dependees()
+    seen = set(address.spec for address in addresses)
+    to_walk = deque(seen)
+    while to_walk:
+      for dependee in dependees.get(to_walk.popleft(), ()):
+        if dependee not in seen:
+          seen.add(dependee)
+          to_walk.append(dependee)
+    return set(self._address_mapper.spec_to_address(spec) for spec in seen)
+
+  def _hash_files(self, build_files):
+    """Returns the content hash of each BUILD file, or None if the family cannot be indexed."""
+    files = {}
+    for build_file in build_files:
+      source = build_file.source()
+      if not BuildFileParseCache.is_replayable_source(source, self._indexable_names):
+        return None
+      files[build_file.relpath] = hashlib.sha1(source).hexdigest()
+    return files
+
+  def _load_dependencies(self, spec_path):
+    # Targets are instantiated, but not injected into the BuildGraph, so that the dependencies they
+    # add themselves, via `traversable_dependency_specs`, are included without loading the BUILD
+    # files of their dependencies.
+    dependencies = {}
+    for address in self._address_mapper.addresses_in_spec_path(spec_path):
+      target_address, addressable = self._address_mapper.resolve(address)
+      target = self._build_graph._target_addressable_to_target(target_address, addressable)
+      dependency_specs = list(addressable.dependency_specs)
+      dependency_specs.extend(target.traversable_dependency_specs)
+      dependencies[target_address.spec] = sorted(
+        SyntheticAddress.parse(spec, relative_to=target_address.spec_path).spec
+        for spec in dependency_specs)
+    return dependencies
+
+  def _get_dependees(self):
+    if self._dependees is None:
+      self._dependees = defaultdict(set)
+      for entry in self._families.values():
+        for spec, dependency_specs in entry['dependencies'].items():
+          for dependency_spec in dependency_specs:
+            self._dependees[dependency_spec].add(spec)
+    return self._dependees
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return
+    except ValueError:
+      logger.warn('Ignoring corrupt dependee index at {}'.format(self._path))
+      return
+    if (isinstance(data, dict) and data.get('version') == self.VERSION and
+        data.get('aliases') == self._aliases_fingerprint):
+      self._families = data.get('families', {})
+
+  def _save(self):
+    if not self._path or not self._dirty:
+      return
+    data = {
+      'version': self.VERSION,
+      'aliases': self._aliases_fingerprint,
+      'families': self._families,
+    }
+    with safe_atomic_open(self._path) as fp:
+      json.dump(data, fp)
+    self._dirty = False
@@ -0,0 +1,78 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import json
+import logging
+import threading
+
+from pants.util.dirutil import safe_atomic_open
+
+
+logger = logging.getLogger(__name__)
+
+
+class DurationHistory(object):
+  """A persistent record of how long units of work took in previous runs.
+
+  Each key's estimate is an exponentially weighted moving average of its recorded durations, so
+  recent runs count for more than old ones.
+  """
+
+  # Histories persisted with another version are ignored, e.g., after the meaning of keys changes.
+  VERSION = 1
+
+  # The weight of each newly recorded duration in a key's estimate.
+  DECAY = 0.5
+
+  def __init__(self, path=None):
+    """
+    :param string path: An optional file to persist the history to.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._estimates = {}
+    self._dirty = False
+    if self._path:
+      self._load()
+
+  def estimate(self, key, default=None):
+    """Returns the estimated duration in seconds of the work identified by key, or default."""
+    return self._estimates.get(key, default)
+
+  def record(self, key, duration):
+    """Folds the duration in seconds of a run of the work identified by key into its estimate."""
+    with self._lock:
+      previous = self._estimates.get(key)
+      if previous is None:
+        self._estimates[key] = duration
+      else:
+        self._estimates[key] = self.DECAY * duration + (1 - self.DECAY) * previous
+      self._dirty = True
+
+  def save(self):
+    """Writes the history to its path, if it has one and anything changed."""
+    if not self._path or not self._dirty:
+      return
+    with self._lock:
+      with safe_atomic_open(self._path) as fp:
+        json.dump({'version': self.VERSION, 'estimates': self._estimates}, fp)
+      self._dirty = False
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return
+    except ValueError:
+      logger.warn('Ignoring corrupt duration history at {}'.format(self._path))
+      return
+    if isinstance(data, dict) and data.get('version') == self.VERSION:
+      self._estimates = data.get('estimates', {})
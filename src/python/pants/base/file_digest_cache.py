@@ -0,0 +1,137 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from pants.util.dirutil import safe_atomic_open
+
+
+logger = logging.getLogger(__name__)
+
+
+def digest_file_contents(path, digest=None):
+  """Hashes the contents of the file at the given path and returns the hash digest in hex form.
+
+  If a hashlib message digest is not supplied a new sha1 message digest is used.
+  """
+  digest = digest or hashlib.sha1()
+  with open(path, 'rb') as fd:
+    s = fd.read(8192)
+    while s:
+      digest.update(s)
+      s = fd.read(8192)
+  return digest.hexdigest()
+
+
+class FileDigestCache(object):
+  """A content-addressed cache of sha1 file digests, keyed by path and stat info.
+
+  An entry is valid for as long as the file's mtime, size and inode are unchanged, so a lookup
+  for an unchanged file costs a single stat call rather than a full read of the file.
+
+  If constructed with a path, entries are loaded from that file and `save` writes them back,
+  allowing digests to be reused across pants runs.
+  """
+
+  # Persisted caches of any other version are ignored.  Change on changing the stat key or digest.
+  VERSION = 1
+
+  # Files modified this recently may be modified again within the same mtime tick, without any
+  # visible change in stat info. We hash such files but never record their digests.
+  RACY_WINDOW_SECS = 2.0
+
+  def __init__(self, path=None):
+    """
+    :param string path: An optional file to persist the cache to.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = {}
+    self._dirty = False
+    self._hits = 0
+    self._misses = 0
+    if self._path:
+      self._load()
+
+  @property
+  def hits(self):
+    """The number of digests served from the cache."""
+    return self._hits
+
+  @property
+  def misses(self):
+    """The number of digests that required reading the file."""
+    return self._misses
+
+  def digest(self, path):
+    """Returns the sha1 hexdigest of the contents of the file at path."""
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    stat_key = [st.st_mtime, st.st_size, st.st_ino]
+    entry = self._entries.get(abs_path)
+    if entry is not None and entry[:3] == stat_key:
+      with self._lock:
+        self._hits += 1
+      return entry[3]
+
+    file_digest = digest_file_contents(abs_path)
+    with self._lock:
+      self._misses += 1
+      if time.time() - st.st_mtime >= self.RACY_WINDOW_SECS:
+        self._entries[abs_path] = stat_key + [file_digest]
+        self._dirty = True
+    return file_digest
+
+  def save(self):
+    """Writes the cache to its path, if it has one and anything changed.
+
+    Entries for files that no longer exist are dropped.
+    """
+    if not self._path or not self._dirty:
+      return
+    with self._lock:
+      self._entries = dict((path, entry) for path, entry in self._entries.items()
+                           if os.path.exists(path))
+      with safe_atomic_open(self._path) as fp:
+        json.dump({'version': self.VERSION, 'entries': self._entries}, fp)
+      self._dirty = False
+
+  def _load(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        data = json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return
+    except ValueError:
+      logger.warn('Ignoring corrupt file digest cache at {}'.format(self._path))
+      return
+    if data.get('version') == self.VERSION:
+      self._entries = data.get('entries', {})
+
+
+_FILE_DIGEST_CACHE = None
+
+
+def get_file_digest_cache():
+  """Returns the FileDigestCache shared by this pants run, if any."""
+  return _FILE_DIGEST_CACHE
+
+
+def set_file_digest_cache(file_digest_cache):
+  """Sets the FileDigestCache shared by this pants run; `None` disables caching."""
+  if file_digest_cache is not None and not isinstance(file_digest_cache, FileDigestCache):
+    raise ValueError('Expected a FileDigestCache, given {}'.format(file_digest_cache))
+  global _FILE_DIGEST_CACHE
+  _FILE_DIGEST_CACHE = file_digest_cache
@@ -7,6 +7,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import hashlib
 
+from pants.base.file_digest_cache import digest_file_contents, get_file_digest_cache
+
 
 def hash_all(strs, digest=None):
   """Returns a hash of the concatenation of all the strings in strs.
@@ -22,12 +24,11 @@ def hash_all(strs, digest=None):
 def hash_file(path, digest=None):
   """Hashes the contents of the file at the given path and returns the hash digest in hex form.
 
-  If a hashlib message digest is not supplied a new sha1 message digest is used.
+  If a hashlib message digest is not supplied a new sha1 message digest is used, and the result is
+  served from the run's FileDigestCache when one is installed.
   """
-  digest = digest or hashlib.sha1()
-  with open(path, 'rb') as fd:
-    s = fd.read(8192)
-    while s:
-      digest.update(s)
-      s = fd.read(8192)
-  return digest.hexdigest()
+  if digest is None:
+    file_digest_cache = get_file_digest_cache()
+    if file_digest_cache is not None:
+      return file_digest_cache.digest(path)
+  return digest_file_contents(path, digest=digest)
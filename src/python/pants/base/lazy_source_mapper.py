@@ -6,9 +6,15 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import re
 from collections import defaultdict
 
+from twitter.common.dirutil.fileset import fnmatch_translate_extended
+
+from pants.backend.core.targets.resources import Resources
+from pants.base.address import SyntheticAddress
 from pants.base.build_environment import get_buildroot
+from pants.base.payload_field import DeferredSourcesField, SourcesField
 
 
 class LazySourceMapper(object):
@@ -23,88 +29,160 @@ class LazySourceMapper(object):
   when other sources are also mapped first, which cause those owners to be loaded. Some repositories
   may be able to use this to avoid expensive walks, but others may need to prefer correctness.
 
+  A target owns the sources matched by the globs it was declared with, its BUILD file, and the
+  sources of any resources it directly depends on.  Sources are matched against the globs rather
+  than the files they expand to, so deleted files are mapped too.  Each BUILD family is parsed and
+  each of its targets is instantiated at most once, and none of their dependencies are injected
+  into the BuildGraph.
+
   A LazySourceMapper reuses computed mappings and only searches a given path once as
-  populating the BuildGraph is expensive, so in general there should only be one instance of it.
+  loading BUILD files is expensive, so in general there should only be one instance of it.
   """
 
   def __init__(self, address_mapper, build_graph, stop_after_match=False):
     """Initialize LazySourceMapper.
 
-    :param AddressMapper address_mapper: An address mapper that can be used to populate the
-      `build_graph` with targets source mappings are needed for.
-    :param BuildGraph build_graph: The build graph to map sources from.
+    :param AddressMapper address_mapper: An address mapper that can be used to load the BUILD files
+      source mappings are needed for.
+    :param BuildGraph build_graph: The build graph that targets are instantiated for.
     :param bool stop_after_match: If `True` a search will not traverse into parent directories once
       an owner is identified.
     """
     self._stop_after_match = stop_after_match
     self._build_graph = build_graph
     self._address_mapper = address_mapper
-    self._source_to_address = defaultdict(set)
-    self._mapped_paths = set()
-    self._searched_sources = set()
+    self._owners_by_path = {}  # {spec_path: [_TargetSources]} for each searched path.
+    self._target_sources_by_address = {}  # {address: _TargetSources}
+    self._source_to_address = {}  # {source: set(address)} for fully searched sources.
 
-  def _find_owners(self, source):
-    """Searches for BUILD files adjacent or above a source in the file hierarchy.
-    - Walks up the directory tree until it reaches a previously searched path.
-    - Stops after looking in the buildroot.
+  def target_addresses_for_sources(self, sources):
+    """Attempt to find the targets which own each source by searching up directory structures to
+    the buildroot.
 
-    If self._stop_after_match is set, stops searching once a source is mapped, even if the parent
-    has yet to be searched. See class docstring for discussion.
+    Sources in the same directory share a single search.
 
-    :param str source: The source at which to start the search.
+    :param iterable sources: The sources to look up.
+    :returns: A dict from each source to the set of addresses of the targets that own it.
     """
-    # Bail instantly if a source has already been searched
-    if source in self._searched_sources:
-      return
-    self._searched_sources.add(source)
+    addresses_by_source = {}
+    sources_by_path = defaultdict(list)
+    for source in sources:
+      if source in self._source_to_address:
+        addresses_by_source[source] = self._source_to_address[source]
+      else:
+        sources_by_path[os.path.dirname(source)].append(source)
+
+    for path, path_sources in sources_by_path.items():
+      addresses_by_source.update(self._find_owners(path, path_sources))
+    return addresses_by_source
+
+  def target_addresses_for_source(self, source):
+    """Attempt to find targets which own a source by searching up directory structure to buildroot.
+
+    :param string source: The source to look up.
+    """
+    return self.target_addresses_for_sources([source])[source]
+
+  def _find_owners(self, path, sources):
+    """Searches for BUILD files adjacent or above the sources in a directory.
 
-    root = get_buildroot()
-    path = os.path.dirname(source)
+    If self._stop_after_match is set, stops searching parents that have yet to be searched once all
+    the sources are mapped. See class docstring for discussion.
+
+    :param string path: The directory containing the sources, relative to the buildroot.
+    :param list sources: The sources to search for.
+    """
+    addresses_by_source = dict((source, set()) for source in sources)
+    searched_all = True
 
     # a top-level source has empty dirname, so do/while instead of straight while loop.
     walking = True
     while walking:
-      # It is possible
-      if path not in self._mapped_paths:
-        candidate = self._address_mapper.from_cache(root_dir=root, relpath=path, must_exist=False)
-        if candidate.file_exists():
-          self._map_sources_from_family(candidate.family())
-        self._mapped_paths.add(path)
-      elif not self._stop_after_match:
-        # If not in stop-after-match mode, once a path is seen visited, all parents can be assumed.
-        return
-
-      # See class docstring
-      if self._stop_after_match and source in self._source_to_address:
-        return
+      if path not in self._owners_by_path:
+        if self._stop_after_match and all(addresses_by_source.values()):
+          searched_all = False
+        else:
+          self._owners_by_path[path] = self._map_family(path)
+      for target_sources in self._owners_by_path.get(path, ()):
+        for source in sources:
+          if self._owns(target_sources, source):
+            addresses_by_source[source].add(target_sources.address)
 
       walking = bool(path)
       path = os.path.dirname(path)
 
-  def _map_sources_from_family(self, build_files):
-    """Populate mapping of source to owning addresses with targets from given BUILD files.
-
-    :param iterable<BuildFile> build_files: a family of BUILD files from which to map sources.
+    # Owners found in stop-after-match mode may depend on what else has been searched, so are not
+    # reused.
+    if searched_all:
+      self._source_to_address.update(addresses_by_source)
+    return addresses_by_source
+
+  def _map_family(self, path):
+    """Returns the sources of the targets defined in the BUILD family at path, if any."""
+    candidate = self._address_mapper.from_cache(root_dir=get_buildroot(), relpath=path,
+                                                must_exist=False)
+    if not candidate.file_exists():
+      return []
+    return [self._target_sources(address)
+            for address in self._address_mapper.addresses_in_spec_path(path)]
+
+  def _target_sources(self, address):
+    if address not in self._target_sources_by_address:
+      target_address, addressable = self._address_mapper.resolve(address)
+      target = self._build_graph._target_addressable_to_target(target_address, addressable)
+      dependency_specs = list(addressable.dependency_specs)
+      dependency_specs.extend(target.traversable_dependency_specs)
+      dependency_addresses = [SyntheticAddress.parse(spec, relative_to=target_address.spec_path)
+                              for spec in dependency_specs]
+      self._target_sources_by_address[address] = _TargetSources(target, dependency_addresses)
+    return self._target_sources_by_address[address]
+
+  def _owns(self, target_sources, source):
+    if target_sources.owns(source):
+      return True
+    # Resources may only own files under their own directory, so only those dependencies that
+    # could own the source need be loaded.
+    for address in target_sources.dependency_addresses:
+      if not address.spec_path or source.startswith(address.spec_path + os.sep):
+        resources = self._target_sources(address)
+        if resources.is_resources and resources.owns(source):
+          return True
+    return False
+
+
+class _TargetSources(object):
+  """The sources of a target: its BUILD file and the filespecs of its sources fields."""
+
+  def __init__(self, target, dependency_addresses):
     """
-    for build_file in build_files:
-      address_map = self._address_mapper._address_map_from_spec_path(build_file.spec_path)
-      for address, addressable in address_map.values():
-        self._build_graph.inject_address_closure(address)
-        target = self._build_graph._target_addressable_to_target(address, addressable)
-        if target.has_resources:
-          for resource in target.resources:
-            for item in resource.sources_relative_to_buildroot():
-              self._source_to_address[item].add(target.address)
-
-        for target_source in target.sources_relative_to_buildroot():
-          self._source_to_address[target_source].add(target.address)
-        if not target.is_synthetic:
-          self._source_to_address[target.address.build_file.relpath].add(target.address)
-
-  def target_addresses_for_source(self, source):
-    """Attempt to find targets which own a source by searching up directory structure to buildroot.
-
-    :param string source: The source to look up.
+    :param target: A Target defined in a BUILD file, which need not be injected into the
+      BuildGraph.
+    :param list dependency_addresses: The addresses of the target's direct dependencies.
     """
-    self._find_owners(source)
-    return self._source_to_address[source]
+    self.address = target.address
+    self.dependency_addresses = dependency_addresses
+    self.is_resources = isinstance(target, Resources)
+    self._build_file_relpath = target.address.build_file.relpath
+    self._sources = set()
+    self._patterns = []  # [(include patterns, exclude patterns)]
+    for _, field in target.payload.fields:
+      if isinstance(field, SourcesField) and not isinstance(field, DeferredSourcesField):
+        if field.filespec is None:
+          self._sources.update(field.relative_to_buildroot())
+        else:
+          self._patterns.append(self._compile_filespec(field.filespec))
+
+  def owns(self, source):
+    if source == self._build_file_relpath or source in self._sources:
+      return True
+    return any(self._matches(source, includes, excludes) for includes, excludes in self._patterns)
+
+  def _matches(self, source, includes, excludes):
+    return (any(include.match(source) for include in includes) and
+            not any(self._matches(source, *exclude) for exclude in excludes))
+
+  def _compile_filespec(self, filespec):
+    includes = [re.compile(fnmatch_translate_extended(os.path.normpath(glob)))
+                for glob in filespec.get('globs', [])]
+    excludes = [self._compile_filespec(exclude) for exclude in filespec.get('exclude', [])]
+    return includes, excludes
@@ -12,6 +12,7 @@ class ParseContext(object):
   def __init__(self, rel_path, type_aliases):
     self._rel_path = rel_path
     self._type_aliases = type_aliases
+    self._globbed_dirs = []
 
   def create_object(self, alias, *args, **kwargs):
     """Constructs the type with the given alias using the given args and kwargs."""
@@ -26,3 +27,16 @@ class ParseContext(object):
     executing in.
     """
     return self._rel_path
+
+  def record_glob(self, rel_dir, recursive=False):
+    """Records that the BUILD file's contents depend on the listing of a directory.
+
+    :param string rel_dir: The globbed directory, relative to the build root.
+    :param bool recursive: Whether the glob may also have matched files in subdirectories.
+    """
+    self._globbed_dirs.append((rel_dir, recursive))
+
+  @property
+  def globbed_dirs(self):
+    """Returns a list of (rel_dir, recursive) tuples recorded by `record_glob`."""
+    return self._globbed_dirs
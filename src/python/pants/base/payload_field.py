@@ -13,6 +13,7 @@ from hashlib import sha1
 from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot
+from pants.base.hash_utils import hash_file
 from pants.base.validation import assert_list
 from pants.util.meta import AbstractClass
 
@@ -151,8 +152,7 @@ class SourcesField(PayloadField):
     hasher.update(self._rel_path)
     for source in sorted(self.relative_to_buildroot()):
       hasher.update(source)
-      with open(os.path.join(get_buildroot(), source), 'rb') as f:
-        hasher.update(f.read())
+      hasher.update(hash_file(os.path.join(get_buildroot(), source)))
     return hasher.hexdigest()
 
 
@@ -237,8 +237,7 @@ def hash_bundle(bundle):
     buildroot_relative_path = os.path.relpath(abs_path, get_buildroot())
     hasher.update(buildroot_relative_path)
     hasher.update(bundle.filemap[abs_path])
-    with open(abs_path, 'rb') as f:
-      hasher.update(f.read())
+    hasher.update(hash_file(abs_path))
   return hasher.hexdigest()
 
 
@@ -303,8 +302,7 @@ class FileField(PayloadField):
   def _compute_fingerprint(self):
     hasher = sha1()
     hasher.update(self._filepath)
-    with open(self._filepath, 'rb') as f:
-      hasher.update(f.read())
+    hasher.update(hash_file(self._filepath))
     return hasher.hexdigest()
 
 
@@ -63,7 +63,7 @@ class WorkUnit(object):
 
   PREP = 13      # Running a prep command
 
-  def __init__(self, run_info_dir, parent, name, labels=None, cmd=''):
+  def __init__(self, run_info_dir, parent, name, labels=None, cmd='', targets=None):
     """
     - run_info_dir: The path of the run_info_dir from the RunTracker that tracks this WorkUnit.
     - parent: The containing workunit, if any. E.g., 'compile' might contain 'java', 'scala' etc.,
@@ -73,6 +73,8 @@ class WorkUnit(object):
               display information about this work.
     - cmd: An optional longer string representing this work.
             E.g., the cmd line of a compiler invocation.
+    - targets: An optional iterable of the targets this work is done for. The time the work takes
+               is attributed to them in the RunTracker's duration history.
     """
     self._outcome = WorkUnit.UNKNOWN
 
@@ -83,6 +85,7 @@ class WorkUnit(object):
     self.name = name
     self.labels = set(labels or ())
     self.cmd = cmd
+    self.targets = list(targets or ())
     self.id = uuid.uuid4()
 
     # In seconds since the epoch. Doubles, to account for fractional seconds.
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import os
 import sys
 
 import pkg_resources
@@ -14,16 +15,19 @@ from pants.backend.core.tasks.task import QuietTaskMixin
 from pants.base.build_environment import get_buildroot, get_scm
 from pants.base.build_file import FilesystemBuildFile
 from pants.base.build_file_address_mapper import BuildFileAddressMapper
+from pants.base.build_file_parse_cache import BuildFileParseCache
 from pants.base.build_file_parser import BuildFileParser
 from pants.base.build_graph import BuildGraph
 from pants.base.cmd_line_spec_parser import CmdLineSpecParser
 from pants.base.extension_loader import load_plugins_and_backends
+from pants.base.file_digest_cache import FileDigestCache, set_file_digest_cache
 from pants.base.scm_build_file import ScmBuildFile
 from pants.base.workunit import WorkUnit
 from pants.engine.round_engine import RoundEngine
 from pants.goal.context import Context
 from pants.goal.goal import Goal
 from pants.goal.run_tracker import RunTracker
+from pants.java.distribution.distribution import Distribution
 from pants.java.nailgun_executor import NailgunProcessGroup  # XXX(pl)
 from pants.logging.setup import setup_logging
 from pants.option.global_options import GlobalOptionsRegistrar
@@ -126,9 +130,17 @@ class GoalRunner(object):
     else:
       self.run_tracker.log(Report.INFO, '(To run a reporting server: ./pants server)')
 
-    self.build_file_parser = BuildFileParser(build_configuration=build_configuration,
-                                             root_dir=self.root_dir,
-                                             run_tracker=self.run_tracker)
+    if self.global_options.file_digest_cache:
+      digest_cache_path = os.path.join(self.global_options.pants_workdir, 'file_digest_cache',
+                                       'digests.json')
+      self.file_digest_cache = FileDigestCache(digest_cache_path)
+    else:
+      self.file_digest_cache = FileDigestCache()
+    set_file_digest_cache(self.file_digest_cache)
+
+    if self.global_options.java_probe_cache:
+      bootstrap_dir = os.path.expanduser(self.global_options.pants_bootstrapdir)
+      Distribution.set_probe_cache_dir(os.path.join(bootstrap_dir, 'java_probes'))
 
     rev = self.options.for_global_scope().build_file_rev
     if rev:
@@ -137,7 +149,23 @@ class GoalRunner(object):
       build_file_type = ScmBuildFile
     else:
       build_file_type = FilesystemBuildFile
-    self.address_mapper = BuildFileAddressMapper(self.build_file_parser, build_file_type)
+
+    # BUILD files read from an scm rev have no stat info to validate globbed directories against.
+    if self.global_options.build_file_parse_cache and not rev:
+      parse_cache_path = os.path.join(self.global_options.pants_workdir, 'build_file_parse_cache',
+                                      'parse_cache.pickle')
+      self.build_file_parse_cache = BuildFileParseCache(build_configuration, self.root_dir,
+                                                        parse_cache_path)
+    else:
+      self.build_file_parse_cache = None
+
+    self.build_file_parser = BuildFileParser(build_configuration=build_configuration,
+                                             root_dir=self.root_dir,
+                                             run_tracker=self.run_tracker,
+                                             parse_cache=self.build_file_parse_cache)
+    scan_workers = self.global_options.build_file_scan_workers
+    self.address_mapper = BuildFileAddressMapper(self.build_file_parser, build_file_type,
+                                                 scan_workers=scan_workers)
     self.build_graph = BuildGraph(run_tracker=self.run_tracker,
                                   address_mapper=self.address_mapper)
 
@@ -224,6 +252,8 @@ class GoalRunner(object):
       fail()
       raise
     finally:
+      self._save_file_digest_cache()
+      self._save_build_file_parse_cache()
       self.run_tracker.end()
       # Must kill nailguns only after run_tracker.end() is called, otherwise there may still
       # be pending background work that needs a nailgun.
@@ -234,6 +264,25 @@ class GoalRunner(object):
         NailgunProcessGroup().killall()
     return result
 
+  def _save_file_digest_cache(self):
+    self.file_digest_cache.save()
+    self.run_tracker.run_info.add_infos(('file_digest_cache_hits', self.file_digest_cache.hits),
+                                        ('file_digest_cache_misses', self.file_digest_cache.misses))
+    self.run_tracker.log(Report.DEBUG,
+                         'File digest cache: {} hits, {} misses.'.format(
+                           self.file_digest_cache.hits, self.file_digest_cache.misses))
+
+  def _save_build_file_parse_cache(self):
+    if self.build_file_parse_cache is None:
+      return
+    self.build_file_parse_cache.save()
+    self.run_tracker.run_info.add_infos(
+      ('build_file_parse_cache_hits', self.build_file_parse_cache.hits),
+      ('build_file_parse_cache_misses', self.build_file_parse_cache.misses))
+    self.run_tracker.log(Report.DEBUG,
+                         'BUILD file parse cache: {} hits, {} misses.'.format(
+                           self.build_file_parse_cache.hits, self.build_file_parse_cache.misses))
+
   def _do_run(self):
     # Update the reporting settings, now that we have flags etc.
     def is_quiet_task():
@@ -9,6 +9,7 @@ import errno
 import os
 import shutil
 import tarfile
+import tempfile
 
 from pants.util.contextutil import open_tar
 from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_walk
@@ -73,18 +74,51 @@ class DirectoryArtifact(Artifact):
 
 class TarballArtifact(Artifact):
   """An artifact stored in a tarball."""
-  def __init__(self, artifact_root, tarfile, compression=9):
+
+  # The codecs a tarball may be compressed with, by name, mapped to the tarfile compression type
+  # and the extension of tarballs compressed with them.
+  # In our tests, gzip is slightly less compressive than bzip2 on .class files, but decompression
+  # times are much faster.  Artifacts that are already compressed, e.g., jars, gain little from
+  # either.
+  CODECS = {
+    'gzip': ('gz', '.tgz'),
+    'bzip2': ('bz2', '.tbz2'),
+    'none': ('', '.tar'),
+  }
+
+  DEFAULT_CODEC = 'gzip'
+
+  @classmethod
+  def extension(cls, codec):
+    """Returns the file extension of tarballs compressed with the given codec."""
+    return cls.CODECS[codec][1]
+
+  def __init__(self, artifact_root, tarfile, compression=9, codec=DEFAULT_CODEC):
+    """
+    :param str artifact_root: The path under which the artifact's files are read/written.
+    :param tarfile: The path of the tarball.
+    :param int compression: The compression level (0-9) for created tarballs.
+    :param str codec: The name of one of the CODECS to compress created tarballs with.  Tarballs
+      are always extracted according to their content.
+    """
     Artifact.__init__(self, artifact_root)
+    if codec not in self.CODECS:
+      raise ValueError('Unknown artifact compression codec {}, must be one of: {}'
+                       .format(codec, ', '.join(sorted(self.CODECS))))
     self._tarfile = tarfile
     self._compression = compression
+    self._codec = codec
 
   def collect(self, paths):
-    # In our tests, gzip is slightly less compressive than bzip2 on .class files,
-    # but decompression times are much faster.
-    mode = 'w:gz'
+    comptype = self.CODECS[self._codec][0]
+    mode = 'w:{}'.format(comptype)
 
     tar_kwargs = {'dereference': True, 'errorlevel': 2}
-    tar_kwargs['compresslevel'] = self._compression
+    if comptype == 'gz':
+      tar_kwargs['compresslevel'] = self._compression
+    elif comptype == 'bz2':
+      # Unlike gzip, bzip2 has no level 0.
+      tar_kwargs['compresslevel'] = max(1, self._compression)
 
     with open_tar(self._tarfile, mode, **tar_kwargs) as tarout:
       for path in paths or ():
@@ -112,12 +146,55 @@ class TarballArtifact(Artifact):
           else:
             dirs.add(os.path.dirname(tarinfo.name))
         for d in dirs:
-          try:
-            os.makedirs(os.path.join(self._artifact_root, d))
-          except OSError as e:
-            if e.errno != errno.EEXIST:
-              raise
+          self._make_dir(d)
         tarin.extractall(self._artifact_root)
         self._relpaths.update(paths)
     except tarfile.ReadError as e:
       raise ArtifactError(str(e))
+
+  def extract_stream(self, fileobj):
+    """Extract the files in a tarball read from fileobj to their locations under artifact root.
+
+    The tarball is read front to back, so it can be extracted as it is downloaded without first
+    being written to disk.  This artifact's own tarfile is not used.
+
+    Files are extracted to a staging directory under artifact root and only moved into place once
+    the whole tarball has been read, so a stream that fails midway leaves no partial files behind.
+
+    :param fileobj: A file-like object supporting `read`; it need not support `seek`.
+    """
+    safe_mkdir(self._artifact_root)
+    # The staging directory must be on the same filesystem as artifact root to rename out of it.
+    staging_dir = tempfile.mkdtemp(dir=self._artifact_root, prefix='.extract.')
+    try:
+      members = []  # [(relpath, is directory)] in tarball order.
+      try:
+        with open_tar(fileobj, 'r|*', errorlevel=2) as tarin:
+          for tarinfo in tarin:
+            if not tarinfo.isdir():
+              tarin.extract(tarinfo, staging_dir)
+            members.append((tarinfo.name, tarinfo.isdir()))
+      except tarfile.TarError as e:
+        raise ArtifactError(str(e))
+
+      dirs = set()
+      for relpath, isdir in members:
+        # As in extract, create parent directories ourselves to avoid racing concurrent
+        # extractions.  Directory members need nothing more.
+        d = relpath if isdir else os.path.dirname(relpath)
+        if d not in dirs:
+          self._make_dir(d)
+          dirs.add(d)
+        # A tarball may hold several members with the same name: the last one extracted wins.
+        if not isdir and relpath not in self._relpaths:
+          os.rename(os.path.join(staging_dir, relpath), os.path.join(self._artifact_root, relpath))
+        self._relpaths.add(relpath)
+    finally:
+      shutil.rmtree(staging_dir, ignore_errors=True)
+
+  def _make_dir(self, relpath):
+    try:
+      os.makedirs(os.path.join(self._artifact_root, relpath))
+    except OSError as e:
+      if e.errno != errno.EEXIST:
+        raise
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import os
 import sys
+from multiprocessing.pool import ThreadPool
 
 
 # Note throughout the distinction between the artifact_root (which is where the artifacts are
@@ -108,6 +109,17 @@ class ArtifactCache(object):
   def has(self, cache_key):
     pass
 
+  def has_many(self, cache_keys, concurrency=1):
+    """Checks whether each of the given keys is in the cache.
+
+    Implementations may check the keys in fewer or concurrent requests.
+
+    :param list cache_keys: CacheKey objects.
+    :param int concurrency: The maximum number of keys to check at once.
+    :returns: A list of booleans, one per key, in order.
+    """
+    return thread_map(self.has, cache_keys, concurrency)
+
   def use_cached_files(self, cache_key):
     """Use the files cached for the given key.
 
@@ -129,6 +141,16 @@ class ArtifactCache(object):
     """
     pass
 
+  def use_cached_files_many(self, cache_keys, concurrency=1):
+    """Uses the files cached for each of the given keys, as per `use_cached_files`.
+
+    :param list cache_keys: CacheKey objects.
+    :param int concurrency: The maximum number of artifacts to fetch and extract at once.
+    :returns: A list of `use_cached_files` results, one per key, in order.
+    """
+    return thread_map(lambda cache_key: call_use_cached_files((self, cache_key)), cache_keys,
+                      concurrency)
+
   def delete(self, cache_key):
     """Delete the artifacts for the specified key.
 
@@ -137,6 +159,22 @@ class ArtifactCache(object):
     """
     pass
 
+def thread_map(f, items, num_threads):
+  """Map function `f` over `items` on up to `num_threads` threads and return the results.
+
+  Cache operations are dominated by IO, so threads suffice, and unlike a process pool neither `f`
+  nor `items` need be pickleable.
+  """
+  items = list(items)
+  if num_threads <= 1 or len(items) <= 1:
+    return map(f, items)
+  pool = ThreadPool(processes=min(num_threads, len(items)))
+  try:
+    # Wait with a timeout, as without one SIGINT can be missed.
+    return pool.map_async(f, items, chunksize=1).get(timeout=1000000000)
+  finally:
+    pool.terminate()
+
 def call_use_cached_files(tup):
   """Importable helper for multi-proc calling of ArtifactCache.use_cached_files on a cache instance.
 
@@ -0,0 +1,285 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from pants.cache.artifact import TarballArtifact
+from pants.util.dirutil import safe_atomic_open, safe_delete, safe_mkdir, safe_walk, touch
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCacheIndex(object):
+  """A persistent index of the size and last access time of the artifacts under a cache root.
+
+  The index bounds the total size and the age of the artifacts under its root, which may be shared
+  by the local artifact caches of many tasks and of many concurrent pants runs.  Once enough has
+  been inserted that the bounds may have been exceeded, the insert that noticed evicts the least
+  recently used artifacts, unless another process is already evicting.
+
+  Each process appends a record to the index when it stores or uses an artifact, and eviction
+  compacts those records.  File locks ensure that only one process evicts at a time, and that no
+  records are lost when the index is compacted.  All state is kept on disk, so that inserts made by
+  the workers of a multiprocessing pool, each with its own copy of the index, are accounted for
+  together.
+  """
+
+  INDEX_FILENAME = '.index'
+  INDEX_LOCK_FILENAME = '.index.lock'
+  EVICTOR_LOCK_FILENAME = '.evictor.lock'
+  # The bytes inserted and the time since the bounds were last checked.
+  CHECK_STATE_FILENAME = '.check'
+  # The artifacts that have been removed from the index but may not have been deleted yet.
+  EVICTING_FILENAME = '.evicting'
+  # Marks that the artifacts stored before the root was indexed have been indexed.
+  SCANNED_FILENAME = '.scanned'
+
+  # Evict down to this fraction of the max size, so that eviction needn't run on every insert.
+  LOW_WATER_MARK = 0.8
+
+  # Check the bounds again once this fraction of the max size has been inserted, or of the max age
+  # has passed.
+  CHECK_INTERVAL = 0.05
+
+  _shared = {}
+  _shared_lock = threading.Lock()
+
+  @classmethod
+  def shared(cls, root, max_size=None, max_age_secs=None):
+    """Returns an index of root that is shared by all callers in this process with the same bounds.
+
+    Sharing an index lets the caches of many tasks under the same root amortize eviction together.
+    """
+    key = (os.path.realpath(root), max_size, max_age_secs)
+    with cls._shared_lock:
+      if key not in cls._shared:
+        cls._shared[key] = cls(*key)
+      return cls._shared[key]
+
+  def __init__(self, root, max_size=None, max_age_secs=None):
+    """
+    :param string root: The directory the artifacts are stored under.
+    :param int max_size: The maximum total size of the artifacts, in bytes, or None for no bound.
+    :param max_age_secs: The maximum time since an artifact was last stored or used, in seconds, or
+      None for no bound.
+    """
+    self._root = os.path.realpath(root)
+    self._index_file = os.path.join(self._root, self.INDEX_FILENAME)
+    self._max_size = max_size
+    self._max_age_secs = max_age_secs
+
+  @property
+  def root(self):
+    return self._root
+
+  def record_insert(self, path):
+    """Records that the artifact at path was just stored, and evicts artifacts if needed."""
+    size = os.path.getsize(path)
+    now = time.time()
+    with self._lock_file(self.INDEX_LOCK_FILENAME, fcntl.LOCK_EX):
+      self._append_locked(path, size, now)
+      pending_bytes, checked_at = self._read_check_state()
+      pending_bytes += size
+      check = (checked_at is None or
+               (self._max_size is not None and
+                pending_bytes >= self._max_size * self.CHECK_INTERVAL) or
+               (self._max_age_secs is not None and
+                now - checked_at >= self._max_age_secs * self.CHECK_INTERVAL))
+      if check:
+        pending_bytes, checked_at = 0, now
+      with safe_atomic_open(os.path.join(self._root, self.CHECK_STATE_FILENAME)) as fd:
+        json.dump([pending_bytes, checked_at], fd)
+    if check:
+      self._evict_quietly()
+
+  def record_use(self, path):
+    """Records that the artifact at path was just used."""
+    self._append(path, None, time.time())
+
+  def record_delete(self, path):
+    """Records that the artifact at path was deleted."""
+    self._append(path, None, None)
+
+  def evict(self):
+    """Evicts artifacts until the index's bounds are met.
+
+    Does nothing if another process is already evicting from the same root.
+
+    :returns: The paths of the evicted artifacts, or None if eviction was skipped.
+    """
+    with self._lock_file(self.EVICTOR_LOCK_FILENAME, fcntl.LOCK_EX | fcntl.LOCK_NB) as locked:
+      if not locked:
+        return None
+      # Index any artifacts stored before the root was indexed.  Inserts append to the index before
+      # they first evict, so the index existing does not mean the root was scanned.  This may take
+      # a while, so is done before blocking appenders.
+      scanned_file = os.path.join(self._root, self.SCANNED_FILENAME)
+      scanned = None if os.path.exists(scanned_file) else self._scan()
+
+      evicting_file = os.path.join(self._root, self.EVICTING_FILENAME)
+      with self._lock_file(self.INDEX_LOCK_FILENAME, fcntl.LOCK_EX):
+        entries = self._read_index()
+        # The records of indexed artifacts are more accurate than their modification times.
+        for relpath, entry in (scanned or {}).items():
+          entries.setdefault(relpath, entry)
+        # Finish the deletions of an interrupted eviction, except of artifacts stored again since.
+        unfinished = [relpath for relpath in self._read_evicting(evicting_file)
+                      if relpath not in entries]
+        evicted = self._select_evictions(entries)
+        if evicted or unfinished:
+          # Record the deletions before dropping the artifacts from the index, so that they are
+          # finished by the next eviction if this process dies before deleting them.
+          with safe_atomic_open(evicting_file) as fd:
+            json.dump(unfinished + evicted, fd)
+        for relpath in evicted:
+          del entries[relpath]
+        self._write_index(entries)
+        if scanned is not None:
+          touch(scanned_file)
+
+      for relpath in unfinished + evicted:
+        safe_delete(os.path.join(self._root, relpath))
+      safe_delete(evicting_file)
+      if evicted:
+        logger.debug('Evicted {} artifacts from {}.'.format(len(evicted), self._root))
+      return [os.path.join(self._root, relpath) for relpath in evicted]
+
+  def _select_evictions(self, entries):
+    # Resolve the size of artifacts only known to have been used, and forget vanished ones.
+    for relpath, (size, atime) in list(entries.items()):
+      if size is None:
+        size = self._size(relpath)
+        if size is None:
+          del entries[relpath]
+        else:
+          entries[relpath] = (size, atime)
+
+    total_size = sum(size for size, _ in entries.values())
+    min_atime = None if self._max_age_secs is None else time.time() - self._max_age_secs
+    exceeds_size = self._max_size is not None and total_size > self._max_size
+    evicted = []
+    for relpath, (size, atime) in sorted(entries.items(), key=lambda entry: entry[1][1]):
+      expired = min_atime is not None and atime < min_atime
+      if not expired and not (exceeds_size and total_size > self._max_size * self.LOW_WATER_MARK):
+        break
+      total_size -= size
+      evicted.append(relpath)
+    return evicted
+
+  def _evict_quietly(self):
+    try:
+      self.evict()
+    except Exception as e:
+      # Eviction is best-effort: a failure must never fail the build.
+      logger.warn('Error while evicting from local artifact cache {}: {}'.format(self._root, e))
+
+  def _append(self, path, size, atime):
+    with self._lock_file(self.INDEX_LOCK_FILENAME, fcntl.LOCK_SH):
+      self._append_locked(path, size, atime)
+
+  def _append_locked(self, path, size, atime):
+    record = json.dumps([os.path.relpath(path, self._root), size, atime])
+    with open(self._index_file, 'ab') as fd:
+      # A single write of a whole record, so that concurrent appenders don't interleave.
+      fd.write(record + b'\n')
+
+  def _read_check_state(self):
+    """Returns the bytes inserted and the time since the bounds were last checked, if ever."""
+    try:
+      with open(os.path.join(self._root, self.CHECK_STATE_FILENAME), 'rb') as fd:
+        pending_bytes, checked_at = json.load(fd)
+        return pending_bytes, checked_at
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    except ValueError:
+      pass
+    return 0, None
+
+  def _read_evicting(self, evicting_file):
+    try:
+      with open(evicting_file, 'rb') as fd:
+        return json.load(fd)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    except ValueError:
+      pass
+    return []
+
+  @contextmanager
+  def _lock_file(self, filename, operation):
+    """Holds a lock on the named file for the duration of the context.
+
+    Yields False if the operation is non-blocking and the lock is held elsewhere, True otherwise.
+    """
+    safe_mkdir(self._root)
+    with open(os.path.join(self._root, filename), 'a') as lock:
+      try:
+        fcntl.flock(lock, operation)
+      except IOError as e:
+        if e.errno not in (errno.EAGAIN, errno.EACCES):
+          raise
+        yield False
+      else:
+        yield True
+
+  def _read_index(self):
+    """Returns a dict from relpath to (size, atime)."""
+    entries = {}
+    try:
+      with open(self._index_file, 'rb') as fd:
+        for line in fd:
+          try:
+            relpath, size, atime = json.loads(line)
+          except ValueError:
+            # A partially written record from an interrupted run.
+            continue
+          if atime is None:
+            entries.pop(relpath, None)
+          else:
+            previous_size, previous_atime = entries.get(relpath, (None, None))
+            entries[relpath] = (previous_size if size is None else size,
+                                max(atime, previous_atime))
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    return entries
+
+  def _scan(self):
+    """Indexes the artifacts stored under the root before it was indexed."""
+    extensions = tuple(TarballArtifact.extension(codec) for codec in TarballArtifact.CODECS)
+    entries = {}
+    for dirpath, _, filenames in safe_walk(self._root):
+      for filename in filenames:
+        if filename.endswith(extensions):
+          path = os.path.join(dirpath, filename)
+          stat = os.stat(path)
+          entries[os.path.relpath(path, self._root)] = (stat.st_size, stat.st_mtime)
+    return entries
+
+  def _size(self, relpath):
+    try:
+      return os.path.getsize(os.path.join(self._root, relpath))
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return None
+
+  def _write_index(self, entries):
+    with safe_atomic_open(self._index_file) as fd:
+      for relpath, (size, atime) in sorted(entries.items()):
+        fd.write(json.dumps([relpath, size, atime]))
+        fd.write(b'\n')
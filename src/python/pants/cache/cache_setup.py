@@ -12,10 +12,12 @@ import urlparse
 from six import string_types
 from six.moves import range
 
+from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCacheError
+from pants.cache.artifact_cache_index import ArtifactCacheIndex
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
 from pants.cache.pinger import Pinger
-from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.cache.restful_artifact_cache import RequestsSession, RESTfulArtifactCache
 from pants.option.options import Options
 from pants.subsystem.subsystem import Subsystem
 
@@ -50,26 +52,46 @@ class CacheSetup(Subsystem):
                   'cache, a path of a filesystem cache, or a pipe-separated list of alternate '
                   'caches to choose from.')
     register('--compression-level', advanced=True, type=int, default=5, recursive=True,
-             help='The gzip compression level (0-9) for created artifacts.')
+             help='The compression level (0-9) for created artifacts.')
+    register('--compression-codec', advanced=True, choices=sorted(TarballArtifact.CODECS),
+             default=None, recursive=True,
+             help='The codec to compress created artifacts with. Artifacts created with '
+                  'different codecs are stored under different keys. If unspecified, uses the '
+                  "task's default codec.")
     register('--max-entries-per-target', advanced=True, recursive=True, type=int, default=None,
              help='Maximum number of old cache files to keep per task target pair')
+    register('--local-max-size-mb', advanced=True, recursive=True, type=int, default=None,
+             help='The maximum total size of the artifacts in each local cache directory, shared '
+                  'by all tasks. Once exceeded, the least recently used artifacts are evicted.')
+    register('--local-max-age-days', advanced=True, recursive=True, type=int, default=None,
+             help='Evict artifacts from local caches once they have not been written or read for '
+                  'this many days.')
+    register('--read-concurrency', advanced=True, type=int, default=16, recursive=True,
+             help='The number of artifacts to fetch and extract from the read cache at once.')
 
   @classmethod
   def create_cache_factory_for_task(cls, task):
     return CacheFactory(cls.instance_for_task(task).get_options(),
-                        task.context.log, task.stable_name())
+                        task.context.log, task.stable_name(),
+                        default_compression_codec=task.artifact_compression_codec())
 
 
 class CacheFactory(object):
-  def __init__(self, options, log, stable_name, pinger=None):
+  def __init__(self, options, log, stable_name, pinger=None,
+               default_compression_codec=TarballArtifact.DEFAULT_CODEC):
     self._options = options
     self._log = log
     self._stable_name = stable_name
+    self._default_compression_codec = default_compression_codec
 
     # Created on-demand.
     self._read_cache = None
     self._write_cache = None
 
+    # Whether artifact urls are known to exist, shared by the read and write caches so that, e.g.,
+    # a read miss needn't be followed by a check before writing.
+    self._known_urls = {}
+
     # Protects local filesystem setup, and assignment to the references above.
     self._cache_setup_lock = threading.Lock()
 
@@ -87,6 +109,9 @@ class CacheFactory(object):
   def overwrite(self):
     return self._options.overwrite
 
+  def read_concurrency(self):
+    return max(1, self._options.read_concurrency)
+
   def get_read_cache(self):
     """Returns the read cache for this setup, creating it if necessary.
 
@@ -136,13 +161,26 @@ class CacheFactory(object):
     compression = self._options.compression_level
     if compression not in range(10):
       raise ValueError('compression_level must be an integer 0-9: {}'.format(compression))
+    codec = self._options.compression_codec or self._default_compression_codec
     artifact_root = self._options.pants_workdir
 
     def create_local_cache(parent_path):
       path = os.path.join(parent_path, self._stable_name)
       self._log.debug('{0} {1} local artifact cache at {2}'
                       .format(self._stable_name, action, path))
-      return LocalArtifactCache(artifact_root, path, compression, self._options.max_entries_per_target)
+      return LocalArtifactCache(artifact_root, path, compression,
+                                self._options.max_entries_per_target, codec=codec,
+                                index=create_local_cache_index(parent_path))
+
+    def create_local_cache_index(parent_path):
+      max_size_mb = self._options.local_max_size_mb
+      max_age_days = self._options.local_max_age_days
+      if max_size_mb is None and max_age_days is None:
+        return None
+      return ArtifactCacheIndex.shared(
+        os.path.expanduser(parent_path),
+        max_size=None if max_size_mb is None else max_size_mb * 1024 * 1024,
+        max_age_secs=None if max_age_days is None else max_age_days * 24 * 60 * 60)
 
     def create_remote_cache(urls, local_cache):
       best_url = self.select_best_url(urls)
@@ -150,8 +188,9 @@ class CacheFactory(object):
         url = best_url.rstrip('/') + '/' + self._stable_name
         self._log.debug('{0} {1} remote artifact cache at {2}'
                         .format(self._stable_name, action, url))
-        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression)
-        return RESTfulArtifactCache(artifact_root, url, local_cache)
+        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression, codec=codec)
+        RequestsSession.ensure_max_connections_per_host(self.read_concurrency())
+        return RESTfulArtifactCache(artifact_root, url, local_cache, known_urls=self._known_urls)
 
     def is_local(string_spec):
       return string_spec.startswith('/') or string_spec.startswith('~')
@@ -161,7 +200,8 @@ class CacheFactory(object):
 
     def create_cache_from_string_spec(string_spec):
       if is_remote(string_spec):
-        return create_remote_cache(string_spec, TempLocalArtifactCache(artifact_root, compression))
+        return create_remote_cache(string_spec,
+                                   TempLocalArtifactCache(artifact_root, compression, codec=codec))
       elif is_local(string_spec):
         return create_local_cache(string_spec)
       else:
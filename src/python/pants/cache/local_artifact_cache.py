@@ -18,18 +18,25 @@ from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for
 logger = logging.getLogger(__name__)
 
 class BaseLocalArtifactCache(ArtifactCache):
-  def __init__(self, artifact_root, compression):
+  def __init__(self, artifact_root, compression, codec=TarballArtifact.DEFAULT_CODEC):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
-    :param int compression: The gzip compression level for created artifacts.
+    :param int compression: The compression level for created artifacts.
                             Valid values are 0-9.
+    :param str codec: The name of the TarballArtifact codec to compress created artifacts with.
     """
     super(BaseLocalArtifactCache, self).__init__(artifact_root)
     self._compression = compression
+    self._codec = codec
     self._cache_root = None
 
+  @property
+  def artifact_extension(self):
+    """The file extension of the tarballs created by this cache, which identifies their codec."""
+    return TarballArtifact.extension(self._codec)
+
   def _artifact(self, path):
-    return TarballArtifact(self.artifact_root, path, self._compression)
+    return TarballArtifact(self.artifact_root, path, self._compression, codec=self._codec)
 
   @contextmanager
   def _tmpfile(self, cache_key, use):
@@ -47,30 +54,91 @@ class BaseLocalArtifactCache(ArtifactCache):
   def store_and_use_artifact(self, cache_key, src):
     """
       Read the contents of an tarball from an iterator and return an artifact stored in the cache
+
+      The tarball is extracted as it is read.  Caches that keep their tarballs also write it to a
+      temporary file alongside, which is stored once the tarball has been read in full.
     """
+    if not self._stores_tarballs:
+      self._artifact(None).extract_stream(_ChunkReader(src))
+      return True
+
     with self._tmpfile(cache_key, 'read') as tmp:
-      for chunk in src:
-        tmp.write(chunk)
+      reader = _ChunkReader(src, tee=tmp)
+      self._artifact(tmp.name).extract_stream(reader)
+      # The tar stream may end before the compressed data does: capture all of it.
+      reader.drain()
       tmp.close()
-      self._artifact(self._store_tarball(cache_key, tmp.name)).extract()
+      self._store_tarball(cache_key, tmp.name)
       return True
 
+  # Whether _store_tarball keeps tarballs, rather than discarding them once they are extracted.
+  _stores_tarballs = True
+
   def _store_tarball(self, cache_key, src):
     """Given a src path to an artifact tarball, store it and return stored artifact's path."""
     pass
 
+
+class _ChunkReader(object):
+  """Adapts an iterator of byte chunks to a minimal, read-only file-like object.
+
+  :param chunks: An iterator of byte strings.
+  :param tee: An optional file to write every chunk read to.
+  """
+
+  def __init__(self, chunks, tee=None):
+    self._chunks = iter(chunks)
+    self._tee = tee
+    self._chunk = b''
+    self._pos = 0
+
+  def _next_chunk(self):
+    for chunk in self._chunks:
+      if chunk:
+        if self._tee:
+          self._tee.write(chunk)
+        return chunk
+    return b''
+
+  def read(self, size=-1):
+    # Slice pieces out of the current chunk rather than buffering, as chunks may be large.
+    pieces = []
+    remaining = size
+    while remaining != 0:
+      if self._pos >= len(self._chunk):
+        self._chunk = self._next_chunk()
+        self._pos = 0
+        if not self._chunk:
+          break
+      end = len(self._chunk) if remaining < 0 else min(len(self._chunk), self._pos + remaining)
+      pieces.append(self._chunk[self._pos:end])
+      if remaining > 0:
+        remaining -= end - self._pos
+      self._pos = end
+    return b''.join(pieces)
+
+  def drain(self):
+    """Reads the remaining chunks, so that they are written to the tee."""
+    while self._next_chunk():
+      pass
+
 class LocalArtifactCache(BaseLocalArtifactCache):
   """An artifact cache that stores the artifacts in local files."""
-  def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None):
+  def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None,
+               codec=TarballArtifact.DEFAULT_CODEC, index=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param str cache_root: The locally cached files are stored under this directory.
-    :param int compression: The gzip compression level for created artifacts (1-9 or false-y).
+    :param int compression: The compression level for created artifacts (1-9 or false-y).
     :param int max_entries_per_target: The maximum number of old cache files to leave behind on a cache miss.
+    :param str codec: The name of the TarballArtifact codec to compress created artifacts with.
+    :param index: An optional ArtifactCacheIndex, rooted at or above cache_root, that bounds the
+      size and age of the cache.
     """
-    super(LocalArtifactCache, self).__init__(artifact_root, compression)
+    super(LocalArtifactCache, self).__init__(artifact_root, compression, codec=codec)
     self._cache_root = os.path.realpath(os.path.expanduser(cache_root))
     self._max_entries_per_target = max_entries_per_target
+    self._index = index
     safe_mkdir(self._cache_root)
 
   def prune(self, root):
@@ -94,6 +162,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
       found_files = sorted(found_files, key=lambda x: x[1], reverse=True)
       for cur_file in found_files[self._max_entries_per_target:]:
         safe_delete(cur_file[0])
+        if self._index:
+          self._index.record_delete(cur_file[0])
 
   def has(self, cache_key):
     return os.path.isfile(self._cache_file_for_key(cache_key))
@@ -103,6 +173,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
     safe_mkdir_for(dest)
     self.prune(os.path.dirname(dest))  # Remove old cache files.
     os.rename(src, dest)
+    if self._index:
+      self._index.record_insert(dest)
     return dest
 
   def use_cached_files(self, cache_key):
@@ -110,6 +182,8 @@ class LocalArtifactCache(BaseLocalArtifactCache):
       tarfile = self._cache_file_for_key(cache_key)
       if os.path.exists(tarfile):
         self._artifact(tarfile).extract()
+        if self._index:
+          self._index.record_use(tarfile)
         return True
     except Exception as e:
       # TODO(davidt): Consider being more granular in what is caught.
@@ -124,11 +198,14 @@ class LocalArtifactCache(BaseLocalArtifactCache):
 
   def delete(self, cache_key):
     safe_delete(self._cache_file_for_key(cache_key))
+    if self._index:
+      self._index.record_delete(self._cache_file_for_key(cache_key))
 
   def _cache_file_for_key(self, cache_key):
     # Note: it's important to use the id as well as the hash, because two different targets
     # may have the same hash if both have no sources, but we may still want to differentiate them.
-    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + '.tgz'
+    # The extension identifies the codec, so that caches using different codecs can share a root.
+    return os.path.join(self._cache_root, cache_key.id, cache_key.hash) + self.artifact_extension
 
 
 class TempLocalArtifactCache(BaseLocalArtifactCache):
@@ -137,11 +214,15 @@ class TempLocalArtifactCache(BaseLocalArtifactCache):
   This implementation does not have a backing _cache_root, and never
   actually stores files between calls, but is useful for handling file IO for a remote cache.
   """
-  def __init__(self, artifact_root, compression):
+  def __init__(self, artifact_root, compression, codec=TarballArtifact.DEFAULT_CODEC):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
+    :param str codec: The name of the TarballArtifact codec to compress created artifacts with.
     """
-    super(TempLocalArtifactCache, self).__init__(artifact_root, compression=compression)
+    super(TempLocalArtifactCache, self).__init__(artifact_root, compression=compression,
+                                                 codec=codec)
+
+  _stores_tarballs = False
 
   def _store_tarball(self, cache_key, src):
     return src
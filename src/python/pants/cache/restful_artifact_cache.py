@@ -6,13 +6,14 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import threading
 import urlparse
 
 import requests
 from requests import RequestException
 
 from pants.cache.artifact_cache import (ArtifactCache, ArtifactCacheError,
-                                        NonfatalArtifactCacheError, UnreadableArtifact)
+                                        NonfatalArtifactCacheError, UnreadableArtifact, thread_map)
 
 
 logger = logging.getLogger(__name__)
@@ -27,23 +28,43 @@ class InvalidRESTfulCacheProtoError(ArtifactCacheError):
 
 class RequestsSession(object):
   _session = None
+  _max_connections_per_host = requests.adapters.DEFAULT_POOLSIZE
+  _lock = threading.Lock()
+
   @classmethod
   def instance(cls):
-    if cls._session is None:
-      cls._session = requests.Session()
-    return cls._session
+    with cls._lock:
+      if cls._session is None:
+        cls._session = requests.Session()
+        # Keep enough connections alive to each cache host to serve concurrent requests.
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=cls._max_connections_per_host)
+        cls._session.mount('http://', adapter)
+        cls._session.mount('https://', adapter)
+      return cls._session
+
+  @classmethod
+  def ensure_max_connections_per_host(cls, max_connections_per_host):
+    """Ensures the shared session pools at least this many connections to each host."""
+    with cls._lock:
+      if max_connections_per_host > cls._max_connections_per_host:
+        cls._max_connections_per_host = max_connections_per_host
+        cls._session = None
 
 class RESTfulArtifactCache(ArtifactCache):
   """An artifact cache that stores the artifacts on a RESTful service."""
 
   READ_SIZE_BYTES = 4 * 1024 * 1024
 
-  def __init__(self, artifact_root, url_base, local):
+  def __init__(self, artifact_root, url_base, local, known_urls=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param str url_base: The prefix for urls on some RESTful service. We must be able to PUT and
                          GET to any path under this base.
     :param BaseLocalArtifactCache local: local cache instance for storing and creating artifacts
+    :param dict known_urls: An optional map from artifact url to whether it exists, which is
+                            consulted and updated to avoid repeating existence checks.  May be
+                            shared, e.g., by the read and write caches for a task.  If omitted,
+                            every check is made against the server.
     """
     super(RESTfulArtifactCache, self).__init__(artifact_root)
     parsed_url = urlparse.urlparse(url_base)
@@ -58,6 +79,7 @@ class RESTfulArtifactCache(ArtifactCache):
     self._netloc = parsed_url.netloc
     self._path_prefix = parsed_url.path.rstrip(b'/')
     self._localcache = local
+    self._known_urls = known_urls
 
   def try_insert(self, cache_key, paths):
     # Delegate creation of artifact to local cache.
@@ -68,11 +90,39 @@ class RESTfulArtifactCache(ArtifactCache):
         if not self._request('PUT', remote_path, body=infile):
           url = self._url_string(remote_path)
           raise NonfatalArtifactCacheError('Failed to PUT to {0}.'.format(url))
+        self._remember(self._url_string(remote_path), True)
 
   def has(self, cache_key):
     if self._localcache.has(cache_key):
       return True
-    return self._request('HEAD', self._remote_path_for_key(cache_key)) is not None
+    return self._remote_has(cache_key)
+
+  def has_many(self, cache_keys, concurrency=1):
+    # Only keys that are neither local nor already known need a request, and those requests are
+    # issued concurrently over the session's pooled connections.
+    results = [self._localcache.has(cache_key) or
+               self._known(self._url_for_key(cache_key))
+               for cache_key in cache_keys]
+    unknown = [i for i, result in enumerate(results) if result is None]
+    for i, exists in zip(unknown, thread_map(self._remote_has, [cache_keys[i] for i in unknown],
+                                             concurrency)):
+      results[i] = exists
+    return [bool(result) for result in results]
+
+  def _remote_has(self, cache_key):
+    url = self._url_for_key(cache_key)
+    exists = self._known(url)
+    if exists is None:
+      exists = self._request('HEAD', self._remote_path_for_key(cache_key)) is not None
+      self._remember(url, exists)
+    return exists
+
+  def _known(self, url):
+    return self._known_urls.get(url) if self._known_urls is not None else None
+
+  def _remember(self, url, exists):
+    if self._known_urls is not None:
+      self._known_urls[url] = exists
 
   def use_cached_files(self, cache_key):
     if self._localcache.has(cache_key):
@@ -81,10 +131,14 @@ class RESTfulArtifactCache(ArtifactCache):
     remote_path = self._remote_path_for_key(cache_key)
     try:
       response = self._request('GET', remote_path)
+      self._remember(self._url_string(remote_path), response is not None)
       if response is not None:
-        # Delegate storage and extraction to local cache
-        byte_iter = response.iter_content(self.READ_SIZE_BYTES)
-        return self._localcache.store_and_use_artifact(cache_key, byte_iter)
+        try:
+          # Delegate storage and extraction to local cache, which streams the body as it arrives.
+          byte_iter = response.iter_content(self.READ_SIZE_BYTES)
+          return self._localcache.store_and_use_artifact(cache_key, byte_iter)
+        finally:
+          response.close()
     except Exception as e:
       logger.warn('\nError while reading from remote artifact cache: {0}\n'.format(e))
       return UnreadableArtifact(cache_key, e)
@@ -94,10 +148,17 @@ class RESTfulArtifactCache(ArtifactCache):
   def delete(self, cache_key):
     self._localcache.delete(cache_key)
     remote_path = self._remote_path_for_key(cache_key)
+    if self._known_urls is not None:
+      self._known_urls.pop(self._url_string(remote_path), None)
     self._request('DELETE', remote_path)
 
+  def _url_for_key(self, cache_key):
+    return self._url_string(self._remote_path_for_key(cache_key))
+
   def _remote_path_for_key(self, cache_key):
-    return '{0}/{1}/{2}.tgz'.format(self._path_prefix, cache_key.id, cache_key.hash)
+    # Encode the codec the local cache creates artifacts with, as in its own paths.
+    return '{0}/{1}/{2}{3}'.format(self._path_prefix, cache_key.id, cache_key.hash,
+                                   self._localcache.artifact_extension)
 
   # Returns a response if we get a 200, None if we get a 404 and raises an exception otherwise.
   def _request(self, method, path, body=None):
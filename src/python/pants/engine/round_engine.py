@@ -14,6 +14,7 @@ from pants.base.exceptions import TaskError
 from pants.base.workunit import WorkUnit
 from pants.engine.engine import Engine
 from pants.engine.round_manager import RoundManager
+from pants.goal.goal import Goal
 
 
 class GoalExecutor(object):
@@ -192,12 +193,46 @@ class RoundEngine(Engine):
     for goal_info in reversed(list(self._topological_sort(goal_info_by_goal))):
       yield GoalExecutor(context, goal_info.goal, goal_info.tasktypes_by_name)
 
+  def _estimate(self, context, goal_executors):
+    """Prints the estimated duration of each goal and task that would run, and their total."""
+    run_tracker = context.run_tracker
+    total = 0.0
+    unknown = []
+    print('Estimated durations, based on previous runs:\n')
+    for goal_executor in goal_executors:
+      goal_name = goal_executor.goal.name
+      task_estimates = []
+      # Tasks run in the order they were installed in.
+      for task_name in goal_executor.goal.ordered_task_names():
+        scope = Goal.scope(goal_name, task_name)
+        task_estimates.append((task_name, run_tracker.estimate_task_duration(scope)))
+      goal_estimate = run_tracker.estimate_goal_duration(goal_name)
+      if goal_estimate is None and any(estimate is not None for _, estimate in task_estimates):
+        goal_estimate = sum(estimate or 0 for _, estimate in task_estimates)
+      if goal_estimate is None:
+        unknown.append(goal_name)
+        print('{}: unknown'.format(goal_name))
+      else:
+        total += goal_estimate
+        print('{}: {:.1f}s'.format(goal_name, goal_estimate))
+      for task_name, estimate in task_estimates:
+        print('  {}: {}'.format(task_name, 'unknown' if estimate is None
+                                           else '{:.1f}s'.format(estimate)))
+    print('\nTotal: {:.1f}s{}'.format(total, ' plus unknown time for {}'.format(', '.join(unknown))
+                                             if unknown else ''))
+
   def attempt(self, context, goals):
     goal_executors = list(self._prepare(context, goals))
     execution_goals = ' -> '.join(e.goal.name for e in goal_executors)
     context.log.info('Executing tasks in goals: {goals}'.format(goals=execution_goals))
 
     explain = context.options.for_global_scope().explain
+    if explain or context.options.for_global_scope().estimate:
+      # The tasks won't do their work, so their timings mustn't skew future estimates.
+      context.run_tracker.record_durations = False
+    if context.options.for_global_scope().estimate:
+      self._estimate(context, goal_executors)
+      return
     if explain:
       print('Goal Execution Order:\n\n{}\n'.format(execution_goals))
       print('Goal [TaskRegistrar->Task] Order:\n')
@@ -0,0 +1,38 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+from collections import defaultdict
+
+
+class NailgunStats(object):
+  """Tracks how often java invocations reused a warm nailgun server, and how often one was spawned.
+
+  Stats are kept per nailgun identity, i.e., per task.
+  """
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._spawns = defaultdict(int)
+    self._reuses = defaultdict(int)
+
+  def add_spawn(self, identity):
+    with self._lock:
+      self._spawns[identity] += 1
+
+  def add_reuse(self, identity):
+    with self._lock:
+      self._reuses[identity] += 1
+
+  def get_all(self):
+    """Returns the nailgun stats as a list of dicts."""
+    with self._lock:
+      identities = sorted(set(self._spawns) | set(self._reuses))
+      return [{'identity': identity,
+               'num_spawns': self._spawns[identity],
+               'num_reuses': self._reuses[identity]}
+              for identity in identities]
@@ -19,10 +19,15 @@ class UnionProducts(object):
   def __init__(self):
     # A map of target to OrderedSet of product members.
     self._products_by_target = defaultdict(OrderedSet)
+    # A map of key to (generation, value) for values derived from the products.
+    self._derived_by_key = {}
+    # Incremented whenever products are added, to invalidate derived values.
+    self._generation = 0
 
   def add_for_target(self, target, products):
     """Updates the products for a particular target, adding to existing entries."""
     self._products_by_target[target].update(products)
+    self._generation += 1
 
   def add_for_targets(self, targets, products):
     """Updates the products for the given targets, adding to existing entries."""
@@ -46,6 +51,24 @@ class UnionProducts(object):
           visited.add(dep)
     return products
 
+  def derived(self, key, compute):
+    """Returns a value derived from these products, computing it only if not already cached.
+
+    Derived values, e.g., filtered per-target classpaths, are cached until products are next added.
+
+    :param key: A hashable key uniquely identifying the derived value.
+    :param compute: A function of no arguments that computes the value.
+    """
+    generation = self._generation
+    cached = self._derived_by_key.get(key)
+    if cached is not None and cached[0] == generation:
+      return cached[1]
+    value = compute()
+    # If products were added while computing, the value is cached under a stale generation, so is
+    # recomputed on next use.
+    self._derived_by_key[key] = (generation, value)
+    return value
+
   def target_for_product(self, product):
     """Looks up the target key for a product.
 
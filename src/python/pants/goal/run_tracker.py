@@ -16,11 +16,14 @@ import urllib
 from contextlib import contextmanager
 from urlparse import urlparse
 
+from pants.base.duration_history import DurationHistory
 from pants.base.run_info import RunInfo
 from pants.base.worker_pool import SubprocPool, WorkerPool
 from pants.base.workunit import WorkUnit
 from pants.goal.aggregated_timings import AggregatedTimings
 from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.goal.goal import Goal
+from pants.goal.nailgun_stats import NailgunStats
 from pants.reporting.report import Report
 from pants.subsystem.subsystem import Subsystem
 from pants.util.dirutil import relative_symlink
@@ -62,6 +65,9 @@ class RunTracker(Subsystem):
              help='Number of threads for foreground work.')
     register('--num-background-workers', advanced=True, type=int, default=8,
              help='Number of threads for background work.')
+    register('--duration-history', advanced=True, action='store_true', default=True,
+             help='Remember how long goals, tasks and the work for each target took, to inform '
+                  'scheduling and estimates in later runs.')
 
   def __init__(self, *args, **kwargs):
     super(RunTracker, self).__init__(*args, **kwargs)
@@ -97,6 +103,18 @@ class RunTracker(Subsystem):
     self.artifact_cache_stats = \
       ArtifactCacheStats(os.path.join(self.run_info_dir, 'artifact_cache_stats'))
 
+    # Spawn/reuse stats for nailgun servers.
+    self.nailgun_stats = NailgunStats()
+
+    # How long goals, tasks and the work for each target took, decayed across runs.
+    self.duration_history = DurationHistory(
+      os.path.join(info_dir, 'duration_history.json')
+      if self.get_options().duration_history else None)
+
+    # Whether to fold the durations of this run's workunits into the duration history.  Runs that
+    # only explain or estimate goals don't do the work, so must not be recorded.
+    self.record_durations = True
+
     # Number of threads for foreground work.
     self._num_foreground_workers = self.get_options().num_foreground_workers
 
@@ -151,7 +169,7 @@ class RunTracker(Subsystem):
     self._main_root_workunit.set_outcome(outcome)
 
   @contextmanager
-  def new_workunit(self, name, labels=None, cmd=''):
+  def new_workunit(self, name, labels=None, cmd='', targets=None):
     """Creates a (hierarchical) subunit of work for the purpose of timing and reporting.
 
     - name: A short name for this work. E.g., 'resolve', 'compile', 'scala', 'zinc'.
@@ -159,6 +177,7 @@ class RunTracker(Subsystem):
               display information about this work.
     - cmd: An optional longer string representing this work.
            E.g., the cmd line of a compiler invocation.
+    - targets: An optional iterable of the targets this work is done for.
 
     Use like this:
 
@@ -171,7 +190,8 @@ class RunTracker(Subsystem):
     outcome explicitly if you want to set it to warning.
     """
     parent = self._threadlocal.current_workunit
-    with self.new_workunit_under_parent(name, parent=parent, labels=labels, cmd=cmd) as workunit:
+    with self.new_workunit_under_parent(name, parent=parent, labels=labels, cmd=cmd,
+                                        targets=targets) as workunit:
       self._threadlocal.current_workunit = workunit
       try:
         yield workunit
@@ -179,7 +199,7 @@ class RunTracker(Subsystem):
         self._threadlocal.current_workunit = parent
 
   @contextmanager
-  def new_workunit_under_parent(self, name, parent, labels=None, cmd=''):
+  def new_workunit_under_parent(self, name, parent, labels=None, cmd='', targets=None):
     """Creates a (hierarchical) subunit of work for the purpose of timing and reporting.
 
     - name: A short name for this work. E.g., 'resolve', 'compile', 'scala', 'zinc'.
@@ -188,10 +208,12 @@ class RunTracker(Subsystem):
               display information about this work.
     - cmd: An optional longer string representing this work.
            E.g., the cmd line of a compiler invocation.
+    - targets: An optional iterable of the targets this work is done for.
 
     Task code should not typically call this directly.
     """
-    workunit = WorkUnit(run_info_dir=self.run_info_dir, parent=parent, name=name, labels=labels, cmd=cmd)
+    workunit = WorkUnit(run_info_dir=self.run_info_dir, parent=parent, name=name, labels=labels,
+                        cmd=cmd, targets=targets)
     workunit.start()
     try:
       self.report.start_workunit(workunit)
@@ -223,7 +245,8 @@ class RunTracker(Subsystem):
         'run_info': json.dumps(self.run_info.get_as_dict()),
         'cumulative_timings': json.dumps(self.cumulative_timings.get_all()),
         'self_timings': json.dumps(self.self_timings.get_all()),
-        'artifact_cache_stats': json.dumps(self.artifact_cache_stats.get_all())
+        'artifact_cache_stats': json.dumps(self.artifact_cache_stats.get_all()),
+        'nailgun_stats': json.dumps(self.nailgun_stats.get_all())
         }
 
       headers = {"Content-type": "application/x-www-form-urlencoded", "Accept": "text/plain"}
@@ -280,12 +303,77 @@ class RunTracker(Subsystem):
 
     self.report.close()
     self.upload_stats()
+    # As above, don't recreate the workdir after a clean-all.
+    if os.path.exists(self.run_info_dir):
+      self.duration_history.save()
 
   def end_workunit(self, workunit):
     self.report.end_workunit(workunit)
     path, duration, self_time, is_tool = workunit.end()
     self.cumulative_timings.add_timing(path, duration, is_tool)
     self.self_timings.add_timing(path, self_time, is_tool)
+    if self.record_durations and workunit.outcome() == WorkUnit.SUCCESS:
+      self._record_duration(workunit, duration)
+
+  def estimate_goal_duration(self, goal_name, default=None):
+    """Returns the estimated duration in seconds of the named goal, based on previous runs."""
+    return self.duration_history.estimate(self._goal_key(goal_name), default=default)
+
+  def estimate_task_duration(self, scope, default=None):
+    """Returns the estimated duration in seconds of the task with the given options scope."""
+    return self.duration_history.estimate(self._task_key(scope), default=default)
+
+  def estimate_target_duration(self, target, scope=None, default=None):
+    """Returns the estimated duration in seconds of a task's work for the given target.
+
+    :param target: The target the work is done for.
+    :param string scope: The options scope of the task doing the work; if unspecified, that of the
+      task the calling thread is working on.
+    :param default: The value to return if there is no estimate.
+    """
+    scope = scope or self._task_scope(self._threadlocal.current_workunit)
+    if scope is None:
+      return default
+    return self.duration_history.estimate(self._target_key(scope, target), default=default)
+
+  def _record_duration(self, workunit, duration):
+    if workunit.has_label(WorkUnit.GOAL):
+      self.duration_history.record(self._goal_key(workunit.name), duration)
+    elif workunit.has_label(WorkUnit.TASK):
+      self.duration_history.record(self._task_key(self._task_scope(workunit)), duration)
+    if workunit.targets:
+      scope = self._task_scope(workunit)
+      if scope is not None:
+        # Without finer grained information, share the time equally among the targets.
+        for target in workunit.targets:
+          self.duration_history.record(self._target_key(scope, target),
+                                       duration / len(workunit.targets))
+
+  @staticmethod
+  def _task_scope(workunit):
+    """Returns the options scope of the task the workunit is part of, or None."""
+    goal_name = task_name = None
+    for ancestor in (workunit.ancestors() if workunit else ()):
+      if task_name is None and ancestor.has_label(WorkUnit.TASK):
+        task_name = ancestor.name
+      elif ancestor.has_label(WorkUnit.GOAL):
+        goal_name = ancestor.name
+        break
+    if goal_name is None or task_name is None:
+      return None
+    return Goal.scope(goal_name, task_name)
+
+  @staticmethod
+  def _goal_key(goal_name):
+    return 'goal:{}'.format(goal_name)
+
+  @staticmethod
+  def _task_key(scope):
+    return 'task:{}'.format(scope)
+
+  @staticmethod
+  def _target_key(scope, target):
+    return 'target:{}:{}'.format(scope, target.address.spec)
 
   def get_background_root_workunit(self):
     if self._background_root_workunit is None:
@@ -0,0 +1,219 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import hashlib
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+from pex.compatibility import to_bytes
+
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import safe_atomic_open, safe_delete
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClasspathIndex(object):
+  """An index of the files contained in the jars and directories of classpaths.
+
+  Scanning a classpath means opening every jar on it and walking every loose classes directory,
+  which is slow for large classpaths and is otherwise repeated by each task that needs to know
+  which classpath entry provides a class.  This index scans each entry at most once:
+
+  - The listing of a jar is keyed by its path, size and modification time, and is optionally
+    persisted so that unchanged jars are never reopened in later runs.  Persisted listings are
+    pruned least recently used first, so that those of replaced jars do not accumulate.
+  - The listing of a directory is refreshed incrementally: only subdirectories whose modification
+    time changed since they were last listed are listed again.
+
+  Listings are held as sorted tuples of relative paths, which are compact and support binary search.
+  """
+
+  # Part of each listing's file name, so listings in an old format are never read.
+  VERSION = 1
+
+  # A directory listing whose modification time is within this many seconds of the time it was
+  # listed may have changed again without its modification time changing, on filesystems with coarse
+  # timestamps.
+  _MTIME_GRANULARITY_SECS = 1.0
+
+  _DirListing = namedtuple('_DirListing', ['mtime', 'listed_at', 'files', 'subdirs'])
+
+  @staticmethod
+  def is_jar(path):
+    # Per the classloading spec, a 'jar' in this context can also be a .zip file.
+    return path.endswith('.jar') or path.endswith('.zip')
+
+  def __init__(self, cache_dir=None, max_listings=None):
+    """
+    :param string cache_dir: An optional directory to persist jar listings in across runs.
+    :param int max_listings: The maximum number of jar listings to keep in the cache_dir, or None
+      for no limit.  The listings used by this index are kept regardless.
+    """
+    self._cache_dir = cache_dir
+    self._max_listings = max_listings
+    self._lock = threading.Lock()
+    # The persisted listings used by this index, which are never pruned.
+    self._used_listing_files = set()
+    self._pruned = False
+    # (realpath, size, mtime) -> sorted tuple of file names.
+    self._jar_listings = {}
+    # realpath of root -> relpath of subdirectory -> _DirListing.
+    self._dir_listings = {}
+
+  def names(self, entry):
+    """Returns a sorted tuple of the relative paths of the files in a classpath entry.
+
+    Entries that are neither jars nor directories, e.g., missing ones, contain no files.
+
+    :param string entry: The path of a jar or directory.
+    """
+    if os.path.isfile(entry) and self.is_jar(entry):
+      return self._jar_names(entry)
+    elif os.path.isdir(entry):
+      return self._dir_names(entry)
+    else:
+      return ()
+
+  def contains(self, entry, name):
+    """Returns True if the classpath entry contains the file at the given relative path."""
+    names = self.names(entry)
+    i = bisect_left(names, name)
+    return i < len(names) and names[i] == name
+
+  def _jar_names(self, jar):
+    path = os.path.realpath(jar)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    names = self._jar_listings.get(key)
+    if names is None:
+      names = self._load_jar_listing(key)
+      if names is None:
+        names = self._list_jar(path)
+        self._save_jar_listing(key, names)
+      with self._lock:
+        self._jar_listings[key] = names
+    return names
+
+  def _list_jar(self, path):
+    with open_zip(path, 'r') as jar:
+      # Zip entry names can come in any encoding and in practice we find some jars that have utf-8
+      # encoded entry names, some not, so normalize them all to text.
+      names = set(to_bytes(name).decode('utf-8') for name in jar.namelist())
+    return tuple(sorted(name for name in names if not name.endswith('/')))
+
+  def _listing_file(self, key):
+    hasher = hashlib.sha1()
+    hasher.update(to_bytes('{}:{}:{!r}:{!r}'.format(self.VERSION, *key)))
+    return os.path.join(self._cache_dir, hasher.hexdigest())
+
+  def _load_jar_listing(self, key):
+    if not self._cache_dir:
+      return None
+    listing_file = self._listing_file(key)
+    try:
+      with open(listing_file, 'rb') as fp:
+        content = fp.read()
+      self._mark_used(listing_file)
+    except (IOError, OSError) as e:
+      # A concurrent run may have pruned it.
+      if e.errno != errno.ENOENT:
+        raise
+      return None
+    return tuple(content.decode('utf-8').splitlines())
+
+  def _save_jar_listing(self, key, names):
+    if not self._cache_dir:
+      return
+    listing_file = self._listing_file(key)
+    try:
+      with safe_atomic_open(listing_file) as fp:
+        fp.write('\n'.join(names).encode('utf-8'))
+      self._mark_used(listing_file)
+      self._prune_jar_listings()
+    except (IOError, OSError) as e:
+      # The listing is just an optimization for later runs.
+      logger.warn('Failed to persist the classpath index of {}: {}'.format(key[0], e))
+
+  def _mark_used(self, listing_file):
+    # Persisted listings are pruned least recently used first.
+    os.utime(listing_file, None)
+    with self._lock:
+      self._used_listing_files.add(listing_file)
+
+  def _prune_jar_listings(self):
+    """Deletes all but the most recently used of the persisted listings.
+
+    Pruning scans the whole cache_dir, so is done at most once per index, when it first persists a
+    new listing.
+    """
+    with self._lock:
+      if self._max_listings is None or self._pruned:
+        return
+      self._pruned = True
+      used_listing_files = set(self._used_listing_files)
+
+    def last_used(listing_file):
+      try:
+        return os.path.getmtime(listing_file)
+      except OSError as e:
+        # A concurrent run may have pruned it.
+        if e.errno != errno.ENOENT:
+          raise
+        return None
+
+    listing_files = [os.path.join(self._cache_dir, name) for name in os.listdir(self._cache_dir)]
+    listings = [(last_used(listing_file), listing_file) for listing_file in listing_files
+                if listing_file not in used_listing_files]
+    listings = sorted((listing for listing in listings if listing[0] is not None), reverse=True)
+    for _, listing_file in listings[max(0, self._max_listings - len(used_listing_files)):]:
+      safe_delete(listing_file)
+
+  def _dir_names(self, directory):
+    root = os.path.realpath(directory)
+    with self._lock:
+      previous_listings = self._dir_listings.get(root, {})
+    listings = {}
+    names = []
+    pending = ['']
+    while pending:
+      reldir = pending.pop()
+      path = os.path.join(root, reldir)
+      try:
+        mtime = os.stat(path).st_mtime
+      except OSError as e:
+        if e.errno != errno.ENOENT:
+          raise
+        continue
+      listing = previous_listings.get(reldir)
+      if (listing is None or listing.mtime != mtime or
+          listing.listed_at - mtime < self._MTIME_GRANULARITY_SECS):
+        listing = self._list_dir(path, mtime)
+      listings[reldir] = listing
+      names.extend(os.path.join(reldir, f) for f in listing.files)
+      pending.extend(os.path.join(reldir, d) for d in listing.subdirs)
+    with self._lock:
+      self._dir_listings[root] = listings
+    return tuple(sorted(names))
+
+  def _list_dir(self, path, mtime):
+    listed_at = time.time()
+    files = []
+    subdirs = []
+    for name in os.listdir(path):
+      # Like a classloader, follow symlinks.
+      if os.path.isdir(os.path.join(path, name)):
+        subdirs.append(name)
+      else:
+        files.append(name)
+    return self._DirListing(mtime, listed_at, tuple(files), tuple(subdirs))
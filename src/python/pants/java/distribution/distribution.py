@@ -5,6 +5,9 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import errno
+import hashlib
+import json
 import logging
 import os
 import pkgutil
@@ -17,6 +20,7 @@ from six import string_types
 
 from pants.base.revision import Revision
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_atomic_open
 
 
 logger = logging.getLogger(__name__)
@@ -35,6 +39,23 @@ class Distribution(object):
 
   _CACHE = {}
 
+  # Probe results persisted with another version, e.g., before SystemProperties changed, are unused.
+  _PROBE_CACHE_VERSION = 1
+
+  _probe_cache_dir = None
+
+  @classmethod
+  def set_probe_cache_dir(cls, cache_dir):
+    """Persists the system properties of the java executables probed to cache_dir.
+
+    Probing a java executable for its version and home means running a JVM, which is otherwise
+    repeated by every pants run.  Probe results are keyed by the real path, size and modification
+    time of the java executable, so an upgraded distribution is probed afresh.
+
+    :param string cache_dir: The directory to persist probe results in, or None to stop persisting.
+    """
+    cls._probe_cache_dir = cache_dir
+
   @classmethod
   def cached(cls, minimum_version=None, maximum_version=None, jdk=False):
     def scan_constraint_match():
@@ -348,24 +369,63 @@ class Distribution(object):
 
   def _get_system_properties(self, java):
     if not self._system_properties:
-      with temporary_dir() as classpath:
-        with open(os.path.join(classpath, 'SystemProperties.class'), 'w+') as fp:
-          fp.write(pkgutil.get_data(__name__, 'SystemProperties.class'))
-        cmd = [java, '-cp', classpath, 'SystemProperties']
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        stdout, stderr = process.communicate()
-        if process.returncode != 0:
-          raise self.Error('Failed to determine java system properties for {} with {} - exit code'
-                           ' {}: {}'.format(java, ' '.join(cmd), process.returncode, stderr))
-
-      props = {}
-      for line in stdout.split(os.linesep):
-        key, _, val = line.partition('=')
-        props[key] = val
+      probe_cache_file = self._probe_cache_file(java)
+      props = self._load_probe(probe_cache_file) if probe_cache_file else None
+      if props is None:
+        props = self._probe_system_properties(java)
+        if probe_cache_file:
+          self._save_probe(probe_cache_file, props)
       self._system_properties = props
 
     return self._system_properties
 
+  def _probe_system_properties(self, java):
+    with temporary_dir() as classpath:
+      with open(os.path.join(classpath, 'SystemProperties.class'), 'w+') as fp:
+        fp.write(pkgutil.get_data(__name__, 'SystemProperties.class'))
+      cmd = [java, '-cp', classpath, 'SystemProperties']
+      process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+      stdout, stderr = process.communicate()
+      if process.returncode != 0:
+        raise self.Error('Failed to determine java system properties for {} with {} - exit code'
+                         ' {}: {}'.format(java, ' '.join(cmd), process.returncode, stderr))
+
+    props = {}
+    for line in stdout.split(os.linesep):
+      key, _, val = line.partition('=')
+      props[key] = val
+    return props
+
+  def _probe_cache_file(self, java):
+    if not self._probe_cache_dir:
+      return None
+    path = os.path.realpath(java)
+    stat = os.stat(path)
+    hasher = hashlib.sha1()
+    hasher.update('{}:{}:{}:{!r}'.format(self._PROBE_CACHE_VERSION, path, stat.st_size,
+                                         stat.st_mtime).encode('utf-8'))
+    return os.path.join(self._probe_cache_dir, '{}.json'.format(hasher.hexdigest()))
+
+  def _load_probe(self, probe_cache_file):
+    try:
+      with open(probe_cache_file, 'rb') as fp:
+        return json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return None
+    except ValueError:
+      logger.warn('Ignoring corrupt java probe results at {}'.format(probe_cache_file))
+      return None
+
+  def _save_probe(self, probe_cache_file, props):
+    try:
+      with safe_atomic_open(probe_cache_file) as fp:
+        json.dump(props, fp)
+    except (IOError, OSError) as e:
+      # The probe results are just an optimization for later runs.
+      logger.warn('Failed to persist the java probe results of {}: {}'.format(self, e))
+
   def _validate_executable(self, name):
     def bin_paths():
       yield self._bin_path
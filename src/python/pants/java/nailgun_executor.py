@@ -12,7 +12,8 @@ import re
 import select
 import threading
 import time
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 
 from six import string_types
 from twitter.common.collections import maybe_list
@@ -75,7 +76,9 @@ class NailgunExecutor(Executor, ProcessManager):
   _PANTS_OWNER_ARG_PREFIX = b'-Dpants.nailgun.owner'
   _PANTS_NG_ARG = '='.join((_PANTS_NG_ARG_PREFIX, get_buildroot()))
 
-  _NAILGUN_SPAWN_LOCK = threading.Lock()
+  # Spawn checks are serialized per identity, so that the servers of a pool can start concurrently.
+  _NAILGUN_SPAWN_LOCKS = defaultdict(threading.Lock)
+  _NAILGUN_SPAWN_LOCKS_LOCK = threading.Lock()
   _SELECT_WAIT = 1
 
   def __init__(self, identity, workdir, nailgun_classpath, distribution=None, ins=None,
@@ -109,6 +112,56 @@ class NailgunExecutor(Executor, ProcessManager):
     """This provides the nailgun fingerprint of the running process otherwise None."""
     return self._parse_fingerprint(self.as_process().cmdline)
 
+  @property
+  def running_fingerprint(self):
+    """The nailgun fingerprint of the running process, or None if no process is running."""
+    if not self.pid or not self.is_alive():
+      return None
+    return self.fingerprint
+
+  def _get_last_used_path(self):
+    return os.path.join(self.get_metadata_dir(), 'last_used')
+
+  @property
+  def last_used(self):
+    """The time this executor last ran a program, or 0 if unknown."""
+    try:
+      return float(self._read_file(self._get_last_used_path()))
+    except (IOError, OSError, ValueError):
+      return 0
+
+  def mark_used(self):
+    """Records that this executor just ran a program, for the reaping of idle servers."""
+    self._maybe_init_metadata_dir()
+    self._write_file(self._get_last_used_path(), str(time.time()))
+
+  def check_health(self):
+    """Kills the nailgun server if it is running but no longer accepts connections.
+
+    A server that has yet to write its port, e.g., because another run is still starting it, is
+    given as many connect attempts as a newly spawned one.
+
+    :returns: True if the nailgun server is running and accepts connections.
+    """
+    if not self.pid or not self.is_alive():
+      return False
+    for attempt in range(self._connect_attempts + 1):
+      if attempt:
+        time.sleep(self.WAIT_INTERVAL)
+      port = self.socket
+      sock = self._create_ngclient(port, None, None).try_connect() if port else None
+      if sock:
+        sock.close()
+        return True
+    logger.debug('Killing unresponsive ng server {server!r}'.format(server=self))
+    self.terminate()
+    return False
+
+  @property
+  def _spawn_lock(self):
+    with self._NAILGUN_SPAWN_LOCKS_LOCK:
+      return self._NAILGUN_SPAWN_LOCKS[self._identity]
+
   def _create_owner_arg(self, workdir):
     # Currently the owner is identified via the full path to the workdir.
     return '='.join((self._PANTS_OWNER_ARG_PREFIX, workdir))
@@ -169,7 +222,7 @@ class NailgunExecutor(Executor, ProcessManager):
     classpath = self._nailgun_classpath + classpath
     new_fingerprint = self._fingerprint(jvm_options, classpath, self._distribution.version)
 
-    with self._NAILGUN_SPAWN_LOCK:
+    with self._spawn_lock:
       running, updated = self._check_nailgun_state(new_fingerprint)
 
       if running and updated:
@@ -270,3 +323,155 @@ class NailgunExecutor(Executor, ProcessManager):
                          close_fds=True)
 
     self.write_pid(subproc.pid)
+
+
+class NailgunExecutorPool(Executor):
+  """Executes java programs in a pool of nailgun servers, so concurrent programs get warm JVMs.
+
+  Each server in the pool is managed by a NailgunExecutor with an identity of its own; the first
+  has the identity of the pool, so a pool of one uses the same server a lone NailgunExecutor would.
+  A program is run by leasing an idle executor, preferring one whose server is already running with
+  the program's fingerprint, then one with no server running, and then the one idle the longest,
+  whose server is restarted.  Leases block while the maximum number of programs are running.
+
+  A nailgun server can only run programs on the classpath it was started with, so programs whose
+  classpaths or jvm options differ need servers of their own.  A pool can keep more servers than it
+  runs programs at once, so that programs alternating between a few classpaths each find a warm
+  server, with the least recently used server restarted once there are too many.
+  """
+
+  def __init__(self, identity, workdir, nailgun_classpath, distribution=None, size=1,
+               max_servers=None, idle_timeout=None, stats=None, ins=None, connect_timeout=10,
+               connect_attempts=5):
+    """
+    :param string identity: The identity of the pool, from which those of its servers derive.
+    :param string workdir: The workdir of the pool, from which those of its servers derive.
+    :param nailgun_classpath: The classpath of the nailgun server.
+    :param distribution: An optional validated java distribution to run the servers with.
+    :param int size: The maximum number of programs to run at once.
+    :param int max_servers: The maximum number of servers to keep, which is at least size.
+    :param int idle_timeout: If set, the servers of this pool that have not been used for this many
+      seconds, by this or any earlier run, are killed when the pool is created.
+    :param stats: An optional :class:`pants.goal.nailgun_stats.NailgunStats` to record the spawns
+      and reuses of servers in.
+    """
+    Executor.__init__(self, distribution=distribution)
+    if size < 1:
+      raise ValueError('A nailgun pool must have at least one server, given: {}'.format(size))
+
+    def create_executor(index):
+      suffix = '_{}'.format(index) if index else ''
+      return NailgunExecutor(identity + suffix,
+                             workdir + suffix,
+                             nailgun_classpath,
+                             distribution=self._distribution,
+                             ins=ins,
+                             connect_timeout=connect_timeout,
+                             connect_attempts=connect_attempts)
+
+    self._identity = identity
+    self._size = size
+    self._stats = stats
+    self._executors = [create_executor(i) for i in range(max(size, max_servers or size))]
+    self._idle = list(self._executors)
+    self._num_leased = 0
+    self._condition = threading.Condition()
+
+    if idle_timeout is not None:
+      # Also reap the servers of larger pools, e.g., of earlier runs with more workers.
+      member_re = re.compile(r'^{}_(\d+)$'.format(re.escape(identity)))
+      pids_dir = os.path.dirname(self._executors[0].get_metadata_dir())
+      extra_indexes = set()
+      if os.path.isdir(pids_dir):
+        for name in os.listdir(pids_dir):
+          match = member_re.match(name)
+          if match and int(match.group(1)) >= len(self._executors):
+            extra_indexes.add(int(match.group(1)))
+      self._reap_idle(self._executors + [create_executor(i) for i in sorted(extra_indexes)],
+                      idle_timeout)
+
+  def __str__(self):
+    return 'NailgunExecutorPool({executors})'.format(
+      executors=', '.join(str(executor) for executor in self._executors))
+
+  @property
+  def size(self):
+    return self._size
+
+  @property
+  def max_servers(self):
+    return len(self._executors)
+
+  def _reap_idle(self, executors, idle_timeout):
+    now = time.time()
+    for executor in executors:
+      if executor.pid and executor.is_alive() and now - executor.last_used > idle_timeout:
+        logger.debug('Killing ng server {server!r}, idle for over {secs} seconds'
+                     .format(server=executor, secs=idle_timeout))
+        try:
+          executor.terminate()
+        except executor.NonResponsiveProcess as e:
+          logger.warning('Failed to kill idle ng server {server!r}: {e}'
+                         .format(server=executor, e=e))
+
+  @contextmanager
+  def lease(self, fingerprint=None):
+    """Leases an idle executor of this pool, waiting while the maximum number are leased.
+
+    :param string fingerprint: The fingerprint of the program to be run, as calculated by
+      NailgunExecutor, if known, so that an executor whose server is already running it is chosen.
+    """
+    with self._condition:
+      while self._num_leased >= self._size:
+        self._condition.wait()
+      executor = min(self._idle, key=lambda e: self._lease_order(e, fingerprint))
+      self._idle.remove(executor)
+      self._num_leased += 1
+    try:
+      executor.check_health()
+      if self._stats and fingerprint is not None:
+        if executor.running_fingerprint == fingerprint:
+          self._stats.add_reuse(self._identity)
+        else:
+          self._stats.add_spawn(self._identity)
+      yield executor
+    finally:
+      executor.mark_used()
+      with self._condition:
+        self._idle.append(executor)
+        self._num_leased -= 1
+        self._condition.notify()
+
+  def _lease_order(self, executor, fingerprint):
+    running_fingerprint = executor.running_fingerprint
+    if running_fingerprint is not None and running_fingerprint == fingerprint:
+      rank = 0
+    elif running_fingerprint is None:
+      rank = 1
+    else:
+      rank = 2
+    return rank, executor.last_used
+
+  def _runner(self, classpath, main, jvm_options, args, cwd=None):
+    """Runner factory. Called via Executor.execute()."""
+    command = self._create_command(classpath, main, jvm_options, args)
+    first = self._executors[0]
+    fingerprint = first._fingerprint(jvm_options, first._nailgun_classpath + classpath,
+                                     self._distribution.version)
+
+    class Runner(self.Runner):
+      @property
+      def executor(this):
+        return self
+
+      @property
+      def command(this):
+        return list(command)
+
+      def run(this, stdout=None, stderr=None, cwd=None):
+        with self.lease(fingerprint) as executor:
+          return executor.runner(classpath, main, jvm_options, args, cwd=cwd).run(stdout=stdout,
+                                                                                  stderr=stderr,
+                                                                                  cwd=cwd)
+
+    return Runner()
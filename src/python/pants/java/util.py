@@ -9,7 +9,7 @@ import os
 
 from pants.base.workunit import WorkUnit
 from pants.java.executor import Executor, SubprocessExecutor
-from pants.java.nailgun_executor import NailgunExecutor
+from pants.java.nailgun_executor import NailgunExecutor, NailgunExecutorPool
 
 
 def execute_java(classpath, main, jvm_options=None, args=None, executor=None,
@@ -68,9 +68,10 @@ def execute_runner(runner, workunit_factory=None, workunit_name=None, workunit_l
   if workunit_factory is None:
     return runner.run()
   else:
+    nailgun = isinstance(runner.executor, (NailgunExecutor, NailgunExecutorPool))
     workunit_labels = [
         WorkUnit.TOOL,
-        WorkUnit.NAILGUN if isinstance(runner.executor, NailgunExecutor) else WorkUnit.JVM
+        WorkUnit.NAILGUN if nailgun else WorkUnit.JVM
     ] + (workunit_labels or [])
 
     with workunit_factory(name=workunit_name, labels=workunit_labels, cmd=runner.cmd) as workunit:
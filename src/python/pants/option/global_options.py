@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import multiprocessing
 import os
 
 from pants.base.build_environment import get_buildroot, get_pants_cachedir, get_pants_configdir
@@ -87,6 +88,9 @@ class GlobalOptionsRegistrar(Optionable):
              help='Times tasks and goals and outputs a report.')
     register('-e', '--explain', action='store_true',
              help='Explain the execution of goals.')
+    register('--estimate', action='store_true',
+             help='Estimate how long the goals would take to run, based on previous runs, instead '
+                  'of running them.')
 
     # TODO: After moving to the new options system these abstraction leaks can go away.
     register('-k', '--kill-nailguns', action='store_true',
@@ -111,6 +115,11 @@ class GlobalOptionsRegistrar(Optionable):
                   "(e.g., integration tests.)")
     register('--cache-key-gen-version', advanced=True, default='200', recursive=True,
              help='The cache key generation. Bump this to invalidate every artifact for a scope.')
+    register('--build-invalidator', choices=['files', 'indexed'], default='files', advanced=True,
+             help="How to store each task's target hashes: one file per target, or a single "
+                  "append-only index per task. Switching between them migrates existing hashes.")
+    register('--fingerprint-workers', type=int, default=multiprocessing.cpu_count(), advanced=True,
+             help='Fingerprint targets for invalidation using this many threads.')
     register('--print-exception-stacktrace', action='store_true',
              help='Print to console the full exception stack trace if encountered.')
     register('--fail-fast', action='store_true',
@@ -127,6 +136,20 @@ class GlobalOptionsRegistrar(Optionable):
              recursive=True,
              help='Timeout in seconds for url reads when fetching binary tools from the '
                   'repos specified by --pants-support-baseurls')
+    register('--file-digest-cache', action='store_true', default=True, advanced=True,
+             help='Persist source file digests across runs, keyed by path and stat info, so that '
+                  'unchanged files need not be re-read to fingerprint targets.')
+    register('--build-file-parse-cache', action='store_true', default=True, advanced=True,
+             help='Persist the targets defined by BUILD files across runs, so that unchanged BUILD '
+                  'files need not be re-executed.  BUILD files that import modules or register '
+                  'source roots are always re-executed.')
+    register('--java-probe-cache', action='store_true', default=True, advanced=True,
+             help='Persist the version and system properties of java distributions under the '
+                  'bootstrap dir, keyed by the path and stat info of their java executables, so '
+                  'that locating a JDK needs no JVM to be run.')
+    register('--build-file-scan-workers', type=int, default=1, advanced=True,
+             help='When scanning many BUILD files at once, e.g., for `list ::` or `changed`, '
+                  'execute them in this many worker processes.')
     register('--build-file-rev',
              help='Read BUILD files from this scm rev instead of from the working tree.  This is '
              'useful for implementing pants-aware sparse checkouts.')
@@ -59,6 +59,13 @@ class PlainTextReporter(Reporter):
       self.emit(b'\n============')
       self.emit(b'\n')
       self.emit(self._format_aggregated_timings(self.run_tracker.self_timings))
+      nailgun_stats = self.run_tracker.nailgun_stats.get_all()
+      if nailgun_stats:
+        self.emit(b'\n')
+        self.emit(b'\nNailgun Stats')
+        self.emit(b'\n=============')
+        self.emit(b'\n')
+        self.emit(self._format_nailgun_stats(nailgun_stats))
     if self.settings.cache_stats:
       self.emit(b'\n')
       self.emit(b'\nArtifact Cache Stats')
@@ -157,6 +164,10 @@ class PlainTextReporter(Reporter):
     b'\n'.join([b'{cache_name} - Hits: {num_hits} Misses: {num_misses}'.format(**x)
                 for x in stats])
 
+  def _format_nailgun_stats(self, nailgun_stats):
+    return b'\n'.join([b'{identity} - Spawns: {num_spawns} Reuses: {num_reuses}'.format(**x)
+                       for x in nailgun_stats])
+
   def _indent(self, workunit):
     return b'  ' * (len(workunit.ancestors()) - 1)
 
@@ -14,6 +14,7 @@ import tempfile
 import threading
 import uuid
 from collections import defaultdict
+from contextlib import contextmanager
 
 from pants.util.strutil import ensure_text
 
@@ -152,6 +153,28 @@ def safe_concurrent_create(func, path):
   return ret
 
 
+@contextmanager
+def safe_atomic_open(path, mode='wb'):
+  """Opens a temporary file that replaces the file at path once the block exits successfully.
+
+  The temporary file is created beside path, so the final rename is atomic: concurrent readers
+  see either the old or the new content in full, and a failed write leaves path untouched.
+
+  :param string path: The path of the file to write.
+  :param string mode: The mode to open the temporary file with.
+  """
+  directory = os.path.dirname(path)
+  safe_mkdir(directory)
+  fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.{}.'.format(os.path.basename(path)))
+  try:
+    with os.fdopen(fd, mode) as fp:
+      yield fp
+    os.rename(tmp_path, path)
+  except BaseException:
+    safe_delete(tmp_path)
+    raise
+
+
 def chmod_plus_x(path):
   """Equivalent of unix `chmod a+x path`"""
   path_mode = os.stat(path).st_mode
@@ -0,0 +1,110 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+
+import mock
+
+from pants.backend.core.tasks.cached_test_results_mixin import CachedTestResultsMixin
+from pants.backend.core.tasks.task import Task
+from pants.base.exceptions import TestFailedTaskError
+from pants.util.dirutil import touch
+from pants_test.tasks.task_test_base import TaskTestBase, ensure_cached
+
+
+class FakeTestRun(CachedTestResultsMixin, Task):
+  """Passes the tests of every target except those named 'red'."""
+
+  # The version of the runtime the tests run in.
+  runtime = '1.0'
+
+  def execute(self):
+    self.ran = []
+    self.replayed = []
+    self.run_uncached_tests(self.context.target_roots, self._run_tests)
+
+  def _run_tests(self, results_dirs):
+    failed_targets = []
+    for target, results_dir in results_dirs.items():
+      self.ran.append(target)
+      if target.name == 'red':
+        failed_targets.append(target)
+      else:
+        touch(os.path.join(results_dir, 'report.xml'))
+    if failed_targets:
+      raise TestFailedTaskError(failed_targets=failed_targets)
+
+  def test_environment_fingerprint(self, target):
+    return self.runtime
+
+  def replay_test_results(self, target, results_dir):
+    self.replayed.append((target, os.listdir(results_dir)))
+
+
+class CachedTestResultsMixinTest(TaskTestBase):
+
+  @classmethod
+  def task_type(cls):
+    return FakeTestRun
+
+  def setUp(self):
+    super(CachedTestResultsMixinTest, self).setUp()
+    self.lib = self.make_target('lib:lib')
+    self.green = self.make_target('tests:green', dependencies=[self.lib])
+    self.red = self.make_target('tests:red')
+
+  def run_tests(self, targets, **options):
+    self.set_options(**options)
+    task = self.create_task(self.context(target_roots=targets))
+    task.execute()
+    return task
+
+  @ensure_cached(FakeTestRun, expected_num_artifacts=1)
+  def test_skips_passing_targets(self):
+    task = self.run_tests([self.green])
+    self.assertEqual([self.green], task.ran)
+
+    task = self.run_tests([self.green])
+    self.assertEqual([], task.ran)
+    self.assertEqual([(self.green, ['report.xml'])], task.replayed)
+
+    task = self.run_tests([self.green], force=True)
+    self.assertEqual([self.green], task.ran)
+    self.assertEqual([], task.replayed)
+
+  @ensure_cached(FakeTestRun, expected_num_artifacts=1)
+  def test_reruns_failed_targets_only(self):
+    with self.assertRaises(TestFailedTaskError):
+      self.run_tests([self.green, self.red])
+    with self.assertRaises(TestFailedTaskError):
+      self.run_tests([self.green, self.red])
+
+    task = self.create_task(self.context(target_roots=[self.green, self.red]))
+    with self.assertRaises(TestFailedTaskError):
+      task.execute()
+    self.assertEqual([self.red], task.ran)
+    self.assertEqual([self.green], [target for target, _ in task.replayed])
+
+  def test_reruns_on_option_change(self):
+    self.run_tests([self.green])
+    # The task fingerprint covers the options registered with `fingerprint=True`.
+    with mock.patch.object(FakeTestRun, 'fingerprint', new_callable=mock.PropertyMock,
+                           return_value='changed-options'):
+      task = self.run_tests([self.green])
+      self.assertEqual([self.green], task.ran)
+
+      task = self.run_tests([self.green])
+      self.assertEqual([], task.ran)
+
+  def test_reruns_on_environment_change(self):
+    self.run_tests([self.green])
+    FakeTestRun.runtime = '2.0'
+    try:
+      task = self.run_tests([self.green])
+    finally:
+      FakeTestRun.runtime = '1.0'
+    self.assertEqual([self.green], task.ran)
@@ -0,0 +1,299 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+from textwrap import dedent
+
+from pants.backend.jvm.tasks.jvm_compile.analysis_parser import ParseError
+from pants.backend.jvm.tasks.jvm_compile.analysis_tools import AnalysisTools
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis import ZincAnalysis
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_parser import ZincAnalysisParser
+from pants.backend.jvm.tasks.jvm_compile.scala.zinc_analysis_tools import ZincAnalysisTools
+from pants.base.build_environment import get_buildroot
+from pants.util.contextutil import temporary_dir
+
+
+ANALYSIS = dedent("""
+  format version: 5
+  output mode:
+  1 items
+  0 -> single
+  products:
+  3 items
+  {root}/src/A.scala -> /classes/A.class
+  {root}/src/B.scala -> /classes/B.class
+  {root}/src/C.scala -> /classes/C.class
+  binary dependencies:
+  3 items
+  {root}/src/A.scala -> /jars/x.jar
+  {root}/src/B.scala -> /jars/x.jar
+  {root}/src/B.scala -> /jars/y.jar
+  direct external dependencies:
+  2 items
+  {root}/src/A.scala -> lib.X
+  {root}/src/C.scala -> lib.Z
+  class names:
+  3 items
+  {root}/src/A.scala -> A
+  {root}/src/B.scala -> B
+  {root}/src/C.scala -> C
+  product stamps:
+  3 items
+  /classes/A.class -> lastModified(1)
+  /classes/B.class -> lastModified(2)
+  /classes/C.class -> lastModified(3)
+  binary stamps:
+  2 items
+  /jars/x.jar -> lastModified(4)
+  /jars/y.jar -> lastModified(5)
+  class names:
+  2 items
+  /jars/x.jar -> lib.X
+  /jars/y.jar -> lib.Y
+  external apis:
+  2 items
+  lib.X -> rO0ABXNyAAZYYXBp
+  lib.Z -> rO0ABXNyAAZaYXBp
+  compilations:
+  1 items
+  0 -> rO0ABXNyAAtDb21waWxhdGlvbg==
+  """).lstrip().format(root=get_buildroot())
+
+
+# An analysis with every section zinc writes, which the full parser can also read.
+FULL_ANALYSIS = dedent("""
+  format version: 5
+  output mode:
+  1 items
+  0 -> single
+  output directories:
+  1 items
+  output dir -> /classes
+  compile options:
+  2 items
+  0 -> -encoding
+  1 -> UTF-8
+  javac options:
+  0 items
+  compiler version:
+  1 items
+  0 -> 2.10.4
+  compile order:
+  1 items
+  0 -> Mixed
+  name hashing:
+  1 items
+  0 -> true
+  products:
+  4 items
+  {root}/src/A.scala -> /classes/A$.class
+  {root}/src/A.scala -> /classes/A.class
+  {root}/src/B.scala -> /classes/B.class
+  {root}/src/C.scala -> /classes/C.class
+  binary dependencies:
+  4 items
+  {root}/src/A.scala -> /jars/x.jar
+  {root}/src/B.scala -> /jars/x.jar
+  {root}/src/B.scala -> /jars/y.jar
+  {root}/src/C.scala -> /jars/y.jar
+  direct source dependencies:
+  0 items
+  direct external dependencies:
+  0 items
+  public inherited source dependencies:
+  0 items
+  public inherited external dependencies:
+  0 items
+  member reference internal dependencies:
+  2 items
+  {root}/src/B.scala -> {root}/src/A.scala
+  {root}/src/C.scala -> {root}/src/A.scala
+  member reference external dependencies:
+  3 items
+  {root}/src/A.scala -> lib.X
+  {root}/src/B.scala -> lib.X
+  {root}/src/C.scala -> lib.Z
+  inheritance internal dependencies:
+  1 items
+  {root}/src/C.scala -> {root}/src/A.scala
+  inheritance external dependencies:
+  1 items
+  {root}/src/A.scala -> lib.X
+  class names:
+  4 items
+  {root}/src/A.scala -> A
+  {root}/src/A.scala -> A$
+  {root}/src/B.scala -> B
+  {root}/src/C.scala -> C
+  used names:
+  4 items
+  {root}/src/A.scala -> X
+  {root}/src/B.scala -> A
+  {root}/src/B.scala -> X
+  {root}/src/C.scala -> Z
+  product stamps:
+  4 items
+  /classes/A$.class -> lastModified(1)
+  /classes/A.class -> lastModified(1)
+  /classes/B.class -> lastModified(2)
+  /classes/C.class -> lastModified(3)
+  source stamps:
+  3 items
+  {root}/src/A.scala -> hash(aaaa)
+  {root}/src/B.scala -> hash(bbbb)
+  {root}/src/C.scala -> hash(cccc)
+  binary stamps:
+  2 items
+  /jars/x.jar -> lastModified(4)
+  /jars/y.jar -> lastModified(5)
+  class names:
+  2 items
+  /jars/x.jar -> lib.X
+  /jars/y.jar -> lib.Z
+  internal apis:
+  3 items
+  {root}/src/A.scala -> rO0ABXNyAAZBYXBp
+  {root}/src/B.scala -> rO0ABXNyAAZCYXBp
+  {root}/src/C.scala -> rO0ABXNyAAZDYXBp
+  external apis:
+  2 items
+  lib.X -> rO0ABXNyAAZYYXBp
+  lib.Z -> rO0ABXNyAAZaYXBp
+  source infos:
+  3 items
+  {root}/src/A.scala -> rO0ABXNyAAVBaW5mbw==
+  {root}/src/B.scala -> rO0ABXNyAAVCaW5mbw==
+  {root}/src/C.scala -> rO0ABXNyAAVDaW5mbw==
+  compilations:
+  1 items
+  0 -> rO0ABXNyAAtDb21waWxhdGlvbg==
+  """).lstrip().format(root=get_buildroot())
+
+
+class ZincAnalysisToolsTest(unittest.TestCase):
+
+  def setUp(self):
+    # Splitting and merging never parse analysis in full.
+    self.analysis_tools = ZincAnalysisTools(None, None, None)
+
+  def test_split_and_merge(self):
+    with temporary_dir() as tmpdir:
+      analysis_path = os.path.join(tmpdir, 'analysis')
+      with open(analysis_path, 'wb') as fp:
+        fp.write(ANALYSIS.encode('utf-8'))
+      split_paths = [os.path.join(tmpdir, name) for name in ('a', 'b', 'catchall')]
+      self.analysis_tools.split_to_paths(analysis_path,
+                                         [(['src/A.scala'], split_paths[0]),
+                                          ([os.path.join(get_buildroot(), 'src/B.scala')],
+                                           split_paths[1])],
+                                         catchall_path=split_paths[2])
+
+      with open(split_paths[0], 'rb') as fp:
+        self.assertEqual(dedent("""
+          format version: 5
+          output mode:
+          1 items
+          0 -> single
+          products:
+          1 items
+          {root}/src/A.scala -> /classes/A.class
+          binary dependencies:
+          1 items
+          {root}/src/A.scala -> /jars/x.jar
+          direct external dependencies:
+          1 items
+          {root}/src/A.scala -> lib.X
+          class names:
+          1 items
+          {root}/src/A.scala -> A
+          product stamps:
+          1 items
+          /classes/A.class -> lastModified(1)
+          binary stamps:
+          1 items
+          /jars/x.jar -> lastModified(4)
+          class names:
+          1 items
+          /jars/x.jar -> lib.X
+          external apis:
+          1 items
+          lib.X -> rO0ABXNyAAZYYXBp
+          compilations:
+          1 items
+          0 -> rO0ABXNyAAtDb21waWxhdGlvbg==
+          """).lstrip().format(root=get_buildroot()), fp.read().decode('utf-8'))
+
+      with open(split_paths[2], 'rb') as fp:
+        catchall = fp.read().decode('utf-8')
+      self.assertIn('/classes/C.class -> lastModified(3)', catchall)
+      self.assertIn('lib.Z -> rO0ABXNyAAZaYXBp', catchall)
+      self.assertNotIn('/jars/', catchall)
+
+      merged_path = os.path.join(tmpdir, 'merged')
+      self.analysis_tools.merge_from_paths(split_paths, merged_path)
+      with open(merged_path, 'rb') as fp:
+        self.assertEqual(ANALYSIS, fp.read().decode('utf-8'))
+
+  def test_truncated(self):
+    with temporary_dir() as tmpdir:
+      analysis_path = os.path.join(tmpdir, 'analysis')
+      with open(analysis_path, 'wb') as fp:
+        fp.write(ANALYSIS[:ANALYSIS.index('binary stamps')].encode('utf-8'))
+        fp.write(b'binary stamps:\n2 items\n/jars/x.jar -> lastModified(4)\n')
+      with self.assertRaises(ParseError):
+        self.analysis_tools.split_to_paths(analysis_path,
+                                           [(['src/A.scala'], os.path.join(tmpdir, 'a'))])
+
+  def test_merge_keeps_one_item_per_key(self):
+    with temporary_dir() as tmpdir:
+      analysis_paths = [os.path.join(tmpdir, name) for name in ('a', 'b')]
+      for path, stamp in zip(analysis_paths, ('lastModified(4)', 'lastModified(6)')):
+        with open(path, 'wb') as fp:
+          fp.write(ANALYSIS.replace('/jars/x.jar -> lastModified(4)',
+                                    '/jars/x.jar -> {}'.format(stamp)).encode('utf-8'))
+
+      merged_path = os.path.join(tmpdir, 'merged')
+      self.analysis_tools.merge_from_paths(analysis_paths, merged_path)
+      with open(merged_path, 'rb') as fp:
+        merged = fp.read().decode('utf-8')
+      # The binary stamps map each jar to a single stamp, of which the last analysis' wins, while
+      # the binary dependencies relate a source to several jars.
+      self.assertEqual(ANALYSIS.replace('/jars/x.jar -> lastModified(4)',
+                                        '/jars/x.jar -> lastModified(6)'), merged)
+
+  def test_equivalent_to_full_parse(self):
+    parser = ZincAnalysisParser()
+    implementations = [ZincAnalysisTools(None, parser, ZincAnalysis),
+                       AnalysisTools(None, parser, ZincAnalysis)]
+
+    def normalized(path):
+      # Round trip through the full parser, so that only the content of the analyses is compared.
+      normalized_path = path + '.normalized'
+      parser.parse_from_path(path).write_to_path(normalized_path)
+      with open(normalized_path, 'rb') as fp:
+        return fp.read()
+
+    with temporary_dir() as tmpdir:
+      analysis_path = os.path.join(tmpdir, 'analysis')
+      with open(analysis_path, 'wb') as fp:
+        fp.write(FULL_ANALYSIS.encode('utf-8'))
+
+      results = []
+      for i, analysis_tools in enumerate(implementations):
+        outdir = os.path.join(tmpdir, str(i))
+        os.mkdir(outdir)
+        split_paths = [os.path.join(outdir, name) for name in ('a', 'b', 'catchall')]
+        analysis_tools.split_to_paths(analysis_path,
+                                      [(['src/A.scala'], split_paths[0]),
+                                       (['src/B.scala'], split_paths[1])],
+                                      catchall_path=split_paths[2])
+        merged_path = os.path.join(outdir, 'merged')
+        analysis_tools.merge_from_paths(split_paths, merged_path)
+        results.append([normalized(path) for path in split_paths + [merged_path]])
+
+      self.assertEqual(results[0], results[1])
@@ -9,7 +9,7 @@ import os
 
 from pants.backend.jvm.targets.exclude import Exclude
 from pants.backend.jvm.targets.jvm_target import JvmTarget
-from pants.backend.jvm.tasks.classpath_util import ClasspathUtil
+from pants.backend.jvm.tasks.classpath_util import ClasspathUtil, ExcludeSet
 from pants.base.exceptions import TaskError
 from pants.goal.products import UnionProducts
 from pants_test.base_test import BaseTest
@@ -112,3 +112,44 @@ class ClasspathUtilTest(BaseTest):
     classpath = ClasspathUtil.compute_classpath_for_target(b, classpath_product, [], ['default'])
 
     self.assertEqual([example_jar_path], classpath)
+
+  def test_org_exclude_matches_all_names(self):
+    b = self.make_target('b', JvmTarget, excludes=[Exclude('com.example')])
+    a = self.make_target('a', JvmTarget, dependencies=[b])
+
+    classpath_product = UnionProducts()
+    lib_jar_path = os.path.join(self.build_root, 'ivy/jars/com.example/lib/123.4.jar')
+    other_jar_path = os.path.join(self.build_root, 'ivy/jars/com.example/other/1.0.jar')
+    classpath_product.add_for_target(a, [('default', lib_jar_path), ('default', other_jar_path)])
+
+    classpath = ClasspathUtil.compute_classpath_for_target(a, classpath_product, [], ['default'])
+
+    self.assertEqual([], classpath)
+
+  def test_compute_classpath_for_target_reflects_added_products(self):
+    a = self.make_target('a', JvmTarget, excludes=[Exclude('com.example', 'lib')])
+
+    classpath_product = UnionProducts()
+    example_jar_path = os.path.join(self.build_root, 'ivy/jars/com.example/lib/123.4.jar')
+    classes_path = os.path.join(self.build_root, 'classes')
+    classpath_product.add_for_target(a, [('default', example_jar_path)])
+    self.assertEqual([], ClasspathUtil.compute_classpath_for_target(a, classpath_product, [],
+                                                                    ['default']))
+
+    classpath_product.add_for_target(a, [('default', classes_path)])
+    self.assertEqual([classes_path],
+                     ClasspathUtil.compute_classpath_for_target(a, classpath_product, [],
+                                                                ['default']))
+
+  def test_exclude_set_union_shares_sets(self):
+    lib = ExcludeSet.from_excludes([Exclude('com.example', 'lib')])
+    org = ExcludeSet.from_excludes([Exclude('org.example')])
+    self.assertIs(lib, ExcludeSet.EMPTY.union([lib, ExcludeSet.EMPTY, lib]))
+
+    union = lib.union([org, ExcludeSet.from_excludes([Exclude('com.example', 'other')])])
+    self.assertTrue(union.matches('com.example', 'lib'))
+    self.assertTrue(union.matches('com.example', 'other'))
+    self.assertFalse(union.matches('com.example', 'library'))
+    self.assertTrue(union.matches('org.example', 'anything'))
+    self.assertFalse(union.excludes_path('ivy/jars/com.example/library/1.0.jar'))
+    self.assertTrue(union.excludes_path('ivy/jars/org.example/lib/1.0.jar'))
@@ -12,7 +12,7 @@ from textwrap import dedent
 
 from pants.backend.core.targets.resources import Resources
 from pants.backend.jvm.targets.java_tests import JavaTests
-from pants.backend.jvm.tasks.junit_run import JUnitRun
+from pants.backend.jvm.tasks.junit_run import JUnitRun, _shard_tests
 from pants.backend.python.targets.python_tests import PythonTests
 from pants.base.build_file_aliases import BuildFileAliases
 from pants.base.exceptions import TargetDefinitionException, TaskError
@@ -20,6 +20,8 @@ from pants.goal.products import MultipleRootedProducts
 from pants.ivy.bootstrapper import Bootstrapper
 from pants.java.distribution.distribution import Distribution
 from pants.java.executor import SubprocessExecutor
+from pants.util.dirutil import safe_open
+from pants.util.xml_parser import XmlParser
 from pants_test.jvm.jvm_tool_task_test_base import JvmToolTaskTestBase
 
 
@@ -167,6 +169,41 @@ class JUnitRunnerTest(JvmToolTaskTestBase):
                                  r'must include a non-empty set of sources'):
       task.execute()
 
+  def test_shard_tests_balances_durations(self):
+    durations = {'A': 10.0, 'B': 6.0, 'C': 5.0, 'D': 1.0}
+    self.assertEqual([['A', 'D'], ['B', 'C']],
+                     sorted(_shard_tests(['A', 'B', 'C', 'D'], durations, 2)))
+    # Tests with no history are dealt out round-robin, and shards keep the original test order.
+    self.assertEqual([['X', 'A', 'Z'], ['Y', 'B', 'C']],
+                     sorted(_shard_tests(['X', 'A', 'Y', 'B', 'Z', 'C'],
+                                         {'A': 3.0, 'B': 2.0, 'C': 2.0}, 2)))
+    self.assertEqual([['A'], ['B']], sorted(_shard_tests(['A', 'B'], {}, 4)))
+
+  def test_parallel_workers_reports(self):
+    self.set_options(parallel_workers=2)
+    task = self.create_task(self.context())
+    runner = task._runner
+    report = dedent("""<?xml version="1.0" encoding="UTF-8"?>
+      <testsuite name="{name}" tests="1" failures="0" errors="0" time="{time}"/>
+    """)
+    for name, time in (('FooTest', '1.5'), ('BarTest', 'garbage')):
+      with safe_open(os.path.join(task.workdir, 'TEST-{}.xml'.format(name)), 'w') as fp:
+        fp.write(report.format(name=name, time=time))
+
+    self.assertEqual({'FooTest': 1.5},
+                     runner._historical_durations(['FooTest', 'BarTest', 'BazTest']))
+
+    runner._merge_xml_reports(['FooTest', 'BarTest', 'BazTest'])
+    merged = XmlParser.from_file(os.path.join(task.workdir, 'TESTS-TestSuites.xml'))
+    self.assertEqual(['FooTest', 'BarTest'],
+                     [suite.getAttribute('name')
+                      for suite in merged.parsed.getElementsByTagName('testsuite')])
+
+  def test_parallel_workers_refused_with_coverage(self):
+    self.set_options(parallel_workers=2, coverage=True)
+    with self.assertRaisesRegexp(TaskError, r'not supported with coverage'):
+      self.create_task(self.context())
+
 
 class EmmaTest(JvmToolTaskTestBase):
   """Tests for junit_run.Emma class"""
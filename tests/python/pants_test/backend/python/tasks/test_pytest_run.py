@@ -14,7 +14,8 @@ import coverage
 
 from pants.backend.python.tasks.pytest_run import PytestRun
 from pants.base.exceptions import TestFailedTaskError
-from pants.util.contextutil import pushd
+from pants.util.contextutil import pushd, temporary_dir
+from pants.util.dirutil import safe_open
 from pants_test.backend.python.tasks.python_task_test import PythonTaskTest
 
 
@@ -45,6 +46,31 @@ class PythonTestBuilderTestEmpty(PythonTestBuilderTestBase):
   def test_empty(self):
     self.run_tests(targets=[])
 
+  def test_merge_junit_xml(self):
+    task = self.create_task(self.context())
+    report = dedent("""<?xml version="1.0" encoding="utf-8"?>
+      <testsuite errors="0" failures="{failures}" name="" skips="0" tests="1" time="{time}">
+        <testcase classname="{name}" name="test_{name}" time="{time}"/>
+      </testsuite>
+    """)
+    with temporary_dir() as reports_dir:
+      reports = []
+      for name, failures, time in (('green', 0, 0.5), ('red', 1, 1.25)):
+        reports.append(os.path.join(reports_dir, '{}.xml'.format(name)))
+        with safe_open(reports[-1], 'w') as fp:
+          fp.write(report.format(name=name, failures=failures, time=time))
+      reports.append(os.path.join(reports_dir, 'missing.xml'))
+
+      merged_report = os.path.join(reports_dir, 'merged.xml')
+      task._merge_junit_xml(reports, merged_report)
+      root = DOM.parse(merged_report).documentElement
+
+    self.assertEqual(['test_green', 'test_red'],
+                     [elem.getAttribute('name') for elem in root.childNodes])
+    self.assertEqual(2, int(root.getAttribute('tests')))
+    self.assertEqual(1, int(root.getAttribute('failures')))
+    self.assertEqual(1.75, float(root.getAttribute('time')))
+
 
 class PythonTestBuilderTest(PythonTestBuilderTestBase):
   def setUp(self):
@@ -158,6 +184,17 @@ class PythonTestBuilderTest(PythonTestBuilderTestBase):
   def test_mixed(self):
     self.run_failing_tests(targets=[self.green, self.red], failed_targets=[self.red])
 
+  def test_parallel_workers(self):
+    report_basedir = os.path.join(self.build_root, 'dist', 'junit_parallel')
+    self.run_failing_tests(targets=[self.green, self.red], failed_targets=[self.red],
+                           parallel_workers=2, junit_xml_dir=report_basedir)
+
+    files = glob.glob(os.path.join(report_basedir, '*.xml'))
+    self.assertEqual(1, len(files), 'Expected 1 file, found: {}'.format(files))
+    root = DOM.parse(files[0]).documentElement
+    self.assertEqual(2, int(root.getAttribute('tests')))
+    self.assertEqual(1, int(root.getAttribute('failures')))
+
   def test_junit_xml_option(self):
     # We expect xml of the following form:
     # <testsuite errors=[Ne] failures=[Nf] skips=[Ns] tests=[Nt] ...>
@@ -186,6 +223,17 @@ class PythonTestBuilderTest(PythonTestBuilderTestBase):
     self.assertEqual(1, len(children_by_test_name['test_two'].childNodes))
     self.assertEqual('failure', children_by_test_name['test_two'].firstChild.nodeName)
 
+  def test_passing_results_replayed(self):
+    report_basedir = os.path.join(self.build_root, 'dist', 'junit_replay')
+    self.run_tests(targets=[self.green], junit_xml_dir=report_basedir)
+    files = glob.glob(os.path.join(report_basedir, '*.xml'))
+    self.assertEqual(1, len(files), 'Expected 1 file, found: {}'.format(files))
+
+    # The unchanged target's tests are skipped, and its stored report is restored.
+    os.unlink(files[0])
+    self.run_tests(targets=[self.green], junit_xml_dir=report_basedir)
+    self.assertEqual(files, glob.glob(os.path.join(report_basedir, '*.xml')))
+
   def coverage_data_file(self):
     return os.path.join(self.build_root, '.coverage')
 
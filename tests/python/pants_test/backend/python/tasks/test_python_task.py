@@ -0,0 +1,86 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+
+import mock
+from pex.interpreter import PythonInterpreter
+
+from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.tasks.python_task import PythonTask
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir
+from pants_test.backend.python.tasks.python_task_test import PythonTaskTest
+
+
+class NoopPythonTask(PythonTask):
+  def execute(self):
+    pass
+
+
+class PythonTaskChrootCacheTest(PythonTaskTest):
+
+  @classmethod
+  def task_type(cls):
+    return NoopPythonTask
+
+  def test_evict_least_recently_used(self):
+    self.set_options_for_scope('python-setup', chroot_cache_max_entries=2)
+    task = self.create_task(self.context())
+    with temporary_dir() as cache_dir:
+      now = time.time()
+      for age, name in ((30, 'old'), (20, 'used'), (10, 'new')):
+        path = os.path.join(cache_dir, name)
+        safe_mkdir(path)
+        os.utime(path, (now - age, now - age))
+      task._mark_used(os.path.join(cache_dir, 'old'))
+
+      task._evict_least_recently_used(cache_dir)
+      self.assertEqual(['new', 'old'], sorted(os.listdir(cache_dir)))
+
+  def test_keeps_entries_used_by_task(self):
+    self.set_options_for_scope('python-setup', chroot_cache_max_entries=1)
+    task = self.create_task(self.context())
+    with temporary_dir() as cache_dir:
+      for name in ('first', 'second', 'unused'):
+        safe_mkdir(os.path.join(cache_dir, name))
+      task._mark_used(os.path.join(cache_dir, 'first'))
+      task._mark_used(os.path.join(cache_dir, 'second'))
+
+      task._evict_least_recently_used(cache_dir)
+      self.assertEqual(['first', 'second'], sorted(os.listdir(cache_dir)))
+
+  def test_source_edit_reuses_requirements_layer(self):
+    with temporary_dir() as cache_dir:
+      self.set_options_for_scope('python-setup', chroot_cache_dir=cache_dir)
+      self.create_python_requirement_library('3rdparty/python', 'six', ['six==1.9.0'])
+      self.create_python_library('src/python/lib', 'lib', {'lib.py': 'VERSION = 1'},
+                                 dependencies=['3rdparty/python:six'])
+      # A chroot cached by an earlier version of pants, directly under the cache dir.
+      safe_mkdir(os.path.join(cache_dir, 'deadbeef'))
+
+      def chroot_path():
+        self.reset_build_graph()
+        target = self.target('src/python/lib')
+        task = self.create_task(self.context(target_roots=[target]))
+        with task.cached_chroot(interpreter=PythonInterpreter.get(), pex_info=None,
+                                targets=[target], platforms=None) as chroot:
+          return chroot.path()
+
+      with mock.patch.object(PythonChroot, '_resolve_multi', return_value={}) as resolve_multi:
+        path = chroot_path()
+        self.assertEqual(1, resolve_multi.call_count)
+        self.assertEqual(['requirements', 'sources'], sorted(os.listdir(cache_dir)))
+
+        self.create_file('src/python/lib/lib.py', 'VERSION = 2')
+        edited_path = chroot_path()
+        self.assertNotEqual(path, edited_path)
+        with open(os.path.join(edited_path, 'lib.py')) as fp:
+          self.assertEqual('VERSION = 2', fp.read())
+        self.assertEqual(1, resolve_multi.call_count)
+        self.assertEqual(1, len(os.listdir(os.path.join(cache_dir, 'requirements'))))
@@ -5,11 +5,18 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
+import threading
 import unittest
 
+import mock
+from pex.interpreter import PythonInterpreter
 from pex.platforms import Platform
 
 from pants.backend.python.python_chroot import PythonChroot
+from pants.backend.python.python_requirement import PythonRequirement
+from pants.backend.python.resolution_cache import ResolutionCache
+from pants.util.contextutil import temporary_dir
 
 
 class PythonChrootTest(unittest.TestCase):
@@ -17,3 +24,36 @@ class PythonChrootTest(unittest.TestCase):
     expected_platforms = [Platform.current(), 'linux-x86_64']
     self.assertEqual(set(expected_platforms),
                      set(PythonChroot.get_platforms(['current', 'linux-x86_64'])))
+
+  def test_resolve_multi_concurrently(self):
+    platforms = ['linux-x86_64', 'macosx-10.4-x86_64']
+    ResolutionCache._memo.clear()
+    with temporary_dir() as root:
+      python_setup = mock.Mock(artifact_cache_dir=os.path.join(root, 'artifacts'),
+                               resolver_cache_dir=os.path.join(root, 'resolver'),
+                               resolver_cache_ttl=None)
+      python_repos = mock.Mock(repos=[], indexes=[])
+      python_repos.get_fetchers.return_value = []
+      chroot = PythonChroot(mock.MagicMock(), python_setup, python_repos, PythonInterpreter.get(),
+                            builder=mock.Mock(), targets=[], platforms=platforms)
+
+      # Each resolve waits for the others to start, which they only do if run concurrently.
+      started = dict((platform, threading.Event()) for platform in platforms)
+      overlapped = []
+      def resolve(requirements, platform, **kwargs):
+        started[platform].set()
+        overlapped.append(all(event.wait(10) for event in started.values()))
+        return [mock.Mock(location=os.path.join(root, platform))]
+
+      with mock.patch('pants.backend.python.python_chroot.resolve',
+                      side_effect=resolve) as mock_resolve:
+        distributions = chroot._resolve_multi([PythonRequirement('foo')], [])
+        self.assertEqual(dict((platform, [os.path.join(root, platform)]) for platform in platforms),
+                         dict((platform, [dist.location for dist in dists])
+                              for platform, dists in distributions.items()))
+        self.assertEqual([True, True], overlapped)
+
+        # The resolves are remembered.
+        chroot._resolve_multi([PythonRequirement('foo')], [])
+        self.assertEqual(2, mock_resolve.call_count)
+    ResolutionCache._memo.clear()
@@ -0,0 +1,59 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pex.interpreter import PythonInterpreter
+from pex.util import DistributionHelper
+
+from pants.backend.python.resolution_cache import ResolutionCache
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_open, safe_rmtree
+
+
+class ResolutionCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    ResolutionCache._memo.clear()
+
+  def tearDown(self):
+    ResolutionCache._memo.clear()
+
+  def make_egg(self, root, name, version):
+    path = os.path.join(root, '{}-{}-py2.7.egg'.format(name, version))
+    with safe_open(os.path.join(path, 'EGG-INFO', 'PKG-INFO'), 'w') as fp:
+      fp.write('Metadata-Version: 1.0\nName: {}\nVersion: {}\n'.format(name, version))
+    return path
+
+  def resolve_key(self, *requirements):
+    return ResolutionCache.key(requirements, PythonInterpreter.get(), 'linux-x86_64', [],
+                               ['https://pypi.python.org/simple/'])
+
+  def test_key(self):
+    self.assertEqual(self.resolve_key('foo==1.0', 'bar'), self.resolve_key('bar', 'foo==1.0'))
+    self.assertNotEqual(self.resolve_key('foo==1.0'), self.resolve_key('foo==1.1'))
+
+  def test_persisted(self):
+    with temporary_dir() as root:
+      egg = self.make_egg(root, 'foo', '1.0')
+      key = self.resolve_key('foo')
+      cache_dir = os.path.join(root, 'resolutions')
+      cache = ResolutionCache(cache_dir)
+      self.assertIsNone(cache.get(key))
+      cache.put(key, [DistributionHelper.distribution_from_path(egg)])
+
+      ResolutionCache._memo.clear()
+      dists = ResolutionCache(cache_dir).get(key)
+      self.assertEqual([('foo', '1.0')], [(d.project_name, d.version) for d in dists])
+      self.assertIsNone(ResolutionCache(cache_dir, ttl=-1).get(key))
+
+      # A resolve whose distributions were deleted must be redone.
+      ResolutionCache._memo.clear()
+      safe_rmtree(egg)
+      self.assertIsNone(ResolutionCache(cache_dir).get(key))
+
@@ -96,10 +96,18 @@ class TestContext(Context):
       def add_hit(self, cache_name, tgt): pass
       def add_miss(self, cache_name, tgt): pass
 
+    class DummyNailgunStats(object):
+      def add_spawn(self, identity): pass
+      def add_reuse(self, identity): pass
+
     artifact_cache_stats = DummyArtifactCacheStats()
+    nailgun_stats = DummyNailgunStats()
+
+    def estimate_target_duration(self, target, scope=None, default=None):
+      return default
 
   @contextmanager
-  def new_workunit(self, name, labels=None, cmd=''):
+  def new_workunit(self, name, labels=None, cmd='', targets=None):
     sys.stderr.write('\nStarting workunit {}\n'.format(name))
     yield TestContext.DummyWorkUnit()
 
@@ -11,6 +11,7 @@ from textwrap import dedent
 from pants.backend.core.targets.dependencies import Dependencies
 from pants.base.address import BuildFileAddress, SyntheticAddress
 from pants.base.address_lookup_error import AddressLookupError
+from pants.base.build_file import FilesystemBuildFile
 from pants.base.build_file_address_mapper import BuildFileAddressMapper
 from pants_test.base_test import BaseTest
 
@@ -74,6 +75,43 @@ class BuildFileAddressMapperTest(BaseTest):
     self.assertEquals(set([BuildFileAddress(root_build_file, 'foo')]),
                       self.address_mapper.scan_addresses(root=self.build_root, spec_excludes=spec_excludes))
 
+  def test_scan_addresses_with_nested_excludes(self):
+    root_build_file = self.add_to_build_file('BUILD', 'target(name="foo")')
+    subdir_build_file = self.add_to_build_file('subdir/BUILD', 'target(name="bar")')
+    self.add_to_build_file('subdir/excluded/BUILD', 'target(name="baz")')
+    spec_excludes = ['subdir/excluded/']
+    self.assertEquals(set([BuildFileAddress(root_build_file, 'foo'),
+                           BuildFileAddress(subdir_build_file, 'bar')]),
+                      self.address_mapper.scan_addresses(root=self.build_root,
+                                                         spec_excludes=spec_excludes))
+
+  def test_parallel_scan_addresses(self):
+    for i in range(8):
+      self.add_to_build_file('dir{}/BUILD'.format(i), dedent('''
+        target(name='a', dependencies=[':b'])
+        target(name='b')
+        '''))
+    self.add_to_build_file('dir0/BUILD.suffix', 'target(name="c")')
+    serial_addresses = self.address_mapper.scan_addresses(root=self.build_root)
+
+    address_mapper = BuildFileAddressMapper(self.build_file_parser, FilesystemBuildFile,
+                                            scan_workers=3)
+    parallel_addresses = address_mapper.scan_addresses(root=self.build_root)
+    self.assertEqual(17, len(parallel_addresses))
+    self.assertEqual(serial_addresses, parallel_addresses)
+    _, addressable = address_mapper.resolve(SyntheticAddress.parse('dir3:a'))
+    self.assertEqual(['dir3:b'], [SyntheticAddress.parse(spec, relative_to='dir3').spec
+                                  for spec in addressable.dependency_specs])
+
+  def test_parallel_scan_addresses_errors(self):
+    self.add_to_build_file('dir0/BUILD', 'target(name="a")')
+    self.add_to_build_file('dir1/BUILD', 'target(name="a")')
+    self.add_to_build_file('dir1/BUILD.suffix', 'target(name="a")')
+    address_mapper = BuildFileAddressMapper(self.build_file_parser, FilesystemBuildFile,
+                                            scan_workers=2)
+    with self.assertRaisesRegexp(AddressLookupError, 'define the same address'):
+      address_mapper.scan_addresses(root=self.build_root)
+
   def test_raises_invalid_build_file_reference(self):
     # reference a BUILD file that doesn't exist
     with self.assertRaisesRegexp(BuildFileAddressMapper.InvalidBuildFileReference,
@@ -0,0 +1,163 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+from textwrap import dedent
+
+from pants.backend.core.wrapped_globs import Globs, RGlobs
+from pants.backend.jvm.targets.jar_dependency import JarDependency
+from pants.backend.jvm.targets.java_library import JavaLibrary
+from pants.base.build_file import FilesystemBuildFile
+from pants.base.build_file_aliases import BuildFileAliases
+from pants.base.build_file_parse_cache import BuildFileParseCache
+from pants.base.build_file_parser import BuildFileParser
+from pants.base.source_root import SourceRoot
+from pants_test.base_test import BaseTest
+
+
+class BuildFileParseCacheTest(BaseTest):
+
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(
+      targets={'java_library': JavaLibrary},
+      objects={'jar': JarDependency},
+      context_aware_object_factories={
+        'globs': Globs,
+        'rglobs': RGlobs,
+        'source_root': SourceRoot.factory,
+      })
+
+  def setUp(self):
+    super(BuildFileParseCacheTest, self).setUp()
+    self.cache_path = os.path.join(self.build_root, '.pants.d', 'parse_cache.pickle')
+
+  def age(self, relpath):
+    # Age the path beyond the racy window so that globs of it are eligible for caching.
+    path = os.path.join(self.build_root, relpath)
+    mtime = time.time() - 60
+    os.utime(path, (mtime, mtime))
+
+  def parse(self, relpath='a/BUILD'):
+    """Parses the family of the given BUILD file with a fresh parser backed by the saved cache."""
+    cache = BuildFileParseCache(self._build_configuration, self.build_root, self.cache_path)
+    parser = BuildFileParser(self._build_configuration, self.build_root, parse_cache=cache)
+    build_file = FilesystemBuildFile(self.build_root, relpath)
+    address_map = parser.address_map_from_build_file(build_file)
+    cache.save()
+    return cache, dict((address.target_name, addressable)
+                       for address, addressable in address_map.items())
+
+  def test_unchanged_family_is_replayed(self):
+    self.add_to_build_file('a/BUILD', dedent('''
+      java_library(name='a',
+        dependencies=['b:b'],
+        provides=None,
+      )
+    '''))
+    self.add_to_build_file('a/BUILD.extras', "java_library(name='extras', dependencies=[':a'])")
+
+    cache, executed = self.parse()
+    self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+    cache, replayed = self.parse()
+    self.assertEqual((1, 0), (cache.hits, cache.misses))
+    self.assertEqual(sorted(executed), sorted(replayed))
+    for name, addressable in executed.items():
+      self.assertEqual(addressable.target_type, replayed[name].target_type)
+      self.assertEqual(addressable.kwargs, replayed[name].kwargs)
+      self.assertEqual(addressable.dependency_specs, replayed[name].dependency_specs)
+
+  def test_changed_sibling_invalidates_family(self):
+    self.add_to_build_file('a/BUILD', "java_library(name='a')")
+    self.add_to_build_file('a/BUILD.extras', "java_library(name='extras')")
+    self.parse()
+
+    self.add_to_build_file('a/BUILD.extras', "\njava_library(name='more')")
+    cache, address_map = self.parse()
+    self.assertEqual((0, 1), (cache.hits, cache.misses))
+    self.assertEqual(['a', 'extras', 'more'], sorted(address_map))
+
+  def test_objects_are_replayed(self):
+    self.add_to_build_file('a/BUILD', dedent('''
+      java_library(name='a',
+        dependencies=[],
+        resources=[jar(org='com.example', name='lib', rev='1.0')],
+      )
+    '''))
+    self.parse()
+    cache, address_map = self.parse()
+    self.assertEqual(1, cache.hits)
+    jar, = address_map['a'].kwargs['resources']
+    self.assertEqual(('com.example', 'lib', '1.0'), (jar.org, jar.name, jar.rev))
+
+  def test_globs_validated_by_directory_listing(self):
+    self.create_file('a/One.java')
+    self.add_to_build_file('a/BUILD', "java_library(name='a', sources=globs('*.java'))")
+    self.age('a')
+    self.parse()
+
+    cache, address_map = self.parse()
+    self.assertEqual(1, cache.hits)
+    self.assertEqual(['One.java'], list(address_map['a'].kwargs['sources']))
+
+    self.create_file('a/Two.java')
+    cache, address_map = self.parse()
+    self.assertEqual(0, cache.hits)
+    self.assertEqual(['One.java', 'Two.java'], sorted(address_map['a'].kwargs['sources']))
+
+  def test_rglobs_validated_by_subdirectory_listing(self):
+    self.create_file('a/b/One.java')
+    self.add_to_build_file('a/BUILD', "java_library(name='a', sources=rglobs('*.java'))")
+    self.age('a')
+    self.age('a/b')
+    self.parse()
+    cache, _ = self.parse()
+    self.assertEqual(1, cache.hits)
+
+    self.create_file('a/b/Two.java')
+    cache, address_map = self.parse()
+    self.assertEqual(0, cache.hits)
+    self.assertEqual(['b/One.java', 'b/Two.java'], sorted(address_map['a'].kwargs['sources']))
+
+  def test_recently_globbed_directories_not_cached(self):
+    self.create_file('a/One.java')
+    self.add_to_build_file('a/BUILD', "java_library(name='a', sources=globs('*.java'))")
+    self.parse()
+    cache, _ = self.parse()
+    self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+  def test_uncacheable_build_files(self):
+    self.add_to_build_file('a/BUILD', dedent('''
+      import os
+      java_library(name='a')
+    '''))
+    self.add_to_build_file('b/BUILD', dedent('''
+      source_root('b')
+      java_library(name='b')
+    '''))
+    self.add_to_build_file('c/BUILD', "java_library(name=open.__name__)")
+    for relpath in ('a/BUILD', 'b/BUILD', 'c/BUILD'):
+      self.parse(relpath)
+      cache, _ = self.parse(relpath)
+      self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+  def test_alias_change_invalidates(self):
+    self.add_to_build_file('a/BUILD', "java_library(name='a')")
+    self.parse()
+
+    self._build_configuration.register_exposed_object('jar2', JarDependency)
+    cache, _ = self.parse()
+    self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+  def test_corrupt_cache_ignored(self):
+    self.add_to_build_file('a/BUILD', "java_library(name='a')")
+    self.create_file('.pants.d/parse_cache.pickle', 'not a pickle')
+    cache, address_map = self.parse()
+    self.assertEqual((0, 1), (cache.hits, cache.misses))
+    self.assertEqual(['a'], list(address_map))
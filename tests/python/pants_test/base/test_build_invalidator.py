@@ -8,10 +8,14 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import hashlib
 import os
 import tempfile
+import unittest
 from contextlib import contextmanager
 
-from pants.base.build_invalidator import BuildInvalidator, CacheKeyGenerator
+from pants.base.build_invalidator import (GLOBAL_CACHE_KEY_GEN_VERSION, BuildInvalidator, CacheKey,
+                                          CacheKeyGenerator, IndexedBuildInvalidator,
+                                          create_build_invalidator)
 from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdtemp, safe_rmtree
 
 
 TEST_CONTENT = 'muppet'
@@ -58,3 +62,100 @@ def test_env(content=TEST_CONTENT):
 #     assert cache.needs_update(key)
 #     cache.update(key)
 #     assert not cache.needs_update(key)
+
+
+class IndexedBuildInvalidatorTest(unittest.TestCase):
+
+  def setUp(self):
+    self.root = safe_mkdtemp()
+    self.addCleanup(safe_rmtree, self.root)
+
+  def test_needs_update(self):
+    invalidator = IndexedBuildInvalidator(self.root)
+    key = CacheKey('a.b', 'hash1', 1)
+    self.assertTrue(invalidator.needs_update(key))
+    invalidator.update(key)
+    self.assertFalse(invalidator.needs_update(key))
+    self.assertTrue(invalidator.needs_update(CacheKey('a.b', 'hash2', 1)))
+    self.assertEqual('hash1', invalidator.existing_hash('a.b'))
+
+  def test_persistence(self):
+    invalidator = IndexedBuildInvalidator(self.root)
+    invalidator.update(CacheKey('a.b', 'hash1', 1))
+    invalidator.update(CacheKey('a.c', 'hash2', 1))
+    invalidator.update(CacheKey('a.b', 'hash3', 1))
+    invalidator.force_invalidate(CacheKey('a.c', 'hash2', 1))
+
+    reloaded = IndexedBuildInvalidator(self.root)
+    self.assertEqual('hash3', reloaded.existing_hash('a.b'))
+    self.assertIsNone(reloaded.existing_hash('a.c'))
+
+  def test_force_invalidate_all(self):
+    invalidator = IndexedBuildInvalidator(self.root)
+    invalidator.update(CacheKey('a.b', 'hash1', 1))
+    invalidator.force_invalidate_all()
+    self.assertIsNone(invalidator.existing_hash('a.b'))
+    self.assertIsNone(IndexedBuildInvalidator(self.root).existing_hash('a.b'))
+
+  def test_truncated_record_ignored(self):
+    invalidator = IndexedBuildInvalidator(self.root)
+    invalidator.update(CacheKey('a.b', 'hash1', 1))
+    index_file = os.path.join(self.root, GLOBAL_CACHE_KEY_GEN_VERSION,
+                              IndexedBuildInvalidator.INDEX_FILENAME)
+    with open(index_file, 'ab') as fd:
+      fd.write('["a.c", "ha')
+
+    reloaded = IndexedBuildInvalidator(self.root)
+    self.assertEqual('hash1', reloaded.existing_hash('a.b'))
+    self.assertIsNone(reloaded.existing_hash('a.c'))
+    reloaded.update(CacheKey('a.d', 'hash4', 1))
+    self.assertEqual('hash4', IndexedBuildInvalidator(self.root).existing_hash('a.d'))
+
+  def test_migration(self):
+    legacy = BuildInvalidator(self.root)
+    legacy.update(CacheKey('a.b', 'hash1', 1))
+    long_id = 'a' * 300
+    legacy.update(CacheKey(long_id, 'hash2', 1))
+
+    invalidator = IndexedBuildInvalidator(self.root)
+    self.assertEqual('hash1', invalidator.existing_hash('a.b'))
+    self.assertEqual('hash2', invalidator.existing_hash(long_id))
+    self.assertEqual([IndexedBuildInvalidator.INDEX_FILENAME],
+                     os.listdir(os.path.join(self.root, GLOBAL_CACHE_KEY_GEN_VERSION)))
+
+  def test_per_target_files_override_index(self):
+    IndexedBuildInvalidator(self.root).update(CacheKey('a.b', 'hash1', 1))
+    BuildInvalidator(self.root).update(CacheKey('a.b', 'hash2', 1))
+    self.assertEqual('hash2', IndexedBuildInvalidator(self.root).existing_hash('a.b'))
+
+  def test_switching_backends(self):
+    indexed = IndexedBuildInvalidator(self.root)
+    indexed.update(CacheKey('a.b', 'hash1', 1))
+    indexed.update(CacheKey('a.c', 'hash2', 1))
+
+    legacy = BuildInvalidator(self.root)
+    self.assertEqual('hash1', legacy.existing_hash('a.b'))
+    legacy.force_invalidate(CacheKey('a.b', 'hash1', 1))
+    legacy.update(CacheKey('a.c', 'hash3', 1))
+
+    indexed = IndexedBuildInvalidator(self.root)
+    self.assertTrue(indexed.needs_update(CacheKey('a.b', 'hash1', 1)))
+    self.assertEqual('hash3', indexed.existing_hash('a.c'))
+
+  def test_compaction(self):
+    invalidator = IndexedBuildInvalidator(self.root)
+    for i in range(IndexedBuildInvalidator.COMPACTION_SLACK + 2):
+      invalidator.update(CacheKey('a.b', 'hash{}'.format(i), 1))
+    index_file = os.path.join(self.root, GLOBAL_CACHE_KEY_GEN_VERSION,
+                              IndexedBuildInvalidator.INDEX_FILENAME)
+
+    reloaded = IndexedBuildInvalidator(self.root)
+    self.assertEqual('hash{}'.format(IndexedBuildInvalidator.COMPACTION_SLACK + 1),
+                     reloaded.existing_hash('a.b'))
+    with open(index_file, 'rb') as fd:
+      self.assertEqual(1, len(fd.readlines()))
+
+  def test_create_build_invalidator(self):
+    self.assertIsInstance(create_build_invalidator(self.root), BuildInvalidator)
+    self.assertIsInstance(create_build_invalidator(self.root, indexed=True),
+                          IndexedBuildInvalidator)
@@ -0,0 +1,79 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+
+from pants.backend.jvm.targets.java_library import JavaLibrary
+from pants.base.address import SyntheticAddress
+from pants.base.build_file_aliases import BuildFileAliases
+from pants.base.dependee_index import DependeeIndex
+from pants_test.base_test import BaseTest
+
+
+class DependeeIndexTest(BaseTest):
+  @property
+  def alias_groups(self):
+    return BuildFileAliases.create(
+      targets={
+        'java_library': JavaLibrary,
+      },
+    )
+
+  def setUp(self):
+    super(DependeeIndexTest, self).setUp()
+    self.index_path = os.path.join(self.pants_workdir, 'dependee_index.json')
+    self.create_file('a/BUILD', "java_library(name='a')")
+    self.create_file('b/BUILD', "java_library(name='b', dependencies=['a'])")
+    self.create_file('c/BUILD', "java_library(name='c', dependencies=['b'])")
+
+  def updated_index(self, expected_loaded):
+    self.reset_build_graph()
+    index = DependeeIndex(self.address_mapper, self.build_graph, self.index_path)
+    index.update()
+    self.assertEqual(expected_loaded, index.loaded)
+    return index
+
+  def assert_dependees(self, expected_direct, expected_transitive, index, spec):
+    address = SyntheticAddress.parse(spec)
+    self.assertEqual(set(expected_direct), set(a.spec for a in index.dependees_of(address)))
+    self.assertEqual(set(expected_transitive),
+                     set(a.spec for a in index.transitive_dependees_of([address])))
+
+  def test_dependees(self):
+    index = self.updated_index(3)
+    self.assert_dependees(['b:b'], ['a:a', 'b:b', 'c:c'], index, 'a')
+    self.assert_dependees([], ['c:c'], index, 'c')
+
+  def test_incremental(self):
+    self.updated_index(3)
+    index = self.updated_index(0)
+    self.assert_dependees(['b:b'], ['a:a', 'b:b', 'c:c'], index, 'a')
+
+    self.create_file('c/BUILD', "java_library(name='c', dependencies=['a'])")
+    index = self.updated_index(1)
+    self.assert_dependees(['b:b', 'c:c'], ['a:a', 'b:b', 'c:c'], index, 'a')
+    self.assert_dependees([], ['b:b'], index, 'b')
+
+    os.unlink(os.path.join(self.build_root, 'b', 'BUILD'))
+    index = self.updated_index(0)
+    self.assert_dependees(['c:c'], ['a:a', 'c:c'], index, 'a')
+
+  def test_dependencies_not_injected(self):
+    index = self.updated_index(3)
+    self.assertEqual([], list(self.build_graph.targets()))
+    self.assert_dependees(['b:b'], ['a:a', 'b:b', 'c:c'], index, 'a')
+
+  def test_unindexable(self):
+    self.create_file('c/BUILD', "import os\njava_library(name='c', dependencies=['b'])")
+    self.updated_index(3)
+    index = self.updated_index(1)
+    self.assert_dependees(['c:c'], ['b:b', 'c:c'], index, 'b')
+
+  def test_corrupt(self):
+    self.create_file(os.path.relpath(self.index_path, self.build_root), '{')
+    index = self.updated_index(3)
+    self.assert_dependees(['b:b'], ['a:a', 'b:b', 'c:c'], index, 'a')
@@ -0,0 +1,39 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.base.duration_history import DurationHistory
+from pants.util.contextutil import temporary_dir
+
+
+class DurationHistoryTest(unittest.TestCase):
+
+  def test_estimate_decays(self):
+    history = DurationHistory()
+    self.assertIsNone(history.estimate('a'))
+    self.assertEqual(3, history.estimate('a', default=3))
+    history.record('a', 10)
+    self.assertEqual(10, history.estimate('a'))
+    history.record('a', 20)
+    self.assertEqual(15, history.estimate('a'))
+
+  def test_persistence(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'history', 'durations.json')
+      history = DurationHistory(path)
+      history.record('a', 10)
+      history.save()
+      self.assertEqual(10, DurationHistory(path).estimate('a'))
+
+  def test_corrupt_history_ignored(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations.json')
+      with open(path, 'wb') as fp:
+        fp.write(b'{not json')
+      self.assertIsNone(DurationHistory(path).estimate('a'))
@@ -0,0 +1,114 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import os
+import time
+import unittest
+
+from pants.base.file_digest_cache import (FileDigestCache, get_file_digest_cache,
+                                          set_file_digest_cache)
+from pants.base.hash_utils import hash_file
+from pants.util.contextutil import temporary_dir
+
+
+class FileDigestCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir_context = temporary_dir()
+    self.tmpdir = self.tmpdir_context.__enter__()
+
+  def tearDown(self):
+    self.tmpdir_context.__exit__(None, None, None)
+
+  def write_file(self, name, content, age=60):
+    path = os.path.join(self.tmpdir, name)
+    with open(path, 'wb') as fp:
+      fp.write(content)
+    # Age the file beyond the racy window so its digest is eligible for caching.
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+  def test_digest(self):
+    path = self.write_file('a.txt', 'jake jones')
+    cache = FileDigestCache()
+    self.assertEqual(hashlib.sha1('jake jones').hexdigest(), cache.digest(path))
+    self.assertEqual(hashlib.sha1('jake jones').hexdigest(), cache.digest(path))
+    self.assertEqual(1, cache.hits)
+    self.assertEqual(1, cache.misses)
+
+  def test_stat_change_invalidates(self):
+    path = self.write_file('a.txt', 'jake jones')
+    cache = FileDigestCache()
+    cache.digest(path)
+    self.write_file('a.txt', 'jake jones, jr.', age=30)
+    self.assertEqual(hashlib.sha1('jake jones, jr.').hexdigest(), cache.digest(path))
+    self.assertEqual(0, cache.hits)
+    self.assertEqual(2, cache.misses)
+
+  def test_racy_files_not_cached(self):
+    path = self.write_file('a.txt', 'jake jones', age=0)
+    cache = FileDigestCache()
+    cache.digest(path)
+    cache.digest(path)
+    self.assertEqual(0, cache.hits)
+    self.assertEqual(2, cache.misses)
+
+  def test_persistence(self):
+    path = self.write_file('a.txt', 'jake jones')
+    cache_path = os.path.join(self.tmpdir, 'cache', 'digests.json')
+
+    cache = FileDigestCache(cache_path)
+    cache.digest(path)
+    cache.save()
+    self.assertTrue(os.path.exists(cache_path))
+
+    reloaded = FileDigestCache(cache_path)
+    self.assertEqual(hashlib.sha1('jake jones').hexdigest(), reloaded.digest(path))
+    self.assertEqual(1, reloaded.hits)
+    self.assertEqual(0, reloaded.misses)
+
+  def test_deleted_files_dropped(self):
+    cache_path = os.path.join(self.tmpdir, 'cache', 'digests.json')
+    cache = FileDigestCache(cache_path)
+    kept = self.write_file('a.txt', 'jake jones')
+    deleted = self.write_file('b.txt', 'jake jones, jr.')
+    cache.digest(kept)
+    cache.digest(deleted)
+    cache.save()
+
+    os.unlink(deleted)
+    cache = FileDigestCache(cache_path)
+    cache.digest(self.write_file('c.txt', 'jake jones, sr.'))
+    cache.save()
+    self.assertEqual(sorted(os.path.join(self.tmpdir, name) for name in ('a.txt', 'c.txt')),
+                     sorted(FileDigestCache(cache_path)._entries))
+
+  def test_corrupt_cache_ignored(self):
+    path = self.write_file('a.txt', 'jake jones')
+    cache_path = self.write_file('digests.json', '{not json')
+    cache = FileDigestCache(cache_path)
+    self.assertEqual(hashlib.sha1('jake jones').hexdigest(), cache.digest(path))
+    self.assertEqual(1, cache.misses)
+
+  def test_hash_file_uses_installed_cache(self):
+    path = self.write_file('a.txt', 'jake jones')
+    cache = FileDigestCache()
+    previous = get_file_digest_cache()
+    set_file_digest_cache(cache)
+    try:
+      self.assertEqual(hashlib.sha1('jake jones').hexdigest(), hash_file(path))
+      self.assertEqual(hashlib.sha1('jake jones').hexdigest(), hash_file(path))
+    finally:
+      set_file_digest_cache(previous)
+    self.assertEqual(1, cache.hits)
+    self.assertEqual(1, cache.misses)
+
+  def test_set_invalid_cache(self):
+    with self.assertRaises(ValueError):
+      set_file_digest_cache(object())
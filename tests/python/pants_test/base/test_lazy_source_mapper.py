@@ -5,6 +5,10 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+from textwrap import dedent
+
+from pants.backend.core.targets.resources import Resources
+from pants.backend.core.wrapped_globs import Globs
 from pants.backend.jvm.targets.java_library import JavaLibrary
 from pants.base.build_file_aliases import BuildFileAliases
 from pants.base.lazy_source_mapper import LazySourceMapper
@@ -17,6 +21,10 @@ class LazySourceMapperTest(BaseTest):
     return BuildFileAliases.create(
       targets={
         'java_library': JavaLibrary,
+        'resources': Resources,
+      },
+      context_aware_object_factories={
+        'globs': Globs,
       },
     )
 
@@ -87,3 +95,39 @@ class LazySourceMapperTest(BaseTest):
     self.owner(['a/b:b'], 'a/b/bar.py')
     self.owner([':top'], 'foo.py')
     self.owner([':top', 'a/b:b'], 'a/b/bar.py')
+
+  def test_batched(self):
+    self.create_files('lib', ['a.py', 'b.py', 'sub/c.py'])
+    self.add_to_build_file('lib', "java_library(name='lib', sources=['a.py', 'b.py'])")
+    self.add_to_build_file('lib/sub', dedent('''
+      java_library(name='sub', sources=['c.py'], dependencies=['missing'])
+    '''))
+    owners = self.mapper.target_addresses_for_sources(['lib/a.py', 'lib/sub/c.py', 'lib/BUILD',
+                                                       'other.py'])
+    self.assertEqual({'lib/a.py': set(['lib:lib']),
+                      'lib/sub/c.py': set(['lib/sub:sub']),
+                      'lib/BUILD': set(['lib:lib']),
+                      'other.py': set()},
+                     dict((src, set(a.spec for a in addrs)) for src, addrs in owners.items()))
+    # Owners are found without injecting them, or their dependencies, into the BuildGraph.
+    self.assertEqual([], list(self.build_graph.targets()))
+
+  def test_globs(self):
+    self.create_files('lib', ['A.java', 'Gen.java', 'sub/B.java'])
+    self.add_to_build_file('lib', dedent('''
+      java_library(name='lib', sources=globs('*.java', exclude=['Gen.java']))
+    '''))
+    self.owner(['lib:lib'], 'lib/A.java')
+    # Sources are matched against globs, so deleted files still have owners.
+    self.owner(['lib:lib'], 'lib/Deleted.java')
+    self.owner([], 'lib/Gen.java')
+    self.owner([], 'lib/sub/B.java')
+
+  def test_resources(self):
+    self.create_files('src', ['Lib.java', 'res/r.txt'])
+    self.add_to_build_file('src/res', "resources(name='res', sources=['r.txt'])")
+    self.add_to_build_file('src', dedent('''
+      java_library(name='lib', sources=['Lib.java'], resources=['src/res'])
+    '''))
+    self.owner(['src/res:res', 'src:lib'], 'src/res/r.txt')
+    self.owner(['src:lib'], 'src/Lib.java')
@@ -0,0 +1,94 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import io
+import os
+import random
+import unittest
+
+from pants.cache.artifact import ArtifactError, TarballArtifact
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir_for, safe_rmtree
+
+
+class TarballArtifactTest(unittest.TestCase):
+
+  def create_classes_dir(self, root, num_packages=10, classes_per_package=20):
+    """Creates a synthetic classes directory, returning the relpaths and contents of its files."""
+    rand = random.Random(42)
+    # Like real class files, the synthetic ones share much of their vocabulary.
+    vocabulary = [b'java/lang/Object', b'java/lang/String', b'<init>', b'()V', b'Code',
+                  b'LineNumberTable', b'SourceFile', b'com/example/Foo', b'\xca\xfe\xba\xbe']
+    files = {}
+    for package in range(num_packages):
+      for cls in range(classes_per_package):
+        relpath = os.path.join('classes', 'com', 'example', 'pkg{}'.format(package),
+                               'Class{}.class'.format(cls))
+        content = b''.join(rand.choice(vocabulary) + bytes(bytearray([rand.randint(0, 255)]))
+                           for _ in range(200))
+        path = os.path.join(root, relpath)
+        safe_mkdir_for(path)
+        with open(path, 'wb') as fp:
+          fp.write(content)
+        files[relpath] = content
+    return files
+
+  def assert_extracted(self, root, files):
+    for relpath, content in files.items():
+      with open(os.path.join(root, relpath), 'rb') as fp:
+        self.assertEqual(content, fp.read())
+
+  def test_codecs_round_trip(self):
+    with temporary_dir() as root:
+      files = self.create_classes_dir(root, num_packages=2, classes_per_package=3)
+      for codec in TarballArtifact.CODECS:
+        tarball = os.path.join(root, 'artifact' + TarballArtifact.extension(codec))
+        TarballArtifact(root, tarball, compression=5, codec=codec).collect(
+          [os.path.join(root, 'classes')])
+        safe_rmtree(os.path.join(root, 'classes'))
+
+        # Tarballs are extracted according to their content, whatever codec the reader uses.
+        TarballArtifact(root, tarball, codec='gzip').extract()
+        self.assert_extracted(root, files)
+        safe_rmtree(os.path.join(root, 'classes'))
+        with open(tarball, 'rb') as fp:
+          TarballArtifact(root, None, codec='none').extract_stream(fp)
+        self.assert_extracted(root, files)
+
+  def test_truncated_stream_leaves_no_files(self):
+    with temporary_dir() as root:
+      self.create_classes_dir(root, num_packages=2, classes_per_package=3)
+      tarball = os.path.join(root, 'artifact.tar')
+      TarballArtifact(root, tarball, codec='none').collect([os.path.join(root, 'classes')])
+      safe_rmtree(os.path.join(root, 'classes'))
+      with open(tarball, 'rb') as fp:
+        content = fp.read()
+
+      with temporary_dir() as dest:
+        with self.assertRaises(ArtifactError):
+          TarballArtifact(dest, None).extract_stream(io.BytesIO(content[:len(content) // 2]))
+        self.assertEqual([], os.listdir(dest))
+
+  def test_unknown_codec(self):
+    with self.assertRaises(ValueError):
+      TarballArtifact('root', 'artifact.tar', codec='snappy')
+
+  def test_codecs_compress(self):
+    with temporary_dir() as root:
+      files = self.create_classes_dir(root)
+      sizes = {}
+      for codec in sorted(TarballArtifact.CODECS):
+        tarball = os.path.join(root, 'artifact' + TarballArtifact.extension(codec))
+        artifact = TarballArtifact(root, tarball, compression=5, codec=codec)
+        artifact.collect([os.path.join(root, 'classes')])
+        safe_rmtree(os.path.join(root, 'classes'))
+        artifact.extract()
+        self.assert_extracted(root, files)
+        sizes[codec] = os.path.getsize(tarball)
+
+      self.assertLess(sizes['gzip'], sizes['none'])
+      self.assertLess(sizes['bzip2'], sizes['none'])
@@ -13,7 +13,7 @@ from contextlib import contextmanager
 from threading import Thread
 
 from pants.base.build_invalidator import CacheKey
-from pants.cache.artifact_cache import call_insert, call_use_cached_files
+from pants.cache.artifact_cache import UnreadableArtifact, call_insert, call_use_cached_files
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
 from pants.cache.restful_artifact_cache import InvalidRESTfulCacheProtoError, RESTfulArtifactCache
 from pants.util.contextutil import pushd, temporary_dir, temporary_file
@@ -23,10 +23,16 @@ from pants_test.base.context_utils import create_context
 
 # A very trivial server that serves files under the cwd.
 class SimpleRESTHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
+  # The methods of all requests handled, in order.
+  requests = []
+
   def __init__(self, request, client_address, server):
     # The base class implements GET and HEAD.
     SimpleHTTPServer.SimpleHTTPRequestHandler.__init__(self, request, client_address, server)
 
+  def log_request(self, *args, **kwargs):
+    SimpleRESTHandler.requests.append(self.command)
+
   def do_HEAD(self):
     return SimpleHTTPServer.SimpleHTTPRequestHandler.do_HEAD(self)
 
@@ -174,6 +180,111 @@ class TestArtifactCache(unittest.TestCase):
           self.assertTrue(local.has(key))
           self.assertTrue(bool(local.use_cached_files(key)))
 
+  def test_store_and_use_streamed_artifact(self):
+    key = CacheKey('muppet_key', 'fake_hash', 42)
+    with self.setup_local_cache() as source:
+      with self.setup_test_file(source.artifact_root) as path:
+        source.insert(key, [path])
+        with open(source._cache_file_for_key(key), 'rb') as tarball:
+          data = tarball.read()
+        os.unlink(path)
+
+        with temporary_dir() as cache_root:
+          # Read the tarball in tiny chunks, so that tar blocks span many of them.
+          cache = LocalArtifactCache(source.artifact_root, cache_root, compression=0)
+          chunks = (data[i:i + 7] for i in range(0, len(data), 7))
+          self.assertTrue(cache.store_and_use_artifact(key, chunks))
+          with open(path, 'r') as infile:
+            self.assertEquals(TEST_CONTENT1, infile.read())
+          # The whole tarball is stored, not just the part the extraction needed to read.
+          with open(cache._cache_file_for_key(key), 'rb') as tarball:
+            self.assertEquals(data, tarball.read())
+
+  def test_codec_in_key_path(self):
+    key = CacheKey('muppet_key', 'fake_hash', 42)
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as cache_root:
+        gzip_cache = LocalArtifactCache(artifact_root, cache_root, compression=1)
+        plain_cache = LocalArtifactCache(artifact_root, cache_root, compression=1, codec='none')
+        with self.setup_test_file(artifact_root) as path:
+          plain_cache.insert(key, [path])
+          self.assertTrue(plain_cache._cache_file_for_key(key).endswith('.tar'))
+          # Caches using different codecs can share a root without reading each other's artifacts.
+          self.assertFalse(gzip_cache.has(key))
+          gzip_cache.insert(key, [path])
+          self.assertTrue(gzip_cache._cache_file_for_key(key).endswith('.tgz'))
+          self.assertTrue(plain_cache.has(key))
+
+          os.unlink(path)
+          self.assertTrue(bool(plain_cache.use_cached_files(key)))
+          with open(path, 'r') as infile:
+            self.assertEquals(TEST_CONTENT1, infile.read())
+
+  def test_restful_cache_codec(self):
+    key = CacheKey('muppet_key', 'fake_hash', 42)
+    with self.setup_rest_cache() as artifact_cache:
+      plain_cache = RESTfulArtifactCache(artifact_cache.artifact_root,
+                                         artifact_cache._url_string(''),
+                                         TempLocalArtifactCache(artifact_cache.artifact_root, 0,
+                                                                codec='bzip2'))
+      with self.setup_test_file(artifact_cache.artifact_root) as path:
+        plain_cache.insert(key, [path])
+        self.assertTrue(os.path.exists(os.path.join(os.getcwd(), 'muppet_key', 'fake_hash.tbz2')))
+        self.assertFalse(artifact_cache.has(key))
+        os.unlink(path)
+        self.assertTrue(bool(plain_cache.use_cached_files(key)))
+        with open(path, 'r') as infile:
+          self.assertEquals(TEST_CONTENT1, infile.read())
+
+  def test_corrupt_remote_artifact(self):
+    key = CacheKey('muppet_key', 'fake_hash', 42)
+    with self.setup_rest_cache() as artifact_cache:
+      with self.setup_test_file(artifact_cache.artifact_root) as path:
+        artifact_cache.insert(key, [path])
+        # The server serves from the cwd.
+        with open(os.path.join(os.getcwd(), 'muppet_key', 'fake_hash.tgz'), 'wb') as outfile:
+          outfile.write('not a tarball')
+        result = artifact_cache.use_cached_files(key)
+        self.assertFalse(bool(result))
+        self.assertIsInstance(result, UnreadableArtifact)
+
+  def test_has_many(self):
+    keys = [CacheKey('muppet_key{}'.format(i), 'fake_hash', 42) for i in range(5)]
+    with self.setup_rest_cache() as artifact_cache:
+      with self.setup_test_file(artifact_cache.artifact_root) as path:
+        for key in keys[:3]:
+          artifact_cache.try_insert(key, [path])
+
+      # A fresh cache knows nothing, and checks each key once.
+      artifact_cache = RESTfulArtifactCache(artifact_cache.artifact_root,
+                                            artifact_cache._url_string(''),
+                                            TempLocalArtifactCache(artifact_cache.artifact_root, 0),
+                                            known_urls={})
+      del SimpleRESTHandler.requests[:]
+      self.assertEquals([True, True, True, False, False],
+                        artifact_cache.has_many(keys, concurrency=3))
+      self.assertEquals(['HEAD'] * 5, SimpleRESTHandler.requests)
+
+      # Once known, keys need no further requests.
+      self.assertEquals([True, True, True, False, False], artifact_cache.has_many(keys))
+      self.assertTrue(artifact_cache.has(keys[0]))
+      self.assertEquals(['HEAD'] * 5, SimpleRESTHandler.requests)
+
+  def test_insert_after_read_miss(self):
+    key = CacheKey('muppet_key', 'fake_hash', 42)
+    with self.setup_rest_cache() as artifact_cache:
+      artifact_cache = RESTfulArtifactCache(artifact_cache.artifact_root,
+                                            artifact_cache._url_string(''),
+                                            TempLocalArtifactCache(artifact_cache.artifact_root, 0),
+                                            known_urls={})
+      del SimpleRESTHandler.requests[:]
+      self.assertFalse(bool(artifact_cache.use_cached_files(key)))
+      with self.setup_test_file(artifact_cache.artifact_root) as path:
+        self.assertTrue(artifact_cache.insert(key, [path]))
+      # The read miss means the insert needn't check for an existing artifact first.
+      self.assertEquals(['GET', 'PUT'], SimpleRESTHandler.requests)
+      self.assertTrue(all(artifact_cache.use_cached_files_many([key, key], concurrency=2)))
+
   def test_multiproc(self):
     context = create_context()
     key = CacheKey('muppet_key', 'fake_hash', 42)
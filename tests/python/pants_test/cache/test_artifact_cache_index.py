@@ -0,0 +1,134 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import fcntl
+import os
+import pickle
+import time
+import unittest
+
+import mock
+
+from pants.base.build_invalidator import CacheKey
+from pants.cache.artifact_cache_index import ArtifactCacheIndex
+from pants.cache.local_artifact_cache import LocalArtifactCache
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir_for
+
+
+class ArtifactCacheIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir_context = temporary_dir()
+    self.root = os.path.realpath(self.tmpdir_context.__enter__())
+
+  def tearDown(self):
+    self.tmpdir_context.__exit__(None, None, None)
+
+  def write_artifact(self, relpath, size, age=0):
+    path = os.path.join(self.root, relpath)
+    safe_mkdir_for(path)
+    with open(path, 'wb') as fp:
+      fp.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+  def test_evicts_least_recently_used(self):
+    index = ArtifactCacheIndex(self.root, max_size=1000)
+    paths = [self.write_artifact('task/target{}/hash.tgz'.format(i), 300) for i in range(3)]
+    for path in paths:
+      index.record_insert(path)
+    index.record_use(paths[0])
+    self.assertEqual([], index.evict())
+
+    path = self.write_artifact('task/target3/hash.tgz', 300)
+    index.record_insert(path)
+    # Evicted down to the low water mark, least recently used first.
+    self.assertEqual([True, False, False, True],
+                     [os.path.exists(p) for p in paths + [path]])
+    self.assertEqual([], index.evict())
+
+  def test_evicts_expired(self):
+    index = ArtifactCacheIndex(self.root, max_age_secs=60)
+    old = self.write_artifact('task/old/hash.tgz', 10)
+    used = self.write_artifact('task/used/hash.tgz', 10)
+    new = self.write_artifact('task/new/hash.tgz', 10)
+    with open(os.path.join(self.root, ArtifactCacheIndex.INDEX_FILENAME), 'wb') as fp:
+      fp.write(b'["task/old/hash.tgz", 10, {0}]\n["task/used/hash.tgz", 10, {0}]\n'
+               .format(time.time() - 120))
+    index.record_use(used)
+    index.record_insert(new)
+    self.assertFalse(os.path.exists(old))
+    self.assertTrue(os.path.exists(used))
+    self.assertTrue(os.path.exists(new))
+
+  def test_indexes_existing_artifacts(self):
+    old = self.write_artifact('task/old/hash.tgz', 10, age=120)
+    tmp = self.write_artifact('task/old/tmp1234write', 10, age=120)
+    new = self.write_artifact('task/new/hash.tar', 10)
+    self.assertEqual([old], ArtifactCacheIndex(self.root, max_age_secs=60).evict())
+    self.assertTrue(os.path.exists(tmp))
+    self.assertTrue(os.path.exists(new))
+
+  def test_indexes_existing_artifacts_after_insert(self):
+    old = self.write_artifact('task/old/hash.tgz', 500, age=120)
+    new = self.write_artifact('task/new/hash.tgz', 10)
+    index = ArtifactCacheIndex(self.root, max_size=100)
+    # The first insert evicts, after it has appended to the index.
+    index.record_insert(new)
+    self.assertFalse(os.path.exists(old))
+    self.assertTrue(os.path.exists(new))
+
+    # The root is only scanned once.
+    with mock.patch.object(ArtifactCacheIndex, '_scan') as scan:
+      self.assertEqual([], index.evict())
+      self.assertFalse(scan.called)
+
+  def test_concurrent_eviction_skipped(self):
+    index = ArtifactCacheIndex(self.root, max_age_secs=60)
+    old = self.write_artifact('task/old/hash.tgz', 10, age=120)
+    with index._lock_file(ArtifactCacheIndex.EVICTOR_LOCK_FILENAME, fcntl.LOCK_EX):
+      self.assertIsNone(index.evict())
+    self.assertEqual([old], index.evict())
+
+  def test_finishes_interrupted_eviction(self):
+    index = ArtifactCacheIndex(self.root, max_age_secs=60)
+    reinserted = self.write_artifact('task/reinserted/hash.tgz', 10)
+    index.record_insert(reinserted)
+    orphan = self.write_artifact('task/orphan/hash.tgz', 10)
+    with open(os.path.join(self.root, ArtifactCacheIndex.EVICTING_FILENAME), 'wb') as fp:
+      fp.write(b'["task/orphan/hash.tgz", "task/reinserted/hash.tgz"]')
+    self.assertEqual([], index.evict())
+    self.assertFalse(os.path.exists(orphan))
+    self.assertTrue(os.path.exists(reinserted))
+    self.assertFalse(os.path.exists(os.path.join(self.root, ArtifactCacheIndex.EVICTING_FILENAME)))
+
+  def test_shared_and_picklable(self):
+    index = ArtifactCacheIndex.shared(self.root, max_size=1000)
+    self.assertIs(index, ArtifactCacheIndex.shared(self.root, max_size=1000))
+
+    # Copies of the index, as in the workers of a multiprocessing pool, share its check interval.
+    with mock.patch.object(ArtifactCacheIndex, 'evict', autospec=True) as evict:
+      for i in range(6):
+        path = self.write_artifact('task/target{}/hash.tgz'.format(i), 10)
+        pickle.loads(pickle.dumps(index)).record_insert(path)
+      # Once on the first insert into the root, and again once 50 more bytes were inserted.
+      self.assertEqual(2, evict.call_count)
+
+  def test_local_cache_records_accesses(self):
+    key = CacheKey('target', 'hash', 1)
+    index = ArtifactCacheIndex(self.root, max_size=1)
+    with temporary_dir() as artifact_root:
+      cache = LocalArtifactCache(artifact_root, os.path.join(self.root, 'task'), compression=1,
+                                 index=index)
+      path = os.path.join(artifact_root, 'classes')
+      with open(path, 'wb') as fp:
+        fp.write(b'classes')
+      cache.insert(key, [path])
+      # The artifact alone exceeds the max size, so is evicted.
+      self.assertFalse(cache.has(key))
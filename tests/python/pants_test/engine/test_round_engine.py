@@ -7,6 +7,9 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import itertools
 
+import mock
+from six import StringIO
+
 from pants.backend.core.tasks.task import Task
 from pants.engine.round_engine import RoundEngine
 from pants_test.base_test import BaseTest
@@ -210,3 +213,37 @@ class RoundEngineTest(EngineTestBase, BaseTest):
 
     with self.assertRaises(self.engine.TargetRootsReplacement.ConflictingProposalsError):
       self.engine.attempt(self._context, self.as_goals('goal1', 'goal2'))
+
+  def test_estimate(self):
+    self.install_task('task1', goal='goal1')
+    self.install_task('task2', goal='goal1')
+    self.install_task('task3', goal='goal2')
+    self.install_task('task4', goal='goal3')
+
+    self.set_options_for_scope('', estimate=True)
+    context = self.context()
+    run_tracker = context.run_tracker
+    goal_estimates = {'goal2': 5.0}
+    task_estimates = {'goal1.task1': 1.0, 'goal1.task2': 2.5, 'goal2.task3': 4.0}
+    with mock.patch.object(run_tracker, 'estimate_goal_duration', create=True,
+                           side_effect=goal_estimates.get):
+      with mock.patch.object(run_tracker, 'estimate_task_duration', create=True,
+                             side_effect=task_estimates.get):
+        with mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+          self.engine.attempt(context, self.as_goals('goal1', 'goal2', 'goal3'))
+
+    self.assertEqual('Estimated durations, based on previous runs:\n'
+                     '\n'
+                     'goal1: 3.5s\n'
+                     '  task1: 1.0s\n'
+                     '  task2: 2.5s\n'
+                     'goal2: 5.0s\n'
+                     '  task3: 4.0s\n'
+                     'goal3: unknown\n'
+                     '  task4: unknown\n'
+                     '\n'
+                     'Total: 8.5s plus unknown time for goal3\n',
+                     stdout.getvalue())
+    # Nothing ran, and the run must not be recorded as if it had.
+    self.assertEqual([], [action for action in self.actions if action[0] == 'execute'])
+    self.assertFalse(run_tracker.record_durations)
@@ -0,0 +1,95 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import time
+import unittest
+
+import mock
+
+from pants.base.address import SyntheticAddress
+from pants.base.workunit import WorkUnit
+from pants.goal.run_tracker import RunTracker
+from pants.util.dirutil import safe_mkdtemp, safe_rmtree
+from pants_test.base.context_utils import create_option_values
+
+
+class RunTrackerDurationsTest(unittest.TestCase):
+
+  def setUp(self):
+    workdir = safe_mkdtemp()
+    self.addCleanup(safe_rmtree, workdir)
+    options = create_option_values({
+      'pants_workdir': workdir,
+      'stats_upload_url': None,
+      'stats_upload_timeout': 2,
+      'num_foreground_workers': 1,
+      'num_background_workers': 1,
+      'duration_history': True,
+    })
+    self.run_tracker = RunTracker(RunTracker.options_scope, options)
+    self.run_tracker.report = mock.Mock()
+
+    self.root = self.workunit(None, 'all')
+    self.goal = self.workunit(self.root, 'compile', WorkUnit.GOAL)
+    self.task = self.workunit(self.goal, 'java', WorkUnit.TASK)
+    self.a = mock.Mock(address=SyntheticAddress.parse('src/a'))
+    self.b = mock.Mock(address=SyntheticAddress.parse('src/b'))
+
+  def workunit(self, parent, name, *labels, **kwargs):
+    return WorkUnit(self.run_tracker.run_info_dir, parent, name, labels=labels, **kwargs)
+
+  def end(self, workunit, duration, outcome=WorkUnit.SUCCESS):
+    workunit.start_time = 100.0
+    workunit.set_outcome(outcome)
+    with mock.patch.object(time, 'time', return_value=100.0 + duration):
+      self.run_tracker.end_workunit(workunit)
+
+  def test_task_scope(self):
+    work = self.workunit(self.task, 'zinc')
+    self.assertEqual('compile.java', RunTracker._task_scope(work))
+    self.assertEqual('compile.java', RunTracker._task_scope(self.task))
+    self.assertIsNone(RunTracker._task_scope(self.goal))
+    self.assertIsNone(RunTracker._task_scope(self.root))
+    self.assertIsNone(RunTracker._task_scope(None))
+
+    # A task named after its goal has the goal's scope.
+    task = self.workunit(self.workunit(self.root, 'test', WorkUnit.GOAL), 'test', WorkUnit.TASK)
+    self.assertEqual('test', RunTracker._task_scope(task))
+
+  def test_records_durations(self):
+    self.end(self.workunit(self.task, 'zinc', targets=[self.a, self.b]), 4)
+    self.end(self.task, 5)
+    self.end(self.goal, 6)
+
+    self.assertEqual(6, self.run_tracker.estimate_goal_duration('compile'))
+    self.assertEqual(5, self.run_tracker.estimate_task_duration('compile.java'))
+    self.assertIsNone(self.run_tracker.estimate_task_duration('compile.scala'))
+    self.assertEqual(2, self.run_tracker.estimate_target_duration(self.a, scope='compile.java'))
+    self.assertIsNone(self.run_tracker.estimate_target_duration(self.a, scope='test'))
+
+  def test_estimates_decay(self):
+    self.end(self.workunit(self.task, 'zinc', targets=[self.a]), 4)
+    self.end(self.workunit(self.task, 'zinc', targets=[self.a]), 8)
+    self.assertEqual(6, self.run_tracker.estimate_target_duration(self.a, scope='compile.java'))
+
+  def test_estimate_in_current_task(self):
+    self.end(self.workunit(self.task, 'zinc', targets=[self.a]), 4)
+    self.run_tracker.register_thread(self.root)
+    self.assertIsNone(self.run_tracker.estimate_target_duration(self.a))
+
+    self.run_tracker.register_thread(self.workunit(self.task, 'zinc'))
+    self.assertEqual(4, self.run_tracker.estimate_target_duration(self.a))
+    self.assertEqual(1, self.run_tracker.estimate_target_duration(self.b, default=1))
+
+  def test_failures_not_recorded(self):
+    self.end(self.workunit(self.task, 'zinc', targets=[self.a]), 4, outcome=WorkUnit.FAILURE)
+    self.assertIsNone(self.run_tracker.estimate_target_duration(self.a, scope='compile.java'))
+
+  def test_recording_disabled(self):
+    self.run_tracker.record_durations = False
+    self.end(self.task, 5)
+    self.assertIsNone(self.run_tracker.estimate_task_duration('compile.java'))
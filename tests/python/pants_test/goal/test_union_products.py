@@ -52,3 +52,20 @@ class UnionProductsTest(BaseTest):
     found_target = self.products.target_for_product(1000)
 
     self.assertIsNone(found_target)
+
+  def test_derived_cached_until_products_added(self):
+    c = self.make_target('c')
+    computed = []
+
+    def compute():
+      computed.append(list(self.products.get_for_target(c)))
+      return computed[-1]
+
+    self.products.add_for_target(c, [1])
+    self.assertEqual([1], self.products.derived('key', compute))
+    self.assertEqual([1], self.products.derived('key', compute))
+    self.assertEqual(1, len(computed))
+
+    self.products.add_for_target(c, [2])
+    self.assertEqual([1, 2], self.products.derived('key', compute))
+    self.assertEqual(2, len(computed))
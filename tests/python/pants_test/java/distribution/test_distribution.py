@@ -105,6 +105,32 @@ class DistributionValidationTest(unittest.TestCase):
                    minimum_version='1.7.0_25',
                    maximum_version='1.7.999').validate()
 
+  def test_probe_cache(self):
+    java = exe('bin/java', '1.7.0_25')
+    java = java._replace(contents=java.contents + '\necho >> "${DIST_ROOT}/probes"')
+
+    def probe_count(dist_root):
+      with open(os.path.join(dist_root, 'probes')) as fp:
+        return len(fp.readlines())
+
+    with temporary_dir() as cache_dir:
+      Distribution.set_probe_cache_dir(cache_dir)
+      self.addCleanup(Distribution.set_probe_cache_dir, None)
+      with distribution(executables=java) as dist_root:
+        for _ in range(2):
+          dist = Distribution(bin_path=os.path.join(dist_root, 'bin'), minimum_version='1.7')
+          self.assertEqual(Revision.lenient('1.7.0_25'), dist.version)
+          self.assertEqual(dist_root, dist.home)
+        self.assertEqual(1, probe_count(dist_root))
+
+        # A changed java executable is probed again.
+        java_path = os.path.join(dist_root, 'bin', 'java')
+        mtime = os.path.getmtime(java_path)
+        os.utime(java_path, (mtime + 10, mtime + 10))
+        Distribution(bin_path=os.path.join(dist_root, 'bin')).validate()
+        Distribution(bin_path=os.path.join(dist_root, 'bin'), minimum_version='1.7').validate()
+        self.assertEqual(2, probe_count(dist_root))
+
   def test_validated_binary(self):
     with distribution(files='bin/jar', executables=exe('bin/java')) as dist_root:
       with self.assertRaises(Distribution.Error):
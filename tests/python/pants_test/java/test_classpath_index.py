@@ -0,0 +1,103 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+
+from pants.java.classpath_index import ClasspathIndex
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import touch
+
+
+class ClasspathIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmpdir_context = temporary_dir()
+    self.root = os.path.realpath(self.tmpdir_context.__enter__())
+
+  def tearDown(self):
+    self.tmpdir_context.__exit__(None, None, None)
+
+  def create_jar(self, name, *entries):
+    path = os.path.join(self.root, name)
+    with open_zip(path, 'w') as jar:
+      for entry in entries:
+        jar.writestr(entry, b'')
+    return path
+
+  def create_classes_dir(self, name, *classes):
+    path = os.path.join(self.root, name)
+    for cls in classes:
+      touch(os.path.join(path, cls))
+    return path
+
+  def age(self, path, secs=10):
+    # Makes a listing of the path trustworthy despite coarse filesystem timestamps.
+    mtime = time.time() - secs
+    os.utime(path, (mtime, mtime))
+
+  def listing_file(self, index, jar):
+    stat = os.stat(jar)
+    return index._listing_file((os.path.realpath(jar), stat.st_size, stat.st_mtime))
+
+  def test_jar_names(self):
+    jar = self.create_jar('a.jar', 'com/', 'com/b/B.class', 'com/a/A.class', 'META-INF/MANIFEST.MF')
+    index = ClasspathIndex()
+    self.assertEqual(('META-INF/MANIFEST.MF', 'com/a/A.class', 'com/b/B.class'), index.names(jar))
+    self.assertTrue(index.contains(jar, 'com/a/A.class'))
+    self.assertFalse(index.contains(jar, 'com/a/C.class'))
+    self.assertEqual((), index.names(os.path.join(self.root, 'missing.jar')))
+
+  def test_jar_listings_persist(self):
+    cache_dir = os.path.join(self.root, 'cache')
+    jar = self.create_jar('a.jar', 'com/a/A.class')
+    self.assertEqual(('com/a/A.class',), ClasspathIndex(cache_dir).names(jar))
+
+    # A new index reuses the persisted listing rather than reopening the unchanged jar.
+    index = ClasspathIndex(cache_dir)
+    index._list_jar = None
+    self.assertEqual(('com/a/A.class',), index.names(jar))
+
+    # But a changed jar is relisted.
+    jar = self.create_jar('a.jar', 'com/a/A.class', 'com/a/AA.class')
+    self.assertEqual(('com/a/A.class', 'com/a/AA.class'), ClasspathIndex(cache_dir).names(jar))
+
+  def test_jar_listings_pruned(self):
+    cache_dir = os.path.join(self.root, 'cache')
+    a, b, c, d = [self.create_jar('{}.jar'.format(name), 'com/{}/A.class'.format(name))
+                  for name in ('a', 'b', 'c', 'd')]
+    index = ClasspathIndex(cache_dir)
+    for secs, jar in ((30, a), (20, b), (10, c)):
+      index.names(jar)
+      self.age(self.listing_file(index, jar), secs)
+
+    # The listings used by an index are kept, then the most recently used of the rest.
+    index = ClasspathIndex(cache_dir, max_listings=3)
+    index.names(a)
+    index.names(d)
+    self.assertEqual(sorted(self.listing_file(index, jar) for jar in (a, c, d)),
+                     sorted(os.path.join(cache_dir, name) for name in os.listdir(cache_dir)))
+
+  def test_dir_names_incremental(self):
+    classes = self.create_classes_dir('classes', 'com/a/A.class', 'com/b/B.class')
+    for reldir in ('com/a', 'com/b', 'com', ''):
+      self.age(os.path.join(classes, reldir))
+    index = ClasspathIndex()
+    self.assertEqual(('com/a/A.class', 'com/b/B.class'), index.names(classes))
+
+    listed = []
+    list_dir = index._list_dir
+
+    def recording_list_dir(path, mtime):
+      listed.append(os.path.relpath(path, classes))
+      return list_dir(path, mtime)
+    index._list_dir = recording_list_dir
+
+    touch(os.path.join(classes, 'com/b/BB.class'))
+    self.assertEqual(('com/a/A.class', 'com/b/B.class', 'com/b/BB.class'), index.names(classes))
+    self.assertEqual(['com/b'], listed)
@@ -0,0 +1,134 @@
+# coding=utf-8
+# Copyright 2015 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import textwrap
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+
+import mock
+
+from pants.base.build_root import BuildRoot
+from pants.goal.nailgun_stats import NailgunStats
+from pants.java.distribution.distribution import Distribution
+from pants.java.nailgun_executor import NailgunExecutor, NailgunExecutorPool
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import chmod_plus_x, safe_open
+
+
+class NailgunExecutorPoolTest(unittest.TestCase):
+
+  @contextmanager
+  def buildroot(self):
+    with temporary_dir() as root:
+      java = os.path.join(root, 'jre', 'java')
+      with safe_open(java, 'w') as fp:
+        fp.write(textwrap.dedent("""
+            #!/bin/sh
+            echo "java.home={java_home}"
+          """.format(java_home=os.path.dirname(java))).strip())
+      chmod_plus_x(java)
+      with BuildRoot().temporary(root):
+        yield root, Distribution(bin_path=os.path.dirname(java))
+
+  def create_executor(self, root, distribution, identity):
+    return NailgunExecutor(identity, os.path.join(root, identity), [], distribution)
+
+  def test_lease_prefers_running_fingerprint(self):
+    running_fingerprints = {'ng_Test_1': 'fp', 'ng_Test_2': 'other-fp'}
+    with self.buildroot() as (root, distribution):
+      with mock.patch.object(NailgunExecutor, 'running_fingerprint',
+                             property(lambda executor: running_fingerprints.get(executor.name))):
+        pool = NailgunExecutorPool('ng_Test', os.path.join(root, 'ng_Test'), [], distribution,
+                                   size=3)
+        with pool.lease('fp') as executor:
+          self.assertEqual('ng_Test_1', executor.name)
+          with pool.lease('new-fp') as executor:
+            # A server that isn't running is started before a running one is restarted.
+            self.assertEqual('ng_Test', executor.name)
+            with pool.lease('new-fp') as executor:
+              self.assertEqual('ng_Test_2', executor.name)
+
+  def test_servers_per_fingerprint(self):
+    running_fingerprints = {'ng_Test': 'fp1'}
+    stats = NailgunStats()
+    with self.buildroot() as (root, distribution):
+      with mock.patch.object(NailgunExecutor, 'running_fingerprint',
+                             property(lambda executor: running_fingerprints.get(executor.name))):
+        pool = NailgunExecutorPool('ng_Test', os.path.join(root, 'ng_Test'), [], distribution,
+                                   size=1, max_servers=2, stats=stats)
+        with pool.lease('fp2') as executor:
+          self.assertEqual('ng_Test_1', executor.name)
+        running_fingerprints['ng_Test_1'] = 'fp2'
+        for fingerprint, identity in (('fp1', 'ng_Test'), ('fp2', 'ng_Test_1')):
+          with pool.lease(fingerprint) as executor:
+            self.assertEqual(identity, executor.name)
+    self.assertEqual([{'identity': 'ng_Test', 'num_spawns': 1, 'num_reuses': 2}], stats.get_all())
+
+  def test_lease_waits_for_return(self):
+    with self.buildroot() as (root, distribution):
+      pool = NailgunExecutorPool('ng_Test', os.path.join(root, 'ng_Test'), [], distribution,
+                                 max_servers=2)
+      leased = threading.Event()
+
+      def lease():
+        with pool.lease():
+          leased.set()
+
+      with pool.lease():
+        thread = threading.Thread(target=lease)
+        thread.start()
+        self.assertFalse(leased.wait(0.1))
+      thread.join()
+      self.assertTrue(leased.is_set())
+
+  def test_reap_idle(self):
+    with self.buildroot() as (root, distribution):
+      for identity, last_used in (('ng_Test', 1), ('ng_Test_1', time.time()), ('ng_Test_3', 1)):
+        executor = self.create_executor(root, distribution, identity)
+        executor.write_pid(os.getpid())
+        executor.mark_used()
+        executor._write_file(executor._get_last_used_path(), str(last_used))
+
+      with mock.patch.object(NailgunExecutor, 'terminate', autospec=True) as terminate:
+        NailgunExecutorPool('ng_Test', os.path.join(root, 'ng_Test'), [], distribution, size=2,
+                            idle_timeout=60)
+        self.assertEqual(['ng_Test', 'ng_Test_3'],
+                         sorted(args[0].name for args, _ in terminate.call_args_list))
+
+  def test_check_health_waits_for_port(self):
+    with self.buildroot() as (root, distribution):
+      executor = self.create_executor(root, distribution, 'ng_Test')
+      executor.write_pid(os.getpid())
+      sock = mock.Mock()
+
+      def sleep(secs):
+        # The process starting the server writes its port while the health check waits.
+        executor.write_socket(1234)
+
+      with mock.patch('pants.java.nailgun_client.NailgunClient.try_connect', autospec=True,
+                      return_value=sock):
+        with mock.patch('time.sleep', side_effect=sleep):
+          with mock.patch.object(NailgunExecutor, 'terminate', autospec=True) as terminate:
+            self.assertTrue(executor.check_health())
+            self.assertFalse(terminate.called)
+            sock.close.assert_called_once_with()
+
+  def test_check_health_kills_unresponsive(self):
+    with self.buildroot() as (root, distribution):
+      executor = NailgunExecutor('ng_Test', os.path.join(root, 'ng_Test'), [], distribution,
+                                 connect_attempts=2)
+      executor.write_pid(os.getpid())
+      with mock.patch('pants.java.nailgun_client.NailgunClient.try_connect', autospec=True,
+                      return_value=None) as try_connect:
+        with mock.patch.object(NailgunExecutor, 'terminate', autospec=True) as terminate:
+          executor.write_socket(1234)
+          self.assertFalse(executor.check_health())
+          self.assertEqual(3, try_connect.call_count)
+          terminate.assert_called_once_with(executor)
@@ -5,6 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import sys
+
 import pytest
 
 from pants.base.build_graph import CycleException, sort_targets
@@ -54,3 +56,48 @@ class SortTargetsTest(BaseTest):
     self.assertEquals(sort_targets([a,b,c,d,e]), [e,d,c,b,a])
     self.assertEquals(sort_targets([b,d,a,e,c]), [e,d,c,b,a])
     self.assertEquals(sort_targets([e,d,c,b,a]), [e,d,c,b,a])
+
+  def test_cycle_path_reported(self):
+    c = self.make_target(':c')
+    b = self.make_target(':b', dependencies=[c])
+    a = self.make_target(':a', dependencies=[b])
+    self.build_graph.inject_dependency(c.address, b.address)
+
+    with pytest.raises(CycleException) as exc_info:
+      sort_targets([a])
+    self.assertEquals('Cycle detected:\n\t:b ->\n\t:c ->\n\t:b', str(exc_info.value))
+
+  def test_sort_deep_chain(self):
+    # Deeper than the default recursion limit.
+    chain = [self.make_target(':t0')]
+    for i in range(1, 2 * sys.getrecursionlimit()):
+      chain.append(self.make_target(':t{}'.format(i), dependencies=[chain[-1]]))
+
+    self.assertEquals(list(reversed(chain)), sort_targets([chain[-1]]))
+
+  def test_sorted_targets_maintained_incrementally(self):
+    a = self.make_target(':a')
+    b = self.make_target(':b', dependencies=[a])
+    self.assertEquals([b, a], self.build_graph.sorted_targets())
+
+    c = self.make_target(':c', dependencies=[b])
+    d = self.make_target(':d', dependencies=[a])
+    self.build_graph.inject_dependency(d.address, c.address)
+    self.assert_topologically_sorted(self.build_graph.sorted_targets())
+
+    # A dependency that runs against the cached order forces a resort.
+    e = self.make_target(':e')
+    self.build_graph.inject_dependency(a.address, e.address)
+    self.assert_topologically_sorted(self.build_graph.sorted_targets())
+    self.assertEquals(e, self.build_graph.sorted_targets()[-1])
+
+    self.build_graph.inject_dependency(e.address, d.address)
+    with pytest.raises(CycleException):
+      self.build_graph.sorted_targets()
+
+  def assert_topologically_sorted(self, targets):
+    seen = set()
+    for target in reversed(targets):
+      for dependency in target.dependencies:
+        self.assertIn(dependency, seen)
+      seen.add(target)
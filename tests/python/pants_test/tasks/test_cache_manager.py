@@ -10,6 +10,8 @@ import tempfile
 
 from pants.base.build_invalidator import CacheKey, CacheKeyGenerator
 from pants.base.cache_manager import InvalidationCacheManager, InvalidationCheck, VersionedTarget
+from pants.base.payload import Payload
+from pants.base.payload_field import SourcesField
 from pants_test.base_test import BaseTest
 
 
@@ -123,3 +125,28 @@ class InvalidationCacheManagerTest(BaseTest):
     self.assertEquals(1, len(partitioned[0].targets))
     self.assertEquals(3, len(partitioned[1].targets))
     self.assertEquals(1, len(partitioned[2].targets))
+
+  def _make_sourced_target(self, name, dependencies):
+    self.create_file('src/{}.txt'.format(name), contents=name)
+    payload = Payload()
+    payload.add_fields({'sources': SourcesField(sources_rel_path='src',
+                                                sources=['{}.txt'.format(name)])})
+    return self.make_target(':{}'.format(name), dependencies=dependencies, payload=payload)
+
+  def test_parallel_fingerprinting_matches_serial(self):
+    targets = []
+    for i in range(20):
+      targets.append(self._make_sourced_target('t{}'.format(i), dependencies=targets[-2:]))
+
+    def cache_keys(fingerprint_workers, invalidate_dependents):
+      for target in targets:
+        target.mark_invalidation_hash_dirty()
+      cache_manager = InvalidationCacheManager(CacheKeyGenerator(), self._dir,
+                                               invalidate_dependents,
+                                               fingerprint_workers=fingerprint_workers)
+      return [vt.cache_key for vt in cache_manager.wrap_targets(targets[-5:])]
+
+    for invalidate_dependents in (True, False):
+      serial_keys = cache_keys(1, invalidate_dependents)
+      self.assertEquals(5, len(serial_keys))
+      self.assertEquals(serial_keys, cache_keys(4, invalidate_dependents))
@@ -7,7 +7,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import unittest
 
-from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
+from pants.backend.jvm.tasks.jvm_compile.execution_graph import (CircularDependencyError,
+                                                                 ExecutionFailure, ExecutionGraph,
                                                                  Job, JobExistsError,
                                                                  NoRootJobError, UnknownJobError)
 
@@ -40,12 +41,12 @@ class ExecutionGraphTest(unittest.TestCase):
   def execute(self, exec_graph):
     exec_graph.execute(ImmediatelyExecutingPool(), PrintLogger())
 
-  def job(self, name, fn, dependencies, on_success=None, on_failure=None):
+  def job(self, name, fn, dependencies, on_success=None, on_failure=None, size=1):
     def recording_fn():
       self.jobs_run.append(name)
       fn()
 
-    return Job(name, recording_fn, dependencies, on_success, on_failure)
+    return Job(name, recording_fn, dependencies, on_success, on_failure, size=size)
 
   def test_single_job(self):
     exec_graph = ExecutionGraph([self.job("A", passing_fn, [])])
@@ -194,3 +195,51 @@ class ExecutionGraphTest(unittest.TestCase):
                       self.job("Same", passing_fn, [])])
 
     self.assertEqual("Unexecutable graph: Job already scheduled u'Same'", str(cm.exception))
+
+  def test_critical_path_runs_first(self):
+    # C heads the longest chain of work, so runs before B, although B was scheduled first.
+    exec_graph = ExecutionGraph([self.job("B", passing_fn, []),
+                                 self.job("C", passing_fn, []),
+                                 self.job("A", passing_fn, ["C"])])
+    self.execute(exec_graph)
+
+    self.assertEqual(["C", "B", "A"], self.jobs_run)
+
+  def test_job_sizes_weight_priorities(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, ["C"]),
+                                 self.job("B", passing_fn, [], size=10),
+                                 self.job("C", passing_fn, [], size=2)])
+    self.execute(exec_graph)
+
+    self.assertEqual(["B", "C", "A"], self.jobs_run)
+
+  def test_max_outstanding_defers_to_higher_priority_jobs(self):
+    # With one job outstanding at a time, A becomes ready before B is submitted, and its chain is
+    # longer.
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, ["C"], size=5),
+                                 self.job("B", passing_fn, [], size=3),
+                                 self.job("C", passing_fn, [], size=1)])
+    exec_graph.execute(ImmediatelyExecutingPool(), PrintLogger(), max_outstanding=1)
+
+    self.assertEqual(["C", "A", "B"], self.jobs_run)
+
+  def test_trace(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, ["F"]),
+                                 self.job("F", raising_fn, [], size=2)])
+    with self.assertRaises(ExecutionFailure):
+      self.execute(exec_graph)
+
+    failed, canceled = exec_graph.trace
+    self.assertEqual(("F", 3, "Failed"), (failed.key, failed.priority, failed.status))
+    self.assertLessEqual(failed.submitted, failed.started)
+    self.assertLessEqual(failed.started, failed.finished)
+    self.assertEqual(("A", 1, None, None, "Canceled"),
+                     (canceled.key, canceled.priority, canceled.submitted, canceled.started,
+                      canceled.status))
+    self.assertEqual(canceled.finished, exec_graph.makespan)
+
+  def test_cycle_below_root_causes_failure(self):
+    with self.assertRaises(CircularDependencyError):
+      ExecutionGraph([self.job("A", passing_fn, []),
+                      self.job("B", passing_fn, ["A", "C"]),
+                      self.job("C", passing_fn, ["B"])])
@@ -296,6 +296,15 @@ class WhatChangedTest(BaseWhatChangedTest):
       workspace=self.workspace(files=['root/src/py/dependency_tree/a/a.py'])
     )
 
+  def test_include_dependees_without_index(self):
+    self.assert_console_output(
+      'root/src/py/dependency_tree/a:a',
+      'root/src/py/dependency_tree/b:b',
+      'root/src/py/dependency_tree/c:c',
+      options={'include_dependees': 'transitive', 'dependee_index': False},
+      workspace=self.workspace(files=['root/src/py/dependency_tree/a/a.py'])
+    )
+
   def test_exclude(self):
     self.assert_console_output(
       'root/src/py/dependency_tree/a:a',
@@ -15,7 +15,7 @@ import mox
 from pants.util import dirutil
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import (_mkdtemp_unregister_cleaner, relative_symlink, relativize_paths,
-                                safe_mkdir)
+                                safe_atomic_open, safe_mkdir)
 
 
 class DirutilTest(unittest.TestCase):
@@ -127,3 +127,17 @@ class DirutilTest(unittest.TestCase):
       link = os.path.join('foo', 'bar')
       with self.assertRaisesRegexp(ValueError, r'Path for link.*absolute'):
         relative_symlink(source, link)
+
+  def test_safe_atomic_open(self):
+    with temporary_dir() as root:
+      path = os.path.join(root, 'a', 'file')
+      with safe_atomic_open(path) as fp:
+        fp.write(b'old')
+        self.assertFalse(os.path.exists(path))
+      with self.assertRaises(ValueError):
+        with safe_atomic_open(path) as fp:
+          fp.write(b'new')
+          raise ValueError()
+      with open(path, 'rb') as fp:
+        self.assertEqual(b'old', fp.read())
+      self.assertEqual(['file'], os.listdir(os.path.join(root, 'a')))